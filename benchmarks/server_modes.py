@@ -0,0 +1,104 @@
+"""
+Compare the WSGI (threaded) and ASGI (uvicorn + async views) deployments
+Run: python benchmarks/server_modes.py [--requests 200] [--slow-clients 16] [--slow-seconds 2]
+
+Runs the landing page and signup scenarios of signup_funnel.py against
+gunicorn in each SERVER_MODE with the same worker count. Each mode runs twice:
+once as is, and once while --slow-clients connections keep uploading a small
+form body one byte at a time. Each slow upload takes --slow-seconds, and the
+connections reconnect back to back.
+
+Under WSGI every slow upload holds one of the workers x threads request
+threads until its body has arrived. Under ASGI the body is read on the event
+loop and the regular requests keep flowing.
+"""
+import argparse
+import socket
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+from signup_funnel import Client, Server, client_ip, next_id, run_scenario
+
+SCENARIOS = ['home', 'signup_valid', 'signup_duplicate']
+
+
+class SlowClients:
+    """Connections that upload a contact form body byte by byte, back to back"""
+
+    def __init__(self, port, count, seconds):
+        self.port = port
+        self.count = count
+        self.seconds = seconds
+        self.stopped = threading.Event()
+        self.uploads = 0
+        self.threads = []
+
+    def __enter__(self):
+        for _ in range(self.count):
+            client = Client(self.port)
+            client.prepare_csrf()  # the token goes in a header, so the view is what reads the body
+            thread = threading.Thread(target=self.run, args=(client.cookies,))
+            thread.start()
+            self.threads.append(thread)
+        time.sleep(0.5)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
+
+    def run(self, cookies):
+        body = urlencode({'name': 'Slow', 'email': 'slow@example.com', 'message': 'hi'}).encode()
+        delay = self.seconds / len(body)
+        while not self.stopped.is_set():
+            head = (
+                f'POST /contact/ HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n'
+                f'X-Forwarded-For: {client_ip(next_id())}\r\nX-CSRFToken: {cookies["csrftoken"]}\r\n'
+                f'Cookie: csrftoken={cookies["csrftoken"]}\r\n'
+                f'Content-Type: application/x-www-form-urlencoded\r\nContent-Length: {len(body)}\r\n\r\n'
+            )
+            try:
+                with socket.create_connection(('127.0.0.1', self.port), timeout=60) as sock:
+                    sock.sendall(head.encode())
+                    for i in range(len(body)):
+                        sock.sendall(body[i:i + 1])
+                        time.sleep(delay)
+                    sock.recv(65536)
+                self.uploads += 1
+            except OSError:
+                time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--slow-clients', type=int, default=16)
+    parser.add_argument('--slow-seconds', type=float, default=2.0, help='time each slow client takes to send its body')
+    args = parser.parse_args()
+
+    print(f"📊 {args.requests} requests/scenario, {args.concurrency} clients, gunicorn {args.workers} workers "
+          f"({args.threads} threads under wsgi), {args.slow_clients} slow clients")
+    print(f"   {'server':<6} {'slow':>4}  {'scenario':<18} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for mode in ('wsgi', 'asgi'):
+        server = Server(None, args.workers, args.threads, mode)
+        try:
+            server.start()
+            for slow in (0, args.slow_clients):
+                with SlowClients(server.port, slow, args.slow_seconds):
+                    for name in SCENARIOS:
+                        result = run_scenario(server, name, args.requests, args.concurrency)
+                        print(f"   {mode:<6} {slow:>4}  {name:<18} {result['rps']:>8} {result['p50_ms']:>8} "
+                              f"{result['p95_ms']:>8} {result['p99_ms']:>8} {result['errors']:>7}")
+        finally:
+            server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
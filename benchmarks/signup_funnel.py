@@ -0,0 +1,385 @@
+"""
+Load test for the signup funnel against a local gunicorn
+Run: python benchmarks/signup_funnel.py [--requests 400] [--concurrency 8] [--server asgi] [--database-url postgres://...]
+
+Starts gunicorn (2 workers x 4 threads, as in the Procfile; --server asgi for
+uvicorn workers and the async views) with DEBUG=False on a fresh SQLite
+database in a temp directory - or on --database-url, e.g. a throwaway
+Postgres - then drives each scenario in turn from --concurrency keep-alive
+client threads. Static files are collected into the temp directory, so run
+``python manage.py build_frontend`` first.
+
+    home               GET /                         (cached landing shell)
+    signup_valid       HTMX POST, new email/phone    (success partial)
+    signup_duplicate   HTMX POST, existing email     (form errors)
+    signup_honeypot    HTMX POST, honeypot filled    (form errors)
+    signup_disposable  HTMX POST, disposable domain  (form errors)
+    login              POST /auth/login/             (302 to dashboard)
+    dashboard          GET /auth/dashboard/          (302 to the client portal)
+
+Each client first sends one unmeasured request of the scenario on its
+keep-alive connection, which warms the per-process caches (blocklist rules,
+signup counter) of the gunicorn worker that connection is served by. For each
+scenario it then reports p50/p95/p99 latency, throughput, errors and SQL
+queries per request (read from the server's /metrics). Results are compared
+with benchmarks/baselines/signup_funnel.json: more queries per request than
+the baseline, any unexpected status, or a p50/p95 slower than the baseline
+by more than --tolerance/--p95-tolerance fails the run (exit code 1).
+
+The committed baseline pins only queries per request, which is the same on
+every machine. Latency is machine-specific: run once with --update-baseline
+on the machine that does the comparisons to add p50/p95 limits there.
+"""
+import argparse
+import itertools
+import json
+import os
+import secrets
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.client import HTTPConnection, RemoteDisconnected
+from pathlib import Path
+from urllib.parse import urlencode
+
+from prometheus_client.parser import text_string_to_metric_families
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'signup_funnel.json'
+PASSWORD = 'bench-pass-123'
+TAKEN_EMAIL = 'taken@example.com'
+LATENCY_SLACK_MS = 2.0  # absolute slack so very fast scenarios don't flap
+
+SEED = f"""
+from django.contrib.auth import get_user_model
+from pages.models import EmailSignup
+get_user_model().objects.create_user(username='bench', password={PASSWORD!r}, user_type='client')
+EmailSignup.objects.create(first_name='Taken', last_name='User', email={TAKEN_EMAIL!r}, phone='555-000-0000')
+"""
+
+_ids = itertools.count(1)
+_ids_lock = threading.Lock()
+
+
+def next_id():
+    with _ids_lock:
+        return next(_ids)
+
+
+def client_ip(n):
+    """A distinct private address per request, so per-IP rate limits stay out of the way"""
+    return f'10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client:
+    """One keep-alive connection with a cookie jar"""
+
+    def __init__(self, port):
+        self.connection = HTTPConnection('127.0.0.1', port, timeout=60)
+        self.cookies = {}
+
+    def request(self, method, path, data=None, headers=None):
+        headers = {'X-Forwarded-For': client_ip(next_id()), **(headers or {})}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            if 'csrftoken' in self.cookies:
+                headers['X-CSRFToken'] = self.cookies['csrftoken']
+        for attempt in (1, 2):
+            start = time.perf_counter()
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                content = response.read()
+                break
+            except (RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # gunicorn closes idle keep-alive connections; reconnect once
+                self.connection.close()
+                if attempt == 2:
+                    raise
+        elapsed = time.perf_counter() - start
+        for cookie in response.headers.get_all('Set-Cookie') or []:
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value
+        return response.status, content, elapsed
+
+    def prepare_csrf(self):
+        self.request('GET', '/fragments/signup-form/')
+
+    def login_again(self):
+        """Full password login: drop the previous session so the view authenticates again"""
+        self.cookies.pop('sessionid', None)
+        return self.request('POST', '/auth/login/', {'username': 'bench', 'password': PASSWORD})
+
+    def login(self):
+        self.prepare_csrf()
+        status, _, _ = self.request('POST', '/auth/login/', {'username': 'bench', 'password': PASSWORD})
+        assert status == 302, f'login failed with {status}'
+
+
+def signup_data(email=None, **extra):
+    n = next_id()
+    return {
+        'first_name': 'Load',
+        'last_name': 'Test',
+        'email': email or f'load{n}-{secrets.token_hex(3)}@example.com',
+        'phone': f'{200 + n // 10_000_000 % 800:03d}{n % 10_000_000:07d}',
+        'marketing_consent': 'on',
+        **extra,
+    }
+
+
+HTMX = {'HX-Request': 'true'}
+
+# name -> (URL name in /metrics, expected status, setup(client), request(client))
+SCENARIOS = {
+    'home': ('pages:home', 200, None, lambda c: c.request('GET', '/')),
+    'signup_valid': ('pages:home', 200, Client.prepare_csrf, lambda c: c.request('POST', '/', signup_data(), HTMX)),
+    'signup_duplicate': (
+        'pages:home', 200, Client.prepare_csrf, lambda c: c.request('POST', '/', signup_data(TAKEN_EMAIL), HTMX)
+    ),
+    'signup_honeypot': (
+        'pages:home', 200, Client.prepare_csrf,
+        lambda c: c.request('POST', '/', signup_data(website='http://spam.example'), HTMX),
+    ),
+    'signup_disposable': (
+        'pages:home', 200, Client.prepare_csrf,
+        lambda c: c.request('POST', '/', signup_data(f'bot{next_id()}@mailinator.com'), HTMX),
+    ),
+    'login': ('login', 302, Client.prepare_csrf, lambda c: c.login_again()),
+    'dashboard': ('dashboard', 302, Client.login, lambda c: c.request('GET', '/auth/dashboard/')),
+}
+# Password hashing is deliberately slow, so login runs a tenth of the requests
+REQUEST_SHARE = {'login': 0.1}
+
+
+class Server:
+    """gunicorn plus a migrated, seeded database in a temp directory"""
+
+    def __init__(self, database_url, workers, threads, mode='wsgi'):
+        self.tmp = Path(tempfile.mkdtemp(prefix='bench-'))
+        self.port = free_port()
+        self.token = secrets.token_hex(16)
+        self.env = {
+            **os.environ,
+            'DATABASE_URL': database_url or f'sqlite:///{self.tmp / "bench.sqlite3"}',
+            # Production configuration: manifest static files (collected below), cached templates
+            'DEBUG': 'False',
+            'STATIC_ROOT': str(self.tmp / 'static'),
+            'TEMPLATE_CACHE': 'True',
+            'TEMPLATE_WARMUP': 'True',
+            'TRUSTED_PROXY_HOPS': '1',
+            'CACHE_URL': '',
+            'CACHE_DIR': str(self.tmp / 'cache'),
+            'PROMETHEUS_MULTIPROC_DIR': str(self.tmp / 'metrics'),
+            'METRICS_TOKEN': self.token,
+            'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+            'EMAIL_OUTBOX_WORKERS': '0',
+            'PERFORMANCE_METRICS_LOG_INTERVAL': '3600',
+            'CORE_LOG_LEVEL': 'WARNING',
+            'SERVER_MODE': mode,
+        }
+        self.workers = workers
+        self.threads = threads
+        self.mode = mode
+        self.process = None
+
+    def manage(self, *args):
+        subprocess.run([sys.executable, 'manage.py', *args], cwd=BASE_DIR, env=self.env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def start(self):
+        if not (BASE_DIR / 'static' / 'dist' / 'app.css').exists():
+            raise RuntimeError('No front-end build: run "python manage.py build_frontend" first')
+        self.manage('collectstatic', '--noinput')
+        self.manage('migrate', '--noinput')
+        if not self.env['DATABASE_URL'].startswith('sqlite'):
+            self.manage('flush', '--noinput')
+        self.manage('shell', '-c', SEED)
+        self.process = subprocess.Popen(
+            # The app and worker class come from gunicorn.conf.py (SERVER_MODE)
+            [sys.executable, '-m', 'gunicorn', '--workers', str(self.workers),
+             '--threads', str(self.threads), '--bind', f'127.0.0.1:{self.port}', '--log-level', 'warning'],
+            cwd=BASE_DIR, env=self.env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if Client(self.port).request('GET', '/')[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError('gunicorn did not start')
+
+    def stop(self):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def query_totals(self):
+        """{view: (sum of queries, requests)} from /metrics"""
+        status, content, _ = Client(self.port).request(
+            'GET', '/metrics', headers={'Authorization': f'Bearer {self.token}'}
+        )
+        assert status == 200, f'/metrics returned {status}'
+        totals = {}
+        for family in text_string_to_metric_families(content.decode()):
+            if family.name != 'http_request_db_queries':
+                continue
+            for sample in family.samples:
+                view = sample.labels.get('view')
+                queries, count = totals.get(view, (0.0, 0.0))
+                if sample.name.endswith('_sum'):
+                    totals[view] = (sample.value, count)
+                elif sample.name.endswith('_count'):
+                    totals[view] = (queries, sample.value)
+        return totals
+
+
+def run_scenario(server, name, requests, concurrency):
+    view, expected, setup, make_request = SCENARIOS[name]
+    clients = [Client(server.port) for _ in range(concurrency)]
+    if setup:
+        for client in clients:
+            setup(client)
+    for client in clients:
+        make_request(client)  # warm-up, not measured
+
+    before = server.query_totals().get(view, (0.0, 0.0))
+    latencies = []
+    errors = []
+    remaining = itertools.count(requests, -1)
+    lock = threading.Lock()
+
+    def worker(client):
+        while True:
+            with lock:
+                if next(remaining) <= 0:
+                    return
+            status, content, elapsed = make_request(client)
+            with lock:
+                latencies.append(elapsed)
+                if status != expected:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    after = server.query_totals().get(view, (0.0, 0.0))
+    served = after[1] - before[1]
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_statuses': sorted(set(errors)),
+        'rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries': round((after[0] - before[0]) / served, 2) if served else 0.0,
+    }
+
+
+def compare(results, baseline, tolerances):
+    """Regression messages for results that are worse than the baseline"""
+    problems = []
+    for name, result in results.items():
+        if result['errors']:
+            problems.append(f'{name}: {result["errors"]} unexpected responses {result["error_statuses"]}')
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        if result['queries'] > expected['queries'] + 0.01:
+            problems.append(f'{name}: {result["queries"]} queries/request, baseline {expected["queries"]}')
+        for key, tolerance in tolerances.items():
+            if key not in expected:
+                continue
+            limit = expected[key] * (1 + tolerance) + LATENCY_SLACK_MS
+            if result[key] > limit:
+                problems.append(f'{name}: {key} {result[key]}, baseline {expected[key]} (limit {limit:.1f})')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400, help='requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi', help='SERVER_MODE to run gunicorn in')
+    parser.add_argument('--database-url', help='run against this database instead of a temp SQLite file (it is flushed)')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help='run only these scenarios')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed p50 slowdown vs baseline (0.5 = 50%%)')
+    parser.add_argument('--p95-tolerance', type=float, default=1.0, help='allowed p95 slowdown vs baseline')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', help='also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    server = Server(args.database_url, args.workers, args.threads, args.server)
+    results = {}
+    try:
+        server.start()
+        print(f"📊 {args.requests} requests/scenario, {args.concurrency} clients, "
+              f"gunicorn {args.server} {args.workers}x{args.threads} on {server.env['DATABASE_URL'].split(':')[0]}")
+        print(f"   {'scenario':<18} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>7}")
+        for name in args.scenario or SCENARIOS:
+            requests = max(args.concurrency, int(args.requests * REQUEST_SHARE.get(name, 1)))
+            result = results[name] = run_scenario(server, name, requests, args.concurrency)
+            print(f"   {name:<18} {result['rps']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                  f"{result['p99_ms']:>8} {result['queries']:>8} {result['errors']:>7}")
+    finally:
+        server.stop()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        for name, result in results.items():
+            baseline[name] = {key: result[key] for key in ('queries', 'p50_ms', 'p95_ms')}
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+        print(f"✅ Baseline updated: {BASELINE_PATH.relative_to(BASE_DIR)}")
+        return 0
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    problems = compare(results, baseline, {'p50_ms': args.tolerance, 'p95_ms': args.p95_tolerance})
+    if problems:
+        print('❌ Regressions against the baseline:')
+        for problem in problems:
+            print(f'   {problem}')
+        return 1
+    print('✅ No regressions against the baseline' if baseline else '⚠️  No baseline yet - run with --update-baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
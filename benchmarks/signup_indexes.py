@@ -0,0 +1,199 @@
+"""
+EmailSignup changelist queries before and after the listing indexes (pages migration 0005)
+Run: python benchmarks/signup_indexes.py [--rows 1000000] [--database-url postgres://...] [--plans] [--output results.json]
+
+Seeds --rows signups (once; reruns reuse them) into a fresh SQLite database
+in a temp directory, or into --database-url (a throwaway Postgres: the table
+is filled and its indexes are dropped and recreated). The admin changelist is
+then requested for each scenario, as a superuser:
+
+    list        newest first, no filters
+    unverified  ?email_verified__exact=0
+    consent     ?marketing_consent__exact=1
+    month       date hierarchy drill-down to one month
+    search      ?q=<one lead's email>
+
+Each scenario runs first with the pages migrations at 0004 (no listing
+indexes), then at 0005. The report gives the median request time, the
+slowest SQL statement and how that statement reads the table (from EXPLAIN).
+--plans prints every statement's full plan.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+BEFORE, AFTER = '0004', '0005'
+SCENARIOS = {
+    'list': {},
+    'unverified': {'email_verified__exact': '0'},
+    'consent': {'marketing_consent__exact': '1'},
+    'month': {'created_at__year': '2025', 'created_at__month': '3'},
+    'search': {'q': 'lead123457@'},
+}
+
+# 2 years of signups, ~20% unverified, ~30% consenting
+SEED_SQL = {
+    'postgresql': """
+        INSERT INTO pages_emailsignup (first_name, last_name, email, phone, marketing_consent, email_verified, created_at)
+        SELECT 'First' || n, 'Last' || (n %% 5000), 'lead' || n || '@example' || (n %% 997) || '.com',
+               lpad(((n::bigint * 7919) %% 10000000000)::text, 10, '0'), n %% 10 < 3, n %% 5 <> 0,
+               timestamptz '2024-06-01' + (n * interval '63 seconds')
+        FROM generate_series(%s, %s) AS n
+    """,
+    'sqlite': """
+        WITH RECURSIVE seq(n) AS (SELECT %s UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+        INSERT INTO pages_emailsignup (first_name, last_name, email, phone, marketing_consent, email_verified, created_at)
+        SELECT 'First' || n, 'Last' || (n %% 5000), 'lead' || n || '@example' || (n %% 997) || '.com',
+               printf('%%010d', (n * 7919) %% 10000000000), n %% 10 < 3, n %% 5 <> 0,
+               strftime('%%Y-%%m-%%d %%H:%%M:%%f', '2024-06-01', '+' || (n * 63) || ' seconds')
+        FROM seq
+    """,
+}
+
+
+def setup_django(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    os.environ['DEBUG'] = 'True'  # keeps {% static %} working without collectstatic
+    import django
+    from django.test.utils import setup_test_environment
+    django.setup()
+    setup_test_environment()  # test client host, in-memory email
+
+
+def seed(rows):
+    from django.db import connection, transaction
+    from pages.models import EmailSignup
+
+    existing = EmailSignup.objects.count()
+    if existing >= rows:
+        return existing
+    print(f'Seeding {rows - existing:,} signups...', flush=True)
+    start = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(SEED_SQL[connection.vendor], [existing + 1, rows])
+    print(f'Seeded in {time.perf_counter() - start:.1f}s', flush=True)
+    return rows
+
+
+def migrate_to(target):
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', 'pages', target, verbosity=0)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE' if connection.vendor == 'sqlite' else 'ANALYZE pages_emailsignup')
+
+
+def explain(sql):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS) {sql}')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def table_access(plan):
+    """The plan lines that say how pages_emailsignup is read"""
+    lines = [line.strip().lstrip('-> ').strip() for line in plan.splitlines()]
+    return '; '.join(line for line in lines if 'pages_emailsignup' in line or 'Index' in line) or lines[0]
+
+
+def statement_kind(sql):
+    sql = sql.upper()
+    if 'COUNT(' in sql:
+        return 'count'
+    if 'MIN(' in sql or 'DISTINCT' in sql:
+        return 'dates'  # date hierarchy
+    return 'rows'
+
+
+def run_scenario(client, params, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    url = reverse('admin:pages_emailsignup_changelist')
+    client.get(url, params)  # warm caches and the connection
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url, params)
+            timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+
+    statements = [q for q in queries.captured_queries if 'pages_emailsignup' in q['sql']]
+    plans = [
+        {'sql': q['sql'], 'ms': float(q['time']) * 1000, 'plan': explain(q['sql'])}
+        for q in statements if q['sql'].lstrip().upper().startswith('SELECT')
+    ]
+    return {'median_ms': statistics.median(timings), 'queries': len(queries.captured_queries), 'statements': plans}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5, help='Requests per scenario and phase')
+    parser.add_argument('--database-url', help='Throwaway database to use instead of a temp SQLite file')
+    parser.add_argument('--plans', action='store_true', help='Print every statement with its full plan')
+    parser.add_argument('--output', help='Write results as JSON')
+    args = parser.parse_args()
+
+    tmp = None
+    if not args.database_url:
+        tmp = tempfile.mkdtemp(prefix='signup-indexes-')
+        args.database_url = f'sqlite:///{tmp}/db.sqlite3'
+    setup_django(args.database_url)
+
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+
+    call_command('migrate', verbosity=0)
+    rows = seed(args.rows)
+    admin, _ = get_user_model().objects.get_or_create(
+        username='bench-admin', defaults={'is_staff': True, 'is_superuser': True, 'email': 'bench@example.com'}
+    )
+    client = Client()
+    client.force_login(admin)
+
+    results = {'vendor': connection.vendor, 'rows': rows, 'phases': {}}
+    for phase, target in (('before', BEFORE), ('after', AFTER)):
+        print(f'Migrating pages to {target} ({phase})...', flush=True)
+        migrate_to(target)
+        results['phases'][phase] = {name: run_scenario(client, params, args.repeat) for name, params in SCENARIOS.items()}
+
+    print(f"\n{connection.vendor}, {rows:,} signups - median changelist request, then each statement")
+    for name in SCENARIOS:
+        before, after = results['phases']['before'][name], results['phases']['after'][name]
+        print(f"\n{name:<12} request {before['median_ms']:>8.1f}ms -> {after['median_ms']:>8.1f}ms")
+        for old, new in zip(before['statements'], after['statements']):
+            print(f"  {statement_kind(old['sql']):<12} {old['ms']:>8.1f}ms -> {new['ms']:>8.1f}ms")
+            print(f"  {'':<12} before: {table_access(old['plan'])[:140]}")
+            print(f"  {'':<12} after:  {table_access(new['plan'])[:140]}")
+    if args.plans:
+        for phase, scenarios in results['phases'].items():
+            for name, result in scenarios.items():
+                for statement in result['statements']:
+                    print(f"\n== {phase} / {name} ({statement['ms']:.1f}ms)\n{statement['sql']}\n{statement['plan']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + '\n')
+    if tmp:
+        print(f'\n(SQLite database kept in {tmp}; rerun with --database-url sqlite:///{tmp}/db.sqlite3 to skip seeding)')
+
+
+if __name__ == '__main__':
+    main()
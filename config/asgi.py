@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATE_WARMUP:
+    from core.templating import warm_template_cache  # noqa: E402
+
+    warm_template_cache()
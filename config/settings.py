@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from decouple import config, Csv
 
@@ -59,7 +60,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Add WhiteNoise for static files
+    'core.staticfiles.WhiteNoiseMiddleware',  # WhiteNoise for static files (async-capable)
+    'core.performance.PerformanceMiddleware',  # per-view latency/SQL/template histograms
+    'core.dbpool.PoolTimeoutMiddleware',  # 503 instead of 500 when the connection pool is exhausted
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -67,16 +70,29 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django_htmx.middleware.HtmxMiddleware',
+    'core.critical_css.CriticalCSSMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
 
+# Compiled templates are kept in memory outside DEBUG (or with TEMPLATE_CACHE=True)
+TEMPLATE_CACHE = config('TEMPLATE_CACHE', default=not DEBUG, cast=bool)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+TEMPLATE_WARMUP = config('TEMPLATE_WARMUP', default=TEMPLATE_CACHE, cast=bool)  # compile all templates at startup
+TEMPLATE_PROFILING = config('TEMPLATE_PROFILING', default=False, cast=bool)  # per-template render timing (core/templating.py)
+TEMPLATE_PROFILING_SLOW_MS = config('TEMPLATE_PROFILING_SLOW_MS', default=50, cast=float)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -89,6 +105,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# wsgi: gunicorn threads (default); asgi: uvicorn workers via gunicorn.conf.py, with the async
+# landing page/signup views (ASYNC_VIEWS) so slow clients and queries don't hold a thread each
+SERVER_MODE = config('SERVER_MODE', default='wsgi')
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=SERVER_MODE == 'asgi', cast=bool)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -98,11 +119,71 @@ import dj_database_url
 DATABASES = {
     'default': dj_database_url.config(
         default=config('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
-        conn_max_age=600,
+        # Under ASGI every request runs its ORM calls on a fresh thread, so persistent
+        # connections would pile up instead of being reused (the Postgres pool below reuses them)
+        conn_max_age=0 if SERVER_MODE == 'asgi' else 600,
         conn_health_checks=True,
     )
 }
 
+# Postgres: a psycopg connection pool per process instead of one persistent connection per
+# thread. Connections are health-checked when taken from the pool (CONN_HEALTH_CHECKS); a request
+# that waits longer than DB_POOL_TIMEOUT seconds for one gets a 503 (core/dbpool.py).
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=4, cast=int)  # per process: match --threads
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', default=5.0, cast=float)
+DB_POOL_MAX_IDLE = config('DB_POOL_MAX_IDLE', default=300.0, cast=float)  # close idle extras above min size
+DB_POOL_MAX_LIFETIME = config('DB_POOL_MAX_LIFETIME', default=1800.0, cast=float)
+if DB_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_MAX_AGE'] = 0  # connections go back to the pool after each request
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': DB_POOL_TIMEOUT,
+        'max_idle': DB_POOL_MAX_IDLE,
+        'max_lifetime': DB_POOL_MAX_LIFETIME,
+    }
+
+
+# Cache
+# Shared by every gunicorn worker so rate limits, the signup counter and page caches agree.
+# Set CACHE_URL=redis://... to use Redis; otherwise a lock-protected file cache in CACHE_DIR is used.
+CACHE_URL = config('CACHE_URL', default='')
+
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('locmem://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.SharedFileCache',
+            'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / '.cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+RATELIMIT_USE_CACHE = 'default'
+RATELIMIT_IP_META_KEY = 'core.throttling.client_ip'
+RATELIMIT_IPV6_MASK = 64  # also used by core.throttling: one IPv6 client usually controls a whole /64
+
+# Number of reverse proxies in front of the app (Railway's edge = 1); used to read X-Forwarded-For
+TRUSTED_PROXY_HOPS = config('TRUSTED_PROXY_HOPS', default=0 if DEBUG else 1, cast=int)
+
+# Per-client token bucket for signup POSTs (core/throttling.py), checked before the form is built
+SIGNUP_THROTTLE_RATE = config('SIGNUP_THROTTLE_RATE', default='5/m')
+SIGNUP_THROTTLE_BURST = config('SIGNUP_THROTTLE_BURST', default=5, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -140,10 +221,21 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
-STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATIC_ROOT = config('STATIC_ROOT', default=BASE_DIR / 'staticfiles', cast=Path)
 
-# WhiteNoise configuration for serving static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise configuration for serving static files. In production every file is
+# fingerprinted and compressed, and WhiteNoise serves hashed names as immutable.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
 
 # Media files
 MEDIA_URL = 'media/'
@@ -161,10 +253,18 @@ CRISPY_TEMPLATE_PACK = "tailwind"
 # Custom User Model
 AUTH_USER_MODEL = 'core.User'
 
+# The logged-in user is cached between requests and dropped when it is saved (core/auth.py)
+AUTHENTICATION_BACKENDS = ['core.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=300, cast=int)
+
+# Sessions are read from the shared cache and written through to the database (cached_db).
+# Use django.contrib.sessions.backends.signed_cookies for no server-side session storage at all.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+
 # Login/Logout URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
-LOGOUT_REDIRECT_URL = 'home'
+LOGOUT_REDIRECT_URL = 'pages:home'
 
 # Production Security Settings
 if not DEBUG:
@@ -183,11 +283,98 @@ if not DEBUG:
 GA_TRACKING_ID = config('GA_TRACKING_ID', default='')
 
 # Email Configuration
-EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='core.mail.PooledSMTPEmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.zoho.com')
 EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='noreply@247performance.app')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+# Seconds before a stalled SMTP socket raises; keep well under core.outbox.LEASE_SECONDS (300) so a hung
+# send fails over to a retry instead of outliving its lease and being sent again by another worker
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=20, cast=int)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='247 Performance Studios <noreply@247performance.app>')
 ADMIN_EMAILS = config('ADMIN_EMAILS', default='admin@247performance.app', cast=Csv())
+
+# Email outbox - signup notifications are queued in the DB and delivered in batches (core/outbox.py)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=8, cast=int)
+EMAIL_OUTBOX_RETRY_BACKOFF = config('EMAIL_OUTBOX_RETRY_BACKOFF', default=30, cast=int)  # seconds, doubles per attempt
+EMAIL_OUTBOX_MAX_BACKOFF = config('EMAIL_OUTBOX_MAX_BACKOFF', default=3600, cast=int)
+EMAIL_OUTBOX_POLL_INTERVAL = config('EMAIL_OUTBOX_POLL_INTERVAL', default=30, cast=int)
+EMAIL_OUTBOX_WORKERS = config('EMAIL_OUTBOX_WORKERS', default=1, cast=int)  # in-process delivery threads, 0 = use process_outbox only
+EMAIL_DIGEST_CATEGORIES = config('EMAIL_DIGEST_CATEGORIES', default='lead_notification', cast=Csv())
+EMAIL_DIGEST_THRESHOLD = config('EMAIL_DIGEST_THRESHOLD', default=5, cast=int)  # messages per window before switching to digests
+EMAIL_DIGEST_WINDOW = config('EMAIL_DIGEST_WINDOW', default=60, cast=int)  # seconds
+
+# Pooled SMTP connections (core/mail.py) - TLS handshake once per pooled connection, not per email
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=2, cast=int)
+EMAIL_POOL_MAX_IDLE = config('EMAIL_POOL_MAX_IDLE', default=120, cast=int)  # seconds before an idle connection is dropped
+
+# Landing page signup counter (pages/counters.py) - cached value is recounted after this many seconds
+SIGNUP_COUNT_RECONCILE_INTERVAL = config('SIGNUP_COUNT_RECONCILE_INTERVAL', default=3600, cast=int)
+
+# Disposable email blocklist (pages/blocklist.py) - the file is re-read when it changes, admin rules every TTL seconds
+DISPOSABLE_DOMAINS_FILE = config('DISPOSABLE_DOMAINS_FILE', default=str(BASE_DIR / 'pages' / 'data' / 'disposable_domains.txt'))
+EMAIL_DOMAIN_RULES_TTL = config('EMAIL_DOMAIN_RULES_TTL', default=60, cast=int)
+
+# Signed email verification links (pages/verification.py)
+EMAIL_VERIFICATION_MAX_AGE = config('EMAIL_VERIFICATION_MAX_AGE', default=7 * 86400, cast=int)  # seconds
+SITE_URL = config('SITE_URL', default='')  # e.g. https://247performance.com, for links in emails sent outside a request
+
+# Admin changelists on large tables (core/changelist.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = config('ADMIN_ESTIMATED_COUNT_THRESHOLD', default=100000, cast=int)  # rows; Postgres only
+ADMIN_COUNT_CACHE_TIMEOUT = config('ADMIN_COUNT_CACHE_TIMEOUT', default=60, cast=int)  # seconds for exact counts, facets, dates
+
+# Full-page cache for static marketing pages (pages/cache.py) - keys include the staticfiles build
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=86400, cast=int)
+HOME_SHELL_MAX_AGE = config('HOME_SHELL_MAX_AGE', default=3600, cast=int)  # CDN lifetime of the landing page shell
+
+# Responsive images (manage.py build_images + {% responsive_image %})
+RESPONSIVE_IMAGES_SOURCE_DIR = BASE_DIR / 'static' / 'images'
+RESPONSIVE_IMAGES_OUTPUT_SUBDIR = 'responsive'
+RESPONSIVE_IMAGE_WIDTHS = [160, 320, 480, 640, 960, 1280, 1920]
+RESPONSIVE_IMAGE_FORMATS = ['avif', 'webp']
+
+# Front-end bundle (manage.py build_frontend): purged Tailwind CSS + pinned vendor JS/CSS under static/
+FRONTEND_SOURCE_DIR = BASE_DIR / 'frontend'
+FRONTEND_OUTPUT_DIR = BASE_DIR / 'static'
+FRONTEND_TOOLS_DIR = BASE_DIR / '.tools'
+TAILWIND_CLI_VERSION = config('TAILWIND_CLI_VERSION', default='3.4.17')
+TAILWIND_CLI_PATH = config('TAILWIND_CLI_PATH', default='')  # use an installed CLI instead of downloading one
+
+# Critical CSS + resource hints for views decorated with @critical_css (core/critical_css.py)
+CRITICAL_CSS_ENABLED = config('CRITICAL_CSS_ENABLED', default=True, cast=bool)
+CRITICAL_CSS_TEMPLATES = [  # critical CSS built by build_frontend
+    'pages/home.html',
+    'pages/about.html',
+    'pages/contact.html',
+    'pages/privacy_policy.html',
+    'pages/terms_of_service.html',
+]
+EARLY_HINTS_LINK_HEADER = config('EARLY_HINTS_LINK_HEADER', default=True, cast=bool)  # CDNs turn it into 103 Early Hints
+PRECONNECT_ORIGINS = config(
+    'PRECONNECT_ORIGINS', default='https://www.googletagmanager.com' if GA_TRACKING_ID else '', cast=Csv()
+)
+
+# Per-view request metrics (core/performance.py), logged to core.performance every interval
+PERFORMANCE_METRICS = config('PERFORMANCE_METRICS', default=True, cast=bool)
+PERFORMANCE_METRICS_LOG_INTERVAL = config('PERFORMANCE_METRICS_LOG_INTERVAL', default=60, cast=int)  # seconds
+
+# Send the project's own INFO logs (perf lines, template warm-up) to stdout for Railway
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core': {'handlers': ['console'], 'level': config('CORE_LOG_LEVEL', default='INFO'), 'propagate': False},
+    },
+}
+
+# Prometheus metrics (core/metrics.py): every worker writes mmap'd files here and /metrics merges them.
+# Must be set before prometheus_client is imported; gunicorn.conf.py clears it when the server starts.
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default=str(BASE_DIR / '.metrics'))
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # lets a scraper read /metrics with "Authorization: Bearer <token>"
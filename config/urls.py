@@ -18,6 +18,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from core import views as core_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,6 +26,7 @@ urlpatterns = [
     path('client/', include('clients.urls')),
     path('franchisee/', include('franchisees.urls')),
     path('auth/', include('core.urls')),
+    path('metrics', core_views.metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
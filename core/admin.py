@@ -1,11 +1,30 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User
+from django.utils import timezone
+from .changelist import LargeTableAdminMixin
+from .models import User, OutboxEmail
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     list_display = ['username', 'email', 'user_type', 'first_name', 'last_name', 'is_staff']
     list_filter = ['user_type', 'is_staff', 'is_active']
     fieldsets = UserAdmin.fieldsets + (
         ('Additional Info', {'fields': ('user_type', 'phone')}),
     )
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'category', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'category']
+    search_fields = ['subject', 'last_error']
+    readonly_fields = ['created_at', 'sent_at', 'lease_token', 'lease_expires_at', 'last_error']
+    
+    actions = ['retry_now']
+    
+    @admin.action(description='Retry selected now')
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboxEmail.STATUS_SENT).update(
+            status=OutboxEmail.STATUS_PENDING, next_attempt_at=timezone.now(), lease_expires_at=None
+        )
+        self.message_user(request, f'{updated} email(s) queued for retry.')
@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.signals import request_finished
+        from django.db.backends.signals import connection_created
+
+        from . import auth  # noqa: F401  (user cache invalidation signals)
+        from .metrics import connection_opened
+        from .performance import install_query_counter
+
+        connection_created.connect(connection_opened, dispatch_uid='core.metrics.connection_opened')
+        connection_created.connect(install_query_counter, dispatch_uid='core.performance.install_query_counter')
+
+        if any(database.get('OPTIONS', {}).get('pool') for database in settings.DATABASES.values()):
+            from .dbpool import record_pool_stats
+            # Connected after Django's own receiver, which returns the connection to the pool
+            request_finished.connect(record_pool_stats, dispatch_uid='core.dbpool.record_pool_stats')
+
+        if settings.TEMPLATE_PROFILING:
+            from .templating import enable_render_profiling
+            enable_render_profiling()
@@ -0,0 +1,60 @@
+"""
+Authentication backend that caches the logged-in user.
+
+Every authenticated request resolves ``request.user`` from the user id in
+the session. With ModelBackend that is one SELECT per request on top of
+loading the session. ``CachedModelBackend`` keeps the loaded user in the
+shared cache for AUTH_USER_CACHE_TIMEOUT seconds. Any save or delete of the
+user drops the entry: profile edits, password changes, ``update_last_login``
+and admin changes. Checks such as the session auth hash and ``is_active``
+therefore see the current row. Queryset ``update()`` calls bypass the
+signals, so the timeout bounds how stale such changes can get.
+
+Together with the cached_db session engine, a warm portal request does its
+authentication without touching the database.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() is served from the cache"""
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        return user if self.user_can_authenticate(user) else None
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Drop the cached copy whenever the user row changes (again on commit, in case a request re-cached the old row)"""
+    key = user_cache_key(instance.pk)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
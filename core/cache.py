@@ -0,0 +1,71 @@
+"""
+File-based cache that is safe to share between processes.
+
+Django's FileBasedCache implements ``add()`` and ``incr()`` as separate read
+and write steps, so two gunicorn workers can both "win" an add or lose an
+increment. django-ratelimit relies on exactly those two calls, which is why it
+rejects the stock backend. This subclass serialises them with an exclusive
+``flock`` on a lock file in the cache directory, giving every worker on the
+host one coherent view of rate-limit counters, the signup counter and cached
+pages without needing Redis.
+"""
+import os
+import pickle
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: fall back to an in-process lock
+    fcntl = None
+
+
+class SharedFileCache(FileBasedCache):
+    """FileBasedCache with atomic add/incr across processes"""
+
+    lock_filename = '.lock'
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._thread_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            self._createdir()
+            with open(os.path.join(self._dir, self.lock_filename), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        """Atomically add delta, keeping the entry's original expiry"""
+        with self._locked():
+            fname = self._key_to_file(key, version)
+            try:
+                with open(fname, 'rb') as f:
+                    if self._is_expired(f):
+                        raise ValueError(f"Key '{key}' not found")
+                    f.seek(0)
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                raise ValueError(f"Key '{key}' not found")
+            new_value = value + delta
+            timeout = None if expiry is None else max(expiry - time.time(), 0.001)
+            self.set(key, new_value, timeout, version)
+            return new_value
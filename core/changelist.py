@@ -0,0 +1,117 @@
+"""
+Admin changelists that stay fast on large tables.
+
+A stock changelist page runs several queries that read the whole table.
+There is an exact COUNT(*) for the paginator, and another for the
+"N total" next to a filtered result. Each list_filter runs a facet
+aggregate when facets are shown. The date hierarchy runs MIN/MAX and
+DISTINCT date_trunc queries. ``LargeTableAdminMixin`` replaces them:
+
+* ``EstimatedCountPaginator`` answers an unfiltered count from Postgres'
+  planner statistics (``pg_class.reltuples``) once the table holds more
+  than ADMIN_ESTIMATED_COUNT_THRESHOLD rows. Smaller tables, other
+  databases and filtered or searched listings get an exact count, cached
+  for ADMIN_COUNT_CACHE_TIMEOUT seconds.
+* ``show_full_result_count`` is off, so filtered pages skip the second
+  full count.
+* Facet counts and the date hierarchy links are cached for the same TTL.
+
+Cache keys are built from the SQL of the query being counted, so two
+listings share an entry only when they run the same query, whatever the
+user or URL. For at most one TTL after a change, counts and date links
+can lag behind the rows listed on the page; the rows themselves are never
+cached.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.admin.filters import FacetsMixin
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.views.main import ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import get_language
+
+
+def query_cache_key(prefix, queryset, *extra):
+    """Cache key for a result derived from a queryset's SQL (plus anything else it depends on)"""
+    digest = hashlib.md5('\x00'.join([str(queryset.query), *map(str, extra)]).encode()).hexdigest()
+    return f'admin:{prefix}:{queryset.model._meta.label_lower}:{digest}'
+
+
+def estimated_row_count(model, using='default'):
+    """Postgres' planner estimate of the table's row count, or None where there is none"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 means the table has never been vacuumed or analyzed
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates unfiltered counts on big Postgres tables and caches exact ones"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where and not queryset.query.distinct:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        key = query_cache_key('count', queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=settings.ADMIN_COUNT_CACHE_TIMEOUT)
+        return count
+
+
+class CachedFacetsChangeList(ChangeList):
+    """ChangeList whose filter facet counts are cached per query"""
+
+    def get_filters(self, request):
+        filter_specs, *rest = super().get_filters(request)
+        for spec in filter_specs:
+            if isinstance(spec, FacetsMixin):
+                spec.get_facet_queryset = self._cached_facets(spec)
+        return filter_specs, *rest
+
+    @staticmethod
+    def _cached_facets(spec):
+        get_facet_queryset = spec.get_facet_queryset
+
+        def cached_facet_queryset(changelist):
+            queryset = changelist.get_queryset(spec.request, exclude_parameters=spec.expected_parameters())
+            key = query_cache_key('facets', queryset, type(spec).__qualname__, *spec.expected_parameters())
+            counts = cache.get(key)
+            if counts is None:
+                counts = get_facet_queryset(changelist)
+                cache.set(key, counts, timeout=settings.ADMIN_COUNT_CACHE_TIMEOUT)
+            return counts
+        return cached_facet_queryset
+
+
+def cached_date_hierarchy(cl):
+    """admin_list.date_hierarchy(cl), cached per query, URL and language"""
+    key = query_cache_key('dates', cl.queryset, cl.get_query_string(), get_language())
+    context = cache.get(key)
+    if context is None:
+        context = date_hierarchy(cl)
+        cache.set(key, context, timeout=settings.ADMIN_COUNT_CACHE_TIMEOUT)
+    return context
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin mixin: estimated/cached counts, no full result count, cached facets and date hierarchy"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Renders the date hierarchy through {% cached_date_hierarchy %}; custom templates should extend it
+    change_list_template = 'admin/large_table_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return CachedFacetsChangeList
@@ -0,0 +1,97 @@
+"""
+Database connection pool support (Postgres with DB_POOL on, see settings).
+
+Each process keeps one psycopg pool per database alias. Django takes a
+connection from it when a request first needs the database and returns it
+when the request finishes. A worker therefore never holds more than
+DB_POOL_MAX_SIZE connections, and bursts reuse warm connections instead of
+paying for a new connection each time. Connections are health-checked when
+they leave the pool.
+
+When every connection stays busy for DB_POOL_TIMEOUT seconds, psycopg_pool
+gives up with PoolTimeout. ``PoolTimeoutMiddleware`` answers that with a 503
+and Retry-After instead of a 500 error page. ``record_pool_stats()`` runs after
+every request and publishes each pool's state and event counts to /metrics
+(db_pool_*). With pooling, db_connections_opened_total counts pool checkouts
+and db_pool_events_total{event="connect"} counts real connections.
+"""
+import logging
+
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import DB_POOL_CONNECTIONS, DB_POOL_EVENTS, DB_POOL_SECONDS
+
+try:
+    from psycopg_pool import PoolTimeout, TooManyRequests
+except ImportError:  # psycopg 3 pool not installed: SQLite or psycopg2
+    PoolTimeout = TooManyRequests = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_AFTER_SECONDS = 1
+# pop_stats() counters -> db_pool_events_total event label
+EVENTS = {
+    'requests_num': 'checkout',
+    'requests_queued': 'queued',
+    'requests_errors': 'timeout',
+    'connections_num': 'connect',
+    'connections_lost': 'lost',
+}
+# pop_stats() millisecond totals -> db_pool_seconds_total phase label
+DURATIONS = {'requests_wait_ms': 'wait', 'connections_ms': 'connect'}
+GAUGES = {'pool_size': 'size', 'pool_available': 'available', 'requests_waiting': 'waiting'}
+
+
+def pools():
+    """{alias: ConnectionPool} for the databases configured with a pool"""
+    found = {}
+    for alias in connections:
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            found[alias] = pool
+    return found
+
+
+def record_pool_stats(**kwargs):
+    """Publish each pool's gauges and the counters accumulated since the last call (request_finished receiver)"""
+    for alias, pool in pools().items():
+        stats = pool.pop_stats()
+        for key, state in GAUGES.items():
+            DB_POOL_CONNECTIONS.labels(alias=alias, state=state).set(stats.get(key, 0))
+        for key, event in EVENTS.items():
+            if stats.get(key):
+                DB_POOL_EVENTS.labels(alias=alias, event=event).inc(stats[key])
+        for key, phase in DURATIONS.items():
+            if stats.get(key):
+                DB_POOL_SECONDS.labels(alias=alias, phase=phase).inc(stats[key] / 1000)
+
+
+def close_pools():
+    """Close this process's pools (gunicorn worker_exit)"""
+    for alias in pools():
+        connections[alias].close_pool()
+
+
+def is_pool_exhausted(exception):
+    """True if exception (or what it wraps) is psycopg_pool giving up on a free connection"""
+    if PoolTimeout is None:
+        return False
+    while exception is not None:
+        if isinstance(exception, (PoolTimeout, TooManyRequests)):
+            return True
+        exception = exception.__cause__ or exception.__context__
+    return False
+
+
+class PoolTimeoutMiddleware(MiddlewareMixin):
+    """Turn an exhausted connection pool into a retryable 503"""
+
+    def process_exception(self, request, exception):
+        if not is_pool_exhausted(exception):
+            return None
+        logger.warning('Database pool exhausted: %s %s', request.method, request.path)
+        response = HttpResponse('We are busy right now. Please try again in a moment.', status=503)
+        response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+        return response
@@ -0,0 +1,70 @@
+"""
+Whole-image operations for the logo and favicon scripts.
+
+Everything here works on complete bands with Pillow's C operations
+(``point``, ``ImageChops``, masked ``paste``) instead of looping over
+``getdata()`` in Python, so a multi-megapixel logo is processed in
+milliseconds without building a list of pixel tuples.
+"""
+from PIL import Image, ImageChops
+
+WHITE_THRESHOLD = 240
+
+
+def near_white_mask(img, threshold=WHITE_THRESHOLD):
+    """'L' mask that is 255 where R, G and B are all above threshold"""
+    r, g, b = img.convert('RGB').split()
+    darkest = ImageChops.darker(ImageChops.darker(r, g), b)
+    return darkest.point(lambda v: 255 if v > threshold else 0)
+
+
+def white_to_alpha(img, threshold=WHITE_THRESHOLD):
+    """Return an RGBA copy with near-white pixels made fully transparent white"""
+    img = img.convert('RGBA')
+    img.paste((255, 255, 255, 0), mask=near_white_mask(img, threshold))
+    return img
+
+
+def trim(img):
+    """Crop to the bounding box of non-transparent pixels; returns (image, bbox)"""
+    alpha = img.getchannel('A') if 'A' in img.getbands() else None
+    bbox = alpha.getbbox() if alpha is not None else img.getbbox()
+    if bbox is None:
+        return img, None
+    return img.crop(bbox), bbox
+
+
+def center_square(img):
+    """Crop the largest centred square"""
+    width, height = img.size
+    size = min(width, height)
+    left = (width - size) // 2
+    top = (height - size) // 2
+    return img.crop((left, top, left + size, top + size))
+
+
+def square_icon(img, size):
+    """Centre-square crop resized to size x size"""
+    square = center_square(img.convert('RGBA'))
+    if square.size != (size, size):
+        square = square.resize((size, size), Image.LANCZOS)
+    return square
+
+
+def fit_within(img, max_dimension):
+    """Downscale so the longest side is at most max_dimension, keeping aspect ratio"""
+    width, height = img.size
+    if max(width, height) <= max_dimension:
+        return img
+    scale = max_dimension / max(width, height)
+    return img.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+
+
+def flatten(img, background=(255, 255, 255)):
+    """Composite an image with transparency onto a solid RGB background"""
+    if 'A' not in img.getbands():
+        return img.convert('RGB')
+    img = img.convert('RGBA')
+    base = Image.new('RGB', img.size, background)
+    base.paste(img, mask=img.getchannel('A'))
+    return base
@@ -0,0 +1,109 @@
+"""
+Pooled SMTP email backend.
+
+Django's SMTP backend connects, does STARTTLS and logs in for every
+``send_mail`` call. This backend keeps authenticated connections in a small
+per-process pool instead, so the TLS handshake is paid once and reused by
+later batches. Idle connections are health-checked with NOOP before reuse and
+dropped once they have been idle longer than EMAIL_POOL_MAX_IDLE.
+
+Every socket operation is bounded by EMAIL_TIMEOUT. On a timeout smtplib
+closes the socket and raises SMTPServerDisconnected, and ``close()`` never
+pools a closed connection, so a stalled session is dropped, not reused.
+"""
+import smtplib
+import ssl
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail.backends import smtp
+
+# Connections idle for less than this are reused without a NOOP round trip
+NOOP_AFTER_IDLE = 5
+
+
+def _quit_quietly(connection):
+    try:
+        connection.quit()
+    except (ssl.SSLError, smtplib.SMTPException, OSError):
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+
+class SMTPConnectionPool:
+    """Idle SMTP connections keyed by server and credentials"""
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        """Return a live idle connection for key, or None if a new one is needed"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                entries = self._idle.get(key)
+                if not entries:
+                    return None
+                connection, last_used = entries.pop()
+            idle_for = now - last_used
+            if idle_for > settings.EMAIL_POOL_MAX_IDLE:
+                _quit_quietly(connection)
+                continue
+            if idle_for > NOOP_AFTER_IDLE:
+                try:
+                    status, _ = connection.noop()
+                except (smtplib.SMTPException, OSError):
+                    status = None
+                if status != 250:
+                    _quit_quietly(connection)
+                    continue
+            return connection
+
+    def release(self, key, connection):
+        """Return a connection to the pool; False if the pool is full and the caller should close it"""
+        with self._lock:
+            entries = self._idle.setdefault(key, [])
+            if len(entries) >= settings.EMAIL_POOL_SIZE:
+                return False
+            entries.append((connection, time.monotonic()))
+            return True
+
+    def clear(self):
+        """Close every idle connection"""
+        with self._lock:
+            entries = [connection for pooled in self._idle.values() for connection, _ in pooled]
+            self._idle = {}
+        for connection in entries:
+            _quit_quietly(connection)
+
+
+pool = SMTPConnectionPool()
+
+
+class PooledSMTPEmailBackend(smtp.EmailBackend):
+    """SMTP backend that borrows connections from the process-wide pool"""
+
+    def _pool_key(self):
+        return (self.host, self.port, self.username, self.use_tls, self.use_ssl)
+
+    def open(self):
+        if self.connection:
+            return False
+        connection = pool.acquire(self._pool_key())
+        if connection is not None:
+            self.connection = connection
+            return True
+        return super().open()
+
+    def close(self):
+        if self.connection is None:
+            return super().close()
+        connection, self.connection = self.connection, None
+        # smtplib drops the socket when the server disconnects; never pool a dead connection
+        if connection.sock is None or not pool.release(self._pool_key(), connection):
+            _quit_quietly(connection)
+        super().close()
@@ -0,0 +1,186 @@
+import hashlib
+import json
+import platform
+import stat
+import subprocess
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+
+from core.critical_css import critical_css_path
+
+HTMX_VERSION = '2.0.4'
+ALPINE_VERSION = '3.14.8'
+FONT_AWESOME_VERSION = '6.5.1'
+FONT_AWESOME_URL = f'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/{FONT_AWESOME_VERSION}'
+FONT_AWESOME_FONTS = ['fa-brands-400', 'fa-regular-400', 'fa-solid-900', 'fa-v4compatibility']
+
+# Pinned third-party assets, copied under FRONTEND_OUTPUT_DIR
+VENDOR_FILES = {
+    'vendor/htmx.min.js': f'https://unpkg.com/htmx.org@{HTMX_VERSION}/dist/htmx.min.js',
+    'vendor/alpine.min.js': f'https://cdn.jsdelivr.net/npm/alpinejs@{ALPINE_VERSION}/dist/cdn.min.js',
+    'vendor/fontawesome/css/all.min.css': f'{FONT_AWESOME_URL}/css/all.min.css',
+    **{
+        f'vendor/fontawesome/webfonts/{font}.{ext}': f'{FONT_AWESOME_URL}/webfonts/{font}.{ext}'
+        for font in FONT_AWESOME_FONTS for ext in ('woff2', 'ttf')
+    },
+}
+TAILWIND_RELEASE_URL = 'https://github.com/tailwindlabs/tailwindcss/releases/download/v{version}/tailwindcss-{target}'
+TAILWIND_TARGETS = {
+    ('Linux', 'x86_64'): 'linux-x64',
+    ('Linux', 'aarch64'): 'linux-arm64',
+    ('Darwin', 'x86_64'): 'macos-x64',
+    ('Darwin', 'arm64'): 'macos-arm64',
+    ('Windows', 'AMD64'): 'windows-x64.exe',
+}
+CSS_OUTPUT = 'dist/app.css'
+# Python sources that contain Tailwind classes (form widgets, template tags)
+PYTHON_CONTENT = ['*/forms.py', '*/templatetags/*.py']
+
+
+def template_sources(name, seen=None):
+    """Files of a template plus every template it extends or includes by a literal name"""
+    seen = {} if seen is None else seen
+    template = get_template(name).template
+    if template.origin.name in seen:
+        return seen
+    seen[template.origin.name] = name
+    nodelist = template.nodelist
+    for node in nodelist.get_nodes_by_type(ExtendsNode):
+        if isinstance(node.parent_name.var, str):
+            template_sources(node.parent_name.var, seen)
+    for node in nodelist.get_nodes_by_type(IncludeNode):
+        if isinstance(node.template.var, str):
+            template_sources(node.template.var, seen)
+    return seen
+
+
+class Command(BaseCommand):
+    help = 'Builds the purged Tailwind CSS bundle and vendors pinned JS/CSS into static/ (run before collectstatic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-css', action='store_true', help='Only vendor the pinned third-party assets')
+        parser.add_argument(
+            '--update-lock', action='store_true',
+            help='Also pin the Tailwind CLI of every other platform in vendor.lock.json; commit the result',
+        )
+        parser.add_argument(
+            '--locked', action='store_true',
+            help='Fail on any download that vendor.lock.json does not pin (for builds once the lock is committed)',
+        )
+
+    def handle(self, *args, **options):
+        self.output_dir = Path(settings.FRONTEND_OUTPUT_DIR)
+        self.lock_path = Path(settings.FRONTEND_SOURCE_DIR) / 'vendor.lock.json'
+        try:
+            self.lock = json.loads(self.lock_path.read_text())
+        except (OSError, ValueError):
+            self.lock = {}
+        self.lock_changed = False
+        self.update_lock = options['update_lock']
+        self.require_lock = options['locked']
+
+        fetched = sum(self.fetch(url, self.output_dir / name, name) for name, url in VENDOR_FILES.items())
+        self.stdout.write(f'   Vendored {len(VENDOR_FILES)} file(s), {fetched} downloaded')
+
+        if not options['skip_css']:
+            self.build_css()
+
+        if self.lock_changed:
+            self.lock_path.write_text(json.dumps(self.lock, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.WARNING(f'   Updated {self.lock_path.name} - commit it to pin the new downloads'))
+        self.stdout.write(self.style.SUCCESS('✅ Front-end bundle ready'))
+
+    def locked(self, url, lock_key):
+        """The lock entry for url, or None (the download gets pinned); with --locked an unpinned download is an error"""
+        locked = self.lock.get(lock_key)
+        if locked and locked['url'] != url:
+            locked = None  # version bump: re-pin
+        if locked is None and self.require_lock:
+            raise CommandError(
+                f'{url} is not pinned in {self.lock_path.name}; '
+                f'run "python manage.py build_frontend --update-lock" and commit the lock file'
+            )
+        return locked
+
+    def download(self, url, lock_key, locked):
+        """Download url and check it against the lock entry, pinning it if there is none"""
+        try:
+            with urlopen(url, timeout=60) as response:
+                data = response.read()
+        except OSError as e:
+            raise CommandError(f'Could not download {url}: {e}')
+        digest = hashlib.sha256(data).hexdigest()
+        if locked and digest != locked['sha256']:
+            raise CommandError(f'Checksum mismatch for {url}: expected {locked["sha256"]}, got {digest}')
+        if not locked:
+            self.lock[lock_key] = {'url': url, 'sha256': digest}
+            self.lock_changed = True
+        return data
+
+    def fetch(self, url, dest, lock_key):
+        """Download url to dest unless it is already there; verify against the lock. Returns True if downloaded."""
+        locked = self.locked(url, lock_key)
+        if locked and dest.exists() and hashlib.sha256(dest.read_bytes()).hexdigest() == locked['sha256']:
+            return False
+        data = self.download(url, lock_key, locked)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(data)
+        return True
+
+    def tailwind_cli(self):
+        """Path to the Tailwind standalone CLI, downloading the pinned release if needed"""
+        if settings.TAILWIND_CLI_PATH:
+            return Path(settings.TAILWIND_CLI_PATH)
+
+        target = TAILWIND_TARGETS.get((platform.system(), platform.machine()))
+        if target is None:
+            raise CommandError(
+                f'No Tailwind standalone CLI for {platform.system()} {platform.machine()}; set TAILWIND_CLI_PATH'
+            )
+        version = settings.TAILWIND_CLI_VERSION
+        if self.update_lock:
+            # Pin every platform's binary, so builds on other machines verify theirs too
+            for other in TAILWIND_TARGETS.values():
+                if other != target:
+                    url = TAILWIND_RELEASE_URL.format(version=version, target=other)
+                    name = f'tailwindcss-{version}-{other}'
+                    locked = self.locked(url, name)
+                    if not locked:
+                        self.download(url, name, locked)
+        name = f'tailwindcss-{version}-{target}'
+        cli = Path(settings.FRONTEND_TOOLS_DIR) / name
+        if self.fetch(TAILWIND_RELEASE_URL.format(version=version, target=target), cli, name):
+            cli.chmod(cli.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        return cli
+
+    def build_css(self):
+        cli = self.tailwind_cli()
+        self.run_tailwind(cli, self.output_dir / CSS_OUTPUT)
+
+        # Critical CSS: only the rules used by one page's own templates
+        python_content = [str(Path(settings.BASE_DIR) / pattern) for pattern in PYTHON_CONTENT]
+        for template_name in settings.CRITICAL_CSS_TEMPLATES:
+            content = list(template_sources(template_name)) + python_content
+            self.run_tailwind(cli, Path(critical_css_path(template_name)), content)
+
+    def run_tailwind(self, cli, output, content=None):
+        source_dir = Path(settings.FRONTEND_SOURCE_DIR)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        command = [
+            str(cli),
+            '--config', str(source_dir / 'tailwind.config.js'),
+            '--input', str(source_dir / 'app.css'),
+            '--output', str(output),
+            '--minify',
+        ]
+        if content:
+            command += ['--content', ','.join(content)]
+        result = subprocess.run(command, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f'Tailwind build failed:\n{result.stderr}')
+        self.stdout.write(f'   {output.relative_to(self.output_dir).as_posix()}: {output.stat().st_size / 1024:.1f} KB')
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image, features
+
+SOURCE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+# Encoder settings per output format
+ENCODERS = {
+    'avif': {'format': 'AVIF', 'options': {'quality': 50}},
+    'webp': {'format': 'WEBP', 'options': {'quality': 80, 'method': 6}},
+    'png': {'format': 'PNG', 'options': {'optimize': True}},
+    'jpg': {'format': 'JPEG', 'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+
+class Command(BaseCommand):
+    help = 'Builds resized WebP/AVIF/PNG variants of static/images and a manifest for {% responsive_image %}'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild even if the source is unchanged')
+
+    def handle(self, *args, **options):
+        source_dir = Path(settings.RESPONSIVE_IMAGES_SOURCE_DIR)
+        output_dir = source_dir / settings.RESPONSIVE_IMAGES_OUTPUT_SUBDIR
+        manifest_path = output_dir / 'manifest.json'
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            manifest = {}
+
+        formats = [fmt for fmt in settings.RESPONSIVE_IMAGE_FORMATS if fmt != 'avif' or features.check('avif')]
+        params = {'widths': settings.RESPONSIVE_IMAGE_WIDTHS, 'formats': formats}
+        built = skipped = 0
+        sources = sorted(
+            path for path in source_dir.rglob('*')
+            if path.suffix.lower() in SOURCE_EXTENSIONS and output_dir not in path.parents
+        )
+
+        for source in sources:
+            name = source.relative_to(source_dir.parent).as_posix()  # e.g. images/logo.png
+            digest = hashlib.sha256(source.read_bytes()).hexdigest()
+            entry = manifest.get(name)
+            if not options['force'] and entry and entry['hash'] == digest and entry['params'] == params:
+                skipped += 1
+                continue
+            manifest[name] = self.build(source, digest, params, output_dir, source_dir.parent)
+            built += 1
+            count = sum(len(files) for files in manifest[name]['variants'].values())
+            self.stdout.write(f'   {name}: {count} variant(s)')
+
+        # Drop entries whose source image was removed
+        names = {source.relative_to(source_dir.parent).as_posix() for source in sources}
+        manifest = {name: entry for name, entry in manifest.items() if name in names}
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+        # Remove variants no longer referenced (old content hashes, deleted sources)
+        referenced = {
+            variant['path'] for entry in manifest.values()
+            for files in entry['variants'].values() for variant in files
+        }
+        for path in output_dir.iterdir():
+            if path != manifest_path and path.relative_to(source_dir.parent).as_posix() not in referenced:
+                path.unlink()
+        self.stdout.write(self.style.SUCCESS(f'✅ Built {built} image(s), {skipped} unchanged'))
+
+    def build(self, source, digest, params, output_dir, static_root):
+        """Write every width/format variant of one image; returns its manifest entry"""
+        image = Image.open(source)
+        image.load()
+        width, height = image.size
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        fallback = 'png' if has_alpha else 'jpg'
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        widths = sorted({w for w in params['widths'] if w < width} | {min(width, max(params['widths']))})
+
+        variants = {}
+        for fmt in [f for f in params['formats'] if f in ('avif', 'webp')] + [fallback]:
+            encoder = ENCODERS[fmt]
+            for target_width in widths:
+                target_height = round(height * target_width / width)
+                resized = image if target_width == width else image.resize((target_width, target_height), Image.LANCZOS)
+                if fmt == 'jpg' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+                out = output_dir / f'{source.stem}-{digest[:8]}-{target_width}.{fmt}'
+                resized.save(out, encoder['format'], **encoder['options'])
+                variants.setdefault(fmt, []).append({
+                    'path': out.relative_to(static_root).as_posix(),
+                    'width': target_width,
+                    'bytes': out.stat().st_size,
+                })
+
+        return {
+            'hash': digest,
+            'params': params,
+            'width': width,
+            'height': height,
+            'fallback': fallback,
+            'variants': variants,
+        }
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued outbox emails in batches (runs continuously unless --once is given)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit')
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+                            help='Seconds to sleep between polls when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = process_outbox(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(self.style.SUCCESS(f'✅ Sent {sent} email(s)'))
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,69 @@
+"""
+Prometheus metrics shared by every gunicorn worker.
+
+prometheus_client runs in multiprocess mode: each process writes its samples
+to mmap'd files in PROMETHEUS_MULTIPROC_DIR (set in settings before this
+module is imported) and the ``/metrics`` view merges the files of all
+workers at scrape time. gunicorn.conf.py empties the directory when the
+master starts and marks exited workers dead.
+"""
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client import CONTENT_TYPE_LATEST  # noqa: F401  (re-exported for the view)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTES_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+REQUESTS = Counter('http_requests_total', 'Requests by URL name, method and status', ['view', 'method', 'status'])
+REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Request wall time', ['view'], buckets=SECONDS_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'SQL queries per request', ['view'], buckets=QUERY_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'SQL time per request', ['view'], buckets=SECONDS_BUCKETS
+)
+REQUEST_TEMPLATE_SECONDS = Histogram(
+    'http_request_template_seconds', 'Template render time per request', ['view'], buckets=SECONDS_BUCKETS
+)
+RESPONSE_BYTES = Histogram('http_response_bytes', 'Response body size', ['view'], buckets=BYTES_BUCKETS)
+
+SIGNUPS = Counter('signups_total', 'Waitlist signups created')
+RATE_LIMITED = Counter('ratelimit_rejections_total', 'Requests rejected by a rate limit', ['limiter'])
+EMAILS = Counter('outbox_emails_total', 'Outbox delivery attempts by outcome (sent, retry, failed)', ['category', 'outcome'])
+DB_CONNECTIONS = Counter(
+    'db_connections_opened_total', 'Database connections opened by Django (pool checkouts when pooled)', ['alias']
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Connection pool state summed over live workers (size, available, waiting requests)',
+    ['alias', 'state'], multiprocess_mode='livesum',
+)
+DB_POOL_EVENTS = Counter(
+    'db_pool_events_total', 'Connection pool events (checkout, queued, timeout, connect, lost)', ['alias', 'event']
+)
+DB_POOL_SECONDS = Counter(
+    'db_pool_seconds_total', 'Time spent waiting for a pooled connection or opening a new one', ['alias', 'phase']
+)
+
+
+def observe_request(view, method, status, values):
+    """Record one request measured by PerformanceMiddleware"""
+    REQUESTS.labels(view=view, method=method, status=str(status)).inc()
+    REQUEST_SECONDS.labels(view=view).observe(values['duration_seconds'])
+    REQUEST_DB_QUERIES.labels(view=view).observe(values['db_queries'])
+    REQUEST_DB_SECONDS.labels(view=view).observe(values['db_seconds'])
+    REQUEST_TEMPLATE_SECONDS.labels(view=view).observe(values['template_seconds'])
+    RESPONSE_BYTES.labels(view=view).observe(values['response_bytes'])
+
+
+def connection_opened(sender, connection, **kwargs):
+    """connection_created receiver"""
+    DB_CONNECTIONS.labels(alias=connection.alias).inc()
+
+
+def render_latest():
+    """Prometheus text exposition of all workers' samples"""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
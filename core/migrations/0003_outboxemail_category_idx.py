@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['category', 'created_at'], name='core_outbox_category_idx'),
+        ),
+    ]
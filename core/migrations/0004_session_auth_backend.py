@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.contrib.sessions.backends.cached_db import KEY_PREFIX
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+
+# A logged-in session records the dotted path of the backend that authenticated it, and Django signs out
+# any session whose backend is no longer in AUTHENTICATION_BACKENDS. Sessions created under ModelBackend are
+# rewritten to CachedModelBackend (and back on reverse), so switching backends keeps everyone logged in.
+# The cached_db copy of each rewritten session is dropped so it is re-read from the database.
+# Signed-cookie sessions are stored in the browser and cannot be rewritten; those users log in again.
+MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+CACHED_MODEL_BACKEND = 'core.auth.CachedModelBackend'
+
+
+def rewrite_sessions(apps, old, new):
+    Session = apps.get_model('sessions', 'Session')
+    store = SessionStore()
+    cache = caches[settings.SESSION_CACHE_ALIAS]
+    for session in Session.objects.filter(expire_date__gt=timezone.now()).iterator():
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) != old:
+            continue
+        data[BACKEND_SESSION_KEY] = new
+        Session.objects.filter(pk=session.pk).update(session_data=store.encode(data))
+        cache.delete(KEY_PREFIX + session.pk)
+
+
+def forwards(apps, schema_editor):
+    rewrite_sessions(apps, MODEL_BACKEND, CACHED_MODEL_BACKEND)
+
+
+def backwards(apps, schema_editor):
+    rewrite_sessions(apps, CACHED_MODEL_BACKEND, MODEL_BACKEND)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_outboxemail_category_idx'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
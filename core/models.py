@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 class User(AbstractUser):
     """Custom user model with user type"""
@@ -14,3 +15,42 @@ class User(AbstractUser):
     
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
+
+
+class OutboxEmail(models.Model):
+    """Outgoing email queued for delivery by the outbox worker (see core/outbox.py)"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    )
+    
+    category = models.CharField(max_length=50, default='general', help_text="Kind of message, e.g. lead_notification")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    lease_token = models.CharField(max_length=32, blank=True, help_text="Worker currently delivering this message")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        verbose_name = 'Outbox Email'
+        verbose_name_plural = 'Outbox Emails'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due_idx'),
+            models.Index(fields=['lease_token'], name='core_outbox_lease_idx'),
+            models.Index(fields=['category', 'created_at'], name='core_outbox_category_idx'),
+        ]
+    
+    def __str__(self):
+        return f"[{self.status}] {self.subject}"
@@ -0,0 +1,247 @@
+"""
+Database-backed email outbox.
+
+Views call ``enqueue()`` which only writes an ``OutboxEmail`` row. Delivery
+happens later, in batches over a single SMTP connection, either from the
+in-process worker thread(s) or from ``python manage.py process_outbox``.
+Each gunicorn worker starts its threads as soon as it boots (the
+``post_worker_init`` hook in gunicorn.conf.py), so mail left pending or
+retrying across a deploy is picked up without waiting for a new enqueue.
+
+Rows are claimed with a short lease before sending, so several workers (or
+processes) can run side by side, and a worker that dies mid-batch only delays
+its messages until the lease expires - nothing queued is lost on restart.
+
+Categories listed in EMAIL_DIGEST_CATEGORIES are coalesced when volume is
+high: once EMAIL_DIGEST_THRESHOLD messages of a category arrive within
+EMAIL_DIGEST_WINDOW seconds, further ones are held until the end of the
+window and delivered together as a single digest email.
+"""
+import logging
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .metrics import EMAILS
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+
+
+def enqueue(subject, body, recipient_list, from_email=None, category='general'):
+    """Queue an email for delivery and wake the in-process worker once the transaction commits"""
+    now = timezone.now()
+    message = OutboxEmail.objects.create(
+        category=category,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+        next_attempt_at=_digest_send_time(category, now) or now,
+    )
+    transaction.on_commit(wake_worker)
+    return message
+
+
+def _digest_send_time(category, now):
+    """End of the current digest window if this category is busy, else None"""
+    if category not in settings.EMAIL_DIGEST_CATEGORIES:
+        return None
+    window = settings.EMAIL_DIGEST_WINDOW
+    recent = OutboxEmail.objects.filter(
+        category=category, created_at__gte=now - timedelta(seconds=window)
+    )[:settings.EMAIL_DIGEST_THRESHOLD].count()
+    if recent + 1 < settings.EMAIL_DIGEST_THRESHOLD:
+        return None
+    window_start = now.timestamp() // window * window
+    return datetime.fromtimestamp(window_start + window, tz=dt_timezone.utc)
+
+
+def coalesce(messages):
+    """Group claimed messages into (rows, EmailMessage) pairs, merging busy digest categories"""
+    groups = {}
+    for message in messages:
+        if message.category in settings.EMAIL_DIGEST_CATEGORIES:
+            key = (message.category, message.from_email, tuple(message.recipients))
+        else:
+            key = ('', message.pk)
+        groups.setdefault(key, []).append(message)
+
+    for rows in groups.values():
+        if len(rows) < settings.EMAIL_DIGEST_THRESHOLD:
+            for row in rows:
+                yield [row], EmailMessage(row.subject, row.body, row.from_email, row.recipients)
+            continue
+        separator = '\n' + '-' * 60 + '\n'
+        subject = f'{rows[0].subject} (+{len(rows) - 1} more)'
+        body = separator.join(row.body for row in rows)
+        yield rows, EmailMessage(subject, body, rows[0].from_email, rows[0].recipients)
+
+
+def retry_delay(attempts):
+    """Exponential backoff (with jitter) before the next delivery attempt"""
+    base = settings.EMAIL_OUTBOX_RETRY_BACKOFF * (2 ** max(attempts - 1, 0))
+    delay = min(base, settings.EMAIL_OUTBOX_MAX_BACKOFF)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(batch_size=None):
+    """Lease up to batch_size due messages to this caller and return them"""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    available = Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lt=now)
+    due = Q(status=OutboxEmail.STATUS_PENDING, next_attempt_at__lte=now)
+
+    due_ids = list(
+        OutboxEmail.objects.filter(available, due)
+        .order_by('next_attempt_at', 'pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+
+    # Re-check the whole condition in the UPDATE: another worker may have sent the row
+    # or backed it off (both clear the lease) since the SELECT, and must not share it either
+    OutboxEmail.objects.filter(available, due, pk__in=due_ids).update(
+        lease_token=token,
+        lease_expires_at=now + timedelta(seconds=LEASE_SECONDS),
+    )
+    return list(OutboxEmail.objects.filter(lease_token=token).order_by('pk'))
+
+
+def _mark_sent(message):
+    message.status = OutboxEmail.STATUS_SENT
+    message.sent_at = timezone.now()
+    message.attempts += 1
+    message.lease_token = ''
+    message.lease_expires_at = None
+    message.last_error = ''
+    message.save(update_fields=['status', 'sent_at', 'attempts', 'lease_token', 'lease_expires_at', 'last_error'])
+    EMAILS.labels(category=message.category, outcome='sent').inc()
+
+
+def _mark_failed(message, error):
+    message.attempts += 1
+    message.last_error = str(error)[:2000]
+    message.lease_token = ''
+    message.lease_expires_at = None
+    if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        message.status = OutboxEmail.STATUS_FAILED
+        logger.error("Outbox email %s failed permanently: %s", message.pk, error)
+    else:
+        message.next_attempt_at = timezone.now() + retry_delay(message.attempts)
+        logger.warning("Outbox email %s failed (attempt %s), retrying: %s", message.pk, message.attempts, error)
+    message.save(update_fields=['status', 'attempts', 'last_error', 'lease_token', 'lease_expires_at', 'next_attempt_at'])
+    outcome = 'failed' if message.status == OutboxEmail.STATUS_FAILED else 'retry'
+    EMAILS.labels(category=message.category, outcome=outcome).inc()
+
+
+def deliver(messages, connection=None):
+    """Send already-claimed messages over one connection; returns the number of rows sent"""
+    if not messages:
+        return 0
+    connection = connection or get_connection()
+
+    try:
+        connection.open()
+    except Exception as e:
+        for message in messages:
+            _mark_failed(message, e)
+        return 0
+
+    sent = 0
+    try:
+        for rows, email in coalesce(messages):
+            try:
+                connection.send_messages([email])
+            except Exception as e:
+                for row in rows:
+                    _mark_failed(row, e)
+            else:
+                for row in rows:
+                    _mark_sent(row)
+                sent += len(rows)
+    finally:
+        connection.close()
+    return sent
+
+
+def process_outbox(batch_size=None, max_batches=None):
+    """Deliver due messages batch by batch until none are left; returns the number sent"""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        messages = claim_batch(batch_size)
+        if not messages:
+            break
+        total += deliver(messages)
+        batches += 1
+    return total
+
+
+class OutboxWorker:
+    """Bounded pool of background threads draining the outbox for this process"""
+
+    def __init__(self, num_threads, poll_interval):
+        self.num_threads = num_threads
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.num_threads:
+                thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def wake(self):
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                process_outbox()
+            except Exception:
+                logger.exception("Outbox worker iteration failed")
+            finally:
+                close_old_connections()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """Return this process's outbox worker, or None when in-process delivery is disabled"""
+    global _worker
+    if settings.EMAIL_OUTBOX_WORKERS <= 0:
+        return None
+    with _worker_lock:
+        if _worker is None:
+            _worker = OutboxWorker(settings.EMAIL_OUTBOX_WORKERS, settings.EMAIL_OUTBOX_POLL_INTERVAL)
+    return _worker
+
+
+def wake_worker():
+    """Nudge the in-process worker to deliver pending mail now"""
+    worker = get_worker()
+    if worker is not None:
+        worker.wake()
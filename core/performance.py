@@ -0,0 +1,260 @@
+"""
+Per-view request instrumentation.
+
+``PerformanceMiddleware`` measures every request and files the numbers under
+the resolved URL name (``pages:home``, ``login``, ``client_dashboard``, ...):
+
+- wall time through the rest of the middleware stack and the view;
+- number and total time of SQL queries: ``count_queries`` is installed as an
+  execute wrapper on every new connection and adds to the current request's
+  counter, found through a ContextVar, so queries that async views run on
+  ORM worker threads are counted too;
+- template render time (outermost renders, see core/templating.py);
+- response size in bytes.
+
+The middleware works in both WSGI and ASGI handler chains.
+
+Values go into fixed-bucket histograms held in process memory, so the cost
+per request is a few ``perf_counter()`` calls and one locked update. Every
+PERFORMANCE_METRICS_LOG_INTERVAL seconds the interval's histograms are
+written to the ``core.performance`` logger, one line per view, and reset.
+The same observations go to the cross-worker Prometheus metrics in
+core/metrics.py, along with django-ratelimit rejections.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+from .metrics import BYTES_BUCKETS, QUERY_BUCKETS, SECONDS_BUCKETS
+from .templating import install_render_hook, start_render_timer, stop_render_timer
+
+logger = logging.getLogger(__name__)
+
+METRICS = {
+    'duration_seconds': SECONDS_BUCKETS,
+    'db_queries': QUERY_BUCKETS,
+    'db_seconds': SECONDS_BUCKETS,
+    'template_seconds': SECONDS_BUCKETS,
+    'response_bytes': BYTES_BUCKETS,
+}
+UNRESOLVED = '<unresolved>'
+
+_query_counter = ContextVar('performance_query_counter', default=None)
+
+
+class Histogram:
+    """Counts of observations per bucket upper bound (the last bucket is +Inf)"""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class ViewStats:
+    """Histograms and status counts for one URL name"""
+
+    __slots__ = ('histograms', 'statuses')
+
+    def __init__(self):
+        self.histograms = {name: Histogram(bounds) for name, bounds in METRICS.items()}
+        self.statuses = {}
+
+    def record(self, status, values):
+        status_class = f'{status // 100}xx'
+        self.statuses[status_class] = self.statuses.get(status_class, 0) + 1
+        for name, value in values.items():
+            self.histograms[name].observe(value)
+
+
+class Registry:
+    """In-process per-view stats, flushed to the log on an interval"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.started = time.monotonic()
+
+    def record(self, view_name, status, values):
+        with self.lock:
+            stats = self.views.get(view_name)
+            if stats is None:
+                stats = self.views[view_name] = ViewStats()
+            stats.record(status, values)
+
+    def take(self):
+        """Return and reset the collected stats"""
+        with self.lock:
+            views, self.views = self.views, {}
+            started, self.started = self.started, time.monotonic()
+        return views, time.monotonic() - started
+
+    def flush(self):
+        views, interval = self.take()
+        for view_name, stats in sorted(views.items()):
+            duration = stats.histograms['duration_seconds']
+            queries = stats.histograms['db_queries']
+            logger.info(
+                'perf view=%s requests=%d rps=%.2f p50_ms=%.1f p95_ms=%.1f p99_ms=%.1f avg_queries=%.1f '
+                'avg_db_ms=%.1f avg_template_ms=%.1f avg_bytes=%d statuses=%s',
+                view_name, duration.count, duration.count / interval if interval else 0.0,
+                duration.quantile(0.5) * 1000, duration.quantile(0.95) * 1000, duration.quantile(0.99) * 1000,
+                queries.sum / queries.count,
+                stats.histograms['db_seconds'].sum * 1000 / duration.count,
+                stats.histograms['template_seconds'].sum * 1000 / duration.count,
+                stats.histograms['response_bytes'].sum / duration.count,
+                ','.join(f'{status}:{n}' for status, n in sorted(stats.statuses.items())),
+            )
+
+
+registry = Registry()
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries and their total time"""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def count_queries(execute, sql, params, many, context):
+    """Execute wrapper adding the query to the current request's QueryCounter, if any"""
+    counter = _query_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver: route the connection's queries through count_queries"""
+    # First in the list, so execute_wrapper() context managers still pop their own wrapper
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else UNRESOLVED
+
+
+def response_size(response):
+    if response.streaming:
+        return 0
+    return len(response.content)
+
+
+class PerformanceMiddleware:
+    """Record latency, SQL, template time and response size per URL name"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.PERFORMANCE_METRICS
+        self.next_flush = time.monotonic() + settings.PERFORMANCE_METRICS_LOG_INTERVAL
+        self.flush_lock = threading.Lock()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        if self.enabled:
+            install_render_hook()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        timers = self.start_timers()
+        try:
+            response = self.get_response(request)
+        finally:
+            values = self.stop_timers(timers)
+        self.record(request, response, values)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        timers = self.start_timers()
+        try:
+            response = await self.get_response(request)
+        finally:
+            values = self.stop_timers(timers)
+        self.record(request, response, values)
+        return response
+
+    def start_timers(self):
+        queries = QueryCounter()
+        return queries, _query_counter.set(queries), start_render_timer(), time.perf_counter()
+
+    def stop_timers(self, timers):
+        queries, query_token, render_token, start = timers
+        duration = time.perf_counter() - start
+        _query_counter.reset(query_token)
+        return {
+            'duration_seconds': duration,
+            'db_queries': queries.count,
+            'db_seconds': queries.seconds,
+            'template_seconds': stop_render_timer(render_token),
+        }
+
+    def record(self, request, response, values):
+        name = view_name(request)
+        values['response_bytes'] = response_size(response)
+        registry.record(name, response.status_code, values)
+        metrics.observe_request(name, request.method, response.status_code, values)
+        if getattr(request, 'limited', False):  # set by django-ratelimit
+            metrics.RATE_LIMITED.labels(limiter='ratelimit').inc()
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        if now < self.next_flush or not self.flush_lock.acquire(blocking=False):
+            return
+        try:
+            self.next_flush = now + settings.PERFORMANCE_METRICS_LOG_INTERVAL
+            registry.flush()
+        finally:
+            self.flush_lock.release()
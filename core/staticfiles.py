@@ -0,0 +1,37 @@
+"""
+WhiteNoise as async-capable middleware.
+
+WhiteNoise's middleware is sync-only. Under ASGI, Django runs a sync middleware
+through a worker thread. Everything below it then runs through a thread as well,
+so each request would hold a thread even in the async views. This subclass
+keeps the chain async. Static file lookups are a dict hit, except under
+autorefresh. Only the file open for a matched static file runs in a thread.
+Under WSGI it behaves exactly like WhiteNoise.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise import middleware
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,16 @@
+"""
+{% cached_date_hierarchy cl %}: the admin's date hierarchy with its queries cached (core/changelist.py)
+"""
+from django import template
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from core.changelist import cached_date_hierarchy
+
+register = template.Library()
+
+
+@register.tag(name='cached_date_hierarchy')
+def cached_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser, token, func=cached_date_hierarchy, template_name='date_hierarchy.html', takes_context=False
+    )
@@ -0,0 +1,105 @@
+"""
+Template tags for the responsive images built by ``manage.py build_images``.
+
+    {% load images %}
+    {% responsive_image 'images/247sign_edited.png' alt='Logo' sizes='20rem' class='h-48' %}
+    <div style="{% responsive_background 'images/hero.jpg' %}">
+
+Both fall back to the original file when the image has not been built yet.
+A source that is missing from the collected static files (no entry in the
+staticfiles manifest) is logged and left out - no background, an <img>
+pointing at the unhashed path - instead of failing the whole page.
+"""
+import json
+import logging
+import os
+from urllib.parse import quote, urljoin
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import PrefixNode, static
+from django.utils.html import format_html, format_html_join
+
+logger = logging.getLogger(__name__)
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp', 'png': 'image/png', 'jpg': 'image/jpeg'}
+# Browsers take the first source/candidate they support, so smallest formats go first
+PREFERENCE = ['avif', 'webp', 'png', 'jpg']
+
+_manifest = {'mtime': None, 'data': {}}
+
+
+def load_manifest():
+    """The build_images manifest, re-read only when the file changes"""
+    path = os.path.join(settings.RESPONSIVE_IMAGES_SOURCE_DIR, settings.RESPONSIVE_IMAGES_OUTPUT_SUBDIR, 'manifest.json')
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    if mtime != _manifest['mtime']:
+        with open(path) as f:
+            _manifest['data'] = json.load(f)
+        _manifest['mtime'] = mtime
+    return _manifest['data']
+
+
+def _original(name):
+    """static(name) for an unbuilt image, or None if the manifest storage has no entry for it"""
+    try:
+        return static(name)
+    except ValueError:
+        logger.warning('Static image %s is missing from the staticfiles manifest', name)
+        return None
+
+
+def _by_preference(entry):
+    return [(fmt, entry['variants'][fmt]) for fmt in PREFERENCE if fmt in entry['variants']]
+
+
+def _srcset(variants):
+    return ', '.join(f"{static(variant['path'])} {variant['width']}w" for variant in variants)
+
+
+@register.simple_tag
+def responsive_image(name, alt='', sizes='100vw', loading='lazy', **attrs):
+    """<picture> with AVIF/WebP sources and a srcset'd fallback <img>"""
+    entry = load_manifest().get(name)
+    extra = format_html_join('', ' {}="{}"', ((key.replace('_', '-'), value) for key, value in attrs.items()))
+    if not entry:
+        src = _original(name) or urljoin(PrefixNode.handle_simple('STATIC_URL'), quote(name))
+        return format_html('<img src="{}" alt="{}" loading="{}"{}>', src, alt, loading, extra)
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[fmt], _srcset(files), sizes) for fmt, files in _by_preference(entry) if fmt != entry['fallback']),
+    )
+    fallback = entry['variants'][entry['fallback']]
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}" decoding="async"{}></picture>',
+        sources, static(fallback[-1]['path']), _srcset(fallback), sizes,
+        entry['width'], entry['height'], alt, loading, extra,
+    )
+
+
+@register.simple_tag
+def responsive_background(name, width=1920):
+    """CSS background-image declarations using image-set() with AVIF/WebP and a plain fallback"""
+    entry = load_manifest().get(name)
+    if not entry:
+        url = _original(name)
+        return format_html("background-image: url('{}');", url) if url else ''
+
+    def pick(files):
+        fitting = [variant for variant in files if variant['width'] <= width]
+        return (fitting or files[:1])[-1]
+
+    fallback = pick(entry['variants'][entry['fallback']])
+    candidates = format_html_join(
+        ', ', "url('{}') type('{}')",
+        ((static(pick(files)['path']), MIME_TYPES[fmt]) for fmt, files in _by_preference(entry)),
+    )
+    return format_html(
+        "background-image: url('{}'); background-image: image-set({});",
+        static(fallback['path']), candidates,
+    )
@@ -0,0 +1,185 @@
+"""
+Template cache warm-up and render profiling.
+
+``warm_template_cache()`` compiles every template the Django engine can find
+(project ``templates/`` and every app's ``templates/`` directory) so the
+cached loader is full before the first request. The WSGI/ASGI entry points
+call it at startup when TEMPLATE_WARMUP is on.
+
+With TEMPLATE_PROFILING on, ``enable_render_profiling()`` wraps
+``Template._render``, which runs for every template: the one a view renders,
+the templates it extends, each ``{% include %}`` and templates rendered by
+tags such as crispy forms. For each template name it records calls, total
+(inclusive) time and self time (excluding nested templates). Stats are per
+process; ``render_stats()`` returns them and renders slower than
+TEMPLATE_PROFILING_SLOW_MS are logged with their slowest nested templates.
+
+The same hook gives request middleware the total template time of one request:
+``start_render_timer()`` / ``stop_render_timer()`` sum the outermost renders
+in the current context.
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+_stats = defaultdict(lambda: {'calls': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0})
+_stats_lock = threading.Lock()
+_local = threading.local()
+_hook = {'original': None, 'profile': False}
+_request_timer = ContextVar('template_render_timer', default=None)
+
+
+def template_names(engine):
+    """Every template name under the directories of the engine's loaders"""
+    loaders = []
+    for loader in engine.template_loaders:
+        loaders.extend(getattr(loader, 'loaders', [loader]))
+    names = set()
+    for loader in loaders:
+        for directory in loader.get_dirs():
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    if filename.endswith(TEMPLATE_EXTENSIONS):
+                        names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_template_cache():
+    """Compile every template so the cached loader holds them; returns (compiled, failed)"""
+    start = time.perf_counter()
+    compiled = failed = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+                compiled += 1
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                # Unused third-party templates may need tag libraries we don't install
+                failed += 1
+                logger.debug('Skipped template %s: %s', name, e)
+    logger.info(
+        'Warmed template cache: %d compiled, %d skipped in %.0f ms',
+        compiled, failed, (time.perf_counter() - start) * 1000,
+    )
+    return compiled, failed
+
+
+def _timed_render(self, context):
+    timer = _request_timer.get()
+    if timer is None and not _hook['profile']:
+        return _hook['original'](self, context)
+
+    if timer is not None:
+        timer['depth'] += 1
+    start = time.perf_counter()
+    try:
+        if _hook['profile']:
+            return _profiled_render(self, context)
+        return _hook['original'](self, context)
+    finally:
+        if timer is not None:
+            timer['depth'] -= 1
+            if timer['depth'] == 0:
+                timer['seconds'] += time.perf_counter() - start
+
+
+def _profiled_render(self, context):
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    frame = {'name': self.name or '<string>', 'children': 0.0, 'nested': {}}
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        return _hook['original'](self, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        own = elapsed - frame['children']
+        with _stats_lock:
+            entry = _stats[frame['name']]
+            entry['calls'] += 1
+            entry['total'] += elapsed
+            entry['self'] += own
+            entry['max'] = max(entry['max'], elapsed)
+        if stack:
+            parent = stack[-1]
+            parent['children'] += elapsed
+            parent['nested'][frame['name']] = parent['nested'].get(frame['name'], 0.0) + elapsed
+            for name, seconds in frame['nested'].items():
+                parent['nested'][name] = parent['nested'].get(name, 0.0) + seconds
+        elif elapsed * 1000 >= settings.TEMPLATE_PROFILING_SLOW_MS:
+            slowest = sorted(frame['nested'].items(), key=lambda item: item[1], reverse=True)[:5]
+            logger.warning(
+                'Slow template render: %s took %.1f ms (self %.1f ms); nested: %s',
+                frame['name'], elapsed * 1000, own * 1000,
+                ', '.join(f'{name} {seconds * 1000:.1f} ms' for name, seconds in slowest) or 'none',
+            )
+
+
+def install_render_hook():
+    """Wrap Template._render (once per process)"""
+    if _hook['original'] is None:
+        _hook['original'] = Template._render
+        Template._render = _timed_render
+
+
+def enable_render_profiling():
+    """Start collecting per-template stats in this process"""
+    install_render_hook()
+    _hook['profile'] = True
+
+
+def disable_render_profiling():
+    _hook['profile'] = False
+    if _hook['original'] is not None:
+        Template._render = _hook['original']
+        _hook['original'] = None
+
+
+def start_render_timer():
+    """Start summing template render time in the current context; returns a token"""
+    return _request_timer.set({'seconds': 0.0, 'depth': 0})
+
+
+def stop_render_timer(token):
+    """Seconds spent rendering templates since start_render_timer(token)"""
+    timer = _request_timer.get()
+    _request_timer.reset(token)
+    return timer['seconds']
+
+
+def render_stats():
+    """Per-template stats in milliseconds, slowest self time first"""
+    with _stats_lock:
+        rows = [
+            {
+                'template': name,
+                'calls': entry['calls'],
+                'total_ms': round(entry['total'] * 1000, 3),
+                'self_ms': round(entry['self'] * 1000, 3),
+                'avg_ms': round(entry['total'] * 1000 / entry['calls'], 3),
+                'max_ms': round(entry['max'] * 1000, 3),
+            }
+            for name, entry in _stats.items()
+        ]
+    return sorted(rows, key=lambda row: row['self_ms'], reverse=True)
+
+
+def reset_render_stats():
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,158 @@
+"""
+Client IP resolution and token-bucket throttling.
+
+Behind Railway's proxy REMOTE_ADDR is the proxy, not the visitor. ``client_ip``
+takes the address TRUSTED_PROXY_HOPS entries from the right of
+X-Forwarded-For (entries further left are client-supplied and can be forged).
+It is also wired into django-ratelimit through RATELIMIT_IP_META_KEY so
+``key='ip'`` means the real client everywhere.
+
+``throttle`` is a cheap per-client token bucket (GCRA: one float per client in
+the cache) that rejects bursts with 429 before the view builds a form or
+touches the database. IPv6 clients are bucketed by their /64, as in
+django-ratelimit: one host usually has a whole /64 to rotate through.
+
+Both decorators work on sync and async views. For async views, ``throttle``
+uses the async cache API. ``async_ratelimit`` is django-ratelimit's
+``@ratelimit`` for coroutines; its own decorator only wraps sync functions.
+"""
+import ipaddress
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+from django_ratelimit import ALL
+from django_ratelimit.core import is_ratelimited
+from django_ratelimit.exceptions import Ratelimited
+
+from .metrics import RATE_LIMITED
+
+
+def client_ip(request):
+    """Best-effort real client address for a request behind TRUSTED_PROXY_HOPS proxies"""
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops <= 0:
+        return remote_addr
+
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if not forwarded:
+        return remote_addr
+    candidate = forwarded[-hops] if len(forwarded) >= hops else forwarded[0]
+    try:
+        return str(ipaddress.ip_address(candidate))
+    except ValueError:
+        return remote_addr
+
+
+def client_key(request):
+    """Throttle key for a request: the client IPv4 address, or the /64 network of an IPv6 one"""
+    ip = client_ip(request)
+    try:
+        if ipaddress.ip_address(ip).version == 6:
+            return str(ipaddress.ip_network(f'{ip}/{settings.RATELIMIT_IPV6_MASK}', strict=False))
+    except ValueError:
+        pass
+    return ip
+
+
+def parse_rate(rate):
+    """'5/m' -> tokens per second (s, m, h, d periods)"""
+    count, period = rate.split('/')
+    seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0].lower()]
+    return int(count) / seconds
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` with room for `burst` requests, stored in the shared cache"""
+
+    def __init__(self, name, rate, burst):
+        self.name = name
+        self.interval = 1 / parse_rate(rate)
+        self.burst = burst
+
+    def consume(self, key, now=None):
+        """Take one token for key; returns (allowed, retry_after_seconds)"""
+        now = time.time() if now is None else now
+        cache_key = f'throttle:{self.name}:{key}'
+        new_tat, retry_after = self.take(cache.get(cache_key, now), now)
+        if new_tat is None:
+            return False, retry_after
+        cache.set(cache_key, new_tat, timeout=math.ceil(new_tat - now) + 1)
+        return True, 0
+
+    async def aconsume(self, key, now=None):
+        """consume() through the async cache API"""
+        now = time.time() if now is None else now
+        cache_key = f'throttle:{self.name}:{key}'
+        new_tat, retry_after = self.take(await cache.aget(cache_key, now), now)
+        if new_tat is None:
+            return False, retry_after
+        await cache.aset(cache_key, new_tat, timeout=math.ceil(new_tat - now) + 1)
+        return True, 0
+
+    def take(self, tat, now):
+        """Given the stored theoretical arrival time, return (new_tat, 0) or (None, retry_after)"""
+        # Theoretical arrival time: when the bucket would be full again
+        tat = max(tat, now)
+        new_tat = tat + self.interval
+        allow_at = new_tat - self.burst * self.interval
+        if allow_at > now:
+            return None, math.ceil(allow_at - now)
+        return new_tat, 0
+
+
+def too_many_requests(name, retry_after):
+    RATE_LIMITED.labels(limiter=name).inc()
+    response = HttpResponse('Too many requests. Please slow down.', status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def throttle(name, rate, burst, methods=('POST',)):
+    """Reject requests over the per-client token bucket with 429 before the view runs"""
+    bucket = TokenBucket(name, rate, burst)
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method in methods:
+                    allowed, retry_after = await bucket.aconsume(client_key(request))
+                    if not allowed:
+                        return too_many_requests(name, retry_after)
+                return await view_func(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                allowed, retry_after = bucket.consume(client_key(request))
+                if not allowed:
+                    return too_many_requests(name, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def async_ratelimit(group=None, key=None, rate=None, method=ALL, block=True):
+    """django-ratelimit's @ratelimit for async views (same arguments and request.limited flag)"""
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapper(request, *args, **kwargs):
+            old_limited = getattr(request, 'limited', False)
+            ratelimited = await sync_to_async(is_ratelimited)(
+                request=request, group=group, fn=view_func, key=key, rate=rate, method=method, increment=True,
+            )
+            request.limited = ratelimited or old_limited
+            if ratelimited and block:
+                cls = getattr(settings, 'RATELIMIT_EXCEPTION_CLASS', Ratelimited)
+                raise (import_string(cls) if isinstance(cls, str) else cls)()
+            return await view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
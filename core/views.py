@@ -1,7 +1,16 @@
+import os
+
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.cache import never_cache
+from .metrics import CONTENT_TYPE_LATEST, render_latest
+from .templating import render_stats
 
 def login_view(request):
     """Login view that redirects based on user type"""
@@ -32,3 +41,27 @@ def dashboard(request):
     else:
         return redirect('admin:index')
 
+
+@never_cache
+@staff_member_required
+def template_stats(request):
+    """Per-template render timings for this process (needs TEMPLATE_PROFILING=True)"""
+    return JsonResponse({
+        'profiling': settings.TEMPLATE_PROFILING,
+        'pid': os.getpid(),
+        'templates': render_stats(),
+    })
+
+@never_cache
+def metrics(request):
+    """Prometheus metrics merged across workers - staff session or METRICS_TOKEN bearer token"""
+    user = request.user
+    token = settings.METRICS_TOKEN
+    authorized = (user.is_authenticated and user.is_staff) or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        response = HttpResponse('Authentication required', status=401, content_type='text/plain')
+        response['WWW-Authenticate'] = 'Bearer'
+        return response
+    return HttpResponse(render_latest(), content_type=CONTENT_TYPE_LATEST)
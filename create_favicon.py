@@ -7,6 +7,8 @@ try:
     from PIL import Image
     import os
     
+    from core.imageops import square_icon
+    
     # Paths
     logo_path = 'static/images/247sign_edited.png'
     favicon_path = 'static/images/favicon.png'
@@ -21,22 +23,8 @@ try:
     # Open and process logo
     img = Image.open(logo_path)
     
-    # Convert to RGBA if needed
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
-    
-    # Create square crop from center
-    width, height = img.size
-    size = min(width, height)
-    left = (width - size) / 2
-    top = (height - size) / 2
-    right = (width + size) / 2
-    bottom = (height + size) / 2
-    
-    img_cropped = img.crop((left, top, right, bottom))
-    
-    # Resize to 512x512 (good quality for all uses)
-    img_favicon = img_cropped.resize((512, 512), Image.LANCZOS)
+    # Square crop from center, resized to 512x512 (good quality for all uses)
+    img_favicon = square_icon(img, 512)
     
     # Save as favicon
     img_favicon.save(favicon_path, 'PNG', optimize=True)
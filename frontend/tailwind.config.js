@@ -0,0 +1,22 @@
+/** Tailwind config for `python manage.py build_frontend` (paths are relative to this file) */
+module.exports = {
+  content: {
+    relative: true,
+    files: [
+      '../templates/**/*.html',
+      '../*/templates/**/*.html',
+      '../*/forms.py',
+      '../*/templatetags/*.py',
+    ],
+  },
+  theme: {
+    extend: {
+      colors: {
+        primary: '#1e40af',
+        secondary: '#dc2626',
+        accent: '#fbbf24',
+      },
+    },
+  },
+  plugins: [],
+}
@@ -0,0 +1,52 @@
+"""
+gunicorn settings picked up automatically from the project root.
+
+SERVER_MODE picks the application and worker class: the WSGI app on gunicorn's
+threaded workers (default), or SERVER_MODE=asgi for the ASGI app on uvicorn
+workers. The hooks for Prometheus multiprocess metrics, database pools and
+the in-process outbox worker also live here; workers, threads and binding stay on the command line
+(Procfile / railway.json).
+"""
+import os
+import shutil
+from pathlib import Path
+
+import decouple
+
+# Same default as config/settings.py; set before any worker imports prometheus_client.
+# (decouple.config is not imported by name: gunicorn reads "config" as one of its settings)
+metrics_dir = decouple.config('PROMETHEUS_MULTIPROC_DIR', default=str(Path(__file__).resolve().parent / '.metrics'))
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', metrics_dir)
+
+if decouple.config('SERVER_MODE', default='wsgi') == 'asgi':
+    wsgi_app = 'config.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'  # --threads does not apply
+else:
+    wsgi_app = 'config.wsgi:application'
+
+
+def on_starting(server):
+    """Drop samples left over from a previous run"""
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_worker_init(worker):
+    """Start the outbox worker now, so mail queued before a restart goes out without waiting for a new signup"""
+    from core.outbox import wake_worker
+
+    wake_worker()
+
+
+def child_exit(server, worker):
+    """Let /metrics forget live gauges of dead workers"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Close the worker's database connection pools so Postgres sees the connections go"""
+    from core.dbpool import close_pools
+
+    close_pools()
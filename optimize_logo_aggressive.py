@@ -7,6 +7,8 @@ try:
     from PIL import Image
     import os
     
+    from core.imageops import fit_within, flatten
+    
     # Paths
     original_logo = 'static/images/247sign_edited.png'
     optimized_logo = 'static/images/247sign_web.png'
@@ -27,24 +29,13 @@ try:
     print(f"   Original: {original_width}x{original_height}px")
     
     # Resize to reasonable web size (max 1200px on longest side)
-    max_dimension = 1200
-    if max(original_width, original_height) > max_dimension:
-        if original_width > original_height:
-            new_width = max_dimension
-            new_height = int(original_height * (max_dimension / original_width))
-        else:
-            new_height = max_dimension
-            new_width = int(original_width * (max_dimension / original_height))
-        
-        img = img.resize((new_width, new_height), Image.LANCZOS)
-        print(f"   Resized: {new_width}x{new_height}px")
+    img = fit_within(img, 1200)
+    if img.size != (original_width, original_height):
+        print(f"   Resized: {img.size[0]}x{img.size[1]}px")
     
     # Convert to RGB if RGBA (smaller file size)
     if img.mode == 'RGBA':
-        # Create white background
-        background = Image.new('RGB', img.size, (255, 255, 255))
-        background.paste(img, mask=img.split()[3] if len(img.split()) == 4 else None)
-        img = background
+        img = flatten(img, (255, 255, 255))
         print(f"   Converted RGBA to RGB")
     
     # Save with optimization
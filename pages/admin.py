@@ -1,17 +1,93 @@
-from django.contrib import admin
-from .models import EmailSignup
+import csv
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from core.changelist import LargeTableAdminMixin
+from .export import FORMATS, export_signups
+from .imports import import_signups
+from .verification import queue_verification_emails
+from .models import EmailDomainRule, EmailSignup
+
+class SignupImportForm(forms.Form):
+    file = forms.FileField(help_text='CSV with a header row: first_name, last_name, email, phone[, marketing_consent]')
+
 
 @admin.register(EmailSignup)
-class EmailSignupAdmin(admin.ModelAdmin):
+class EmailSignupAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    change_list_template = 'admin/pages/emailsignup/change_list.html'
     list_display = ['email', 'first_name', 'last_name', 'phone', 'email_verified', 'marketing_consent', 'created_at']
     list_filter = ['email_verified', 'marketing_consent', 'created_at']
     search_fields = ['email', 'first_name', 'last_name', 'phone']
-    readonly_fields = ['created_at', 'verification_token']
+    readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
     
-    actions = ['mark_as_verified']
+    actions = ['mark_as_verified', 'send_verification_email', 'export_csv', 'export_ndjson']
     
     @admin.action(description='Mark selected as verified')
     def mark_as_verified(self, request, queryset):
         updated = queryset.update(email_verified=True)
         self.message_user(request, f'{updated} signup(s) marked as verified.')
+    
+    @admin.action(description='Send verification email to selected')
+    def send_verification_email(self, request, queryset):
+        queued = queue_verification_emails(queryset, request.build_absolute_uri('/'))
+        self.message_user(request, f'{queued} verification email(s) queued.')
+    
+    @admin.action(description='Export selected as CSV')
+    def export_csv(self, request, queryset):
+        return self.export(queryset, 'csv')
+    
+    @admin.action(description='Export selected as NDJSON')
+    def export_ndjson(self, request, queryset):
+        return self.export(queryset, 'ndjson')
+    
+    def export(self, queryset, fmt):
+        """Stream the selection (or, with "select all", the whole filtered changelist) as a download"""
+        response = StreamingHttpResponse(export_signups(queryset, fmt), content_type=FORMATS[fmt])
+        filename = f'signups-{timezone.now():%Y%m%d-%H%M}.{fmt}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='pages_emailsignup_import'),
+        ] + super().get_urls()
+    
+    def import_view(self, request):
+        """Upload a CSV of offline signups; rejected rows are listed on the result page"""
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = SignupImportForm(request.POST or None, request.FILES or None)
+        report = None
+        if request.method == 'POST' and form.is_valid():
+            upload = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                report = import_signups(upload)
+            except (UnicodeDecodeError, ValueError, csv.Error) as e:
+                form.add_error('file', str(e))
+            else:
+                self.message_user(request, f'Import finished: {report}.', messages.SUCCESS)
+                if not report.errors:
+                    return redirect('admin:pages_emailsignup_changelist')
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import signups',
+            'form': form,
+            'report': report,
+        }
+        return TemplateResponse(request, 'admin/pages/emailsignup/import.html', context)
+
+
+@admin.register(EmailDomainRule)
+class EmailDomainRuleAdmin(admin.ModelAdmin):
+    list_display = ['domain', 'action', 'note', 'created_at']
+    list_filter = ['action']
+    search_fields = ['domain', 'note']
@@ -0,0 +1,90 @@
+"""
+Disposable email domain blocklist used by signup validation.
+
+The bundled list (DISPOSABLE_DOMAINS_FILE, one domain per line) merges two
+maintained MIT-licensed lists of about 60,000 domains; the file header records
+the sources and versions. It is loaded into a frozenset once per process. It is re-read only when the file's mtime
+changes, so a deploy or an edit to the file takes effect without a restart.
+A lookup walks the address's domain labels from the right: for
+``a.b.mailinator.com`` it probes ``com``, ``mailinator.com``, ``b.mailinator.com``,
+then ``a.b.mailinator.com``. Each probe is one hash lookup, so the cost depends
+on the number of labels and not on the list size. The same probes also
+catch subdomains of a blocked domain.
+
+Admins can add EmailDomainRule rows to allow or block a domain (and its
+subdomains). The rules are kept in memory for EMAIL_DOMAIN_RULES_TTL
+seconds. Saving or deleting a rule clears the copy in the process that made
+the change; other workers pick it up when their TTL runs out. When several
+rules or list entries match, the most specific domain wins, and at equal
+depth an admin rule beats the file. Allowing ``school.mailinator.com`` thus
+overrides a blocked ``mailinator.com``.
+"""
+import os
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import EmailDomainRule
+
+_domains = {'path': None, 'mtime': None, 'data': frozenset()}
+_rules = {'expires': 0.0, 'data': {}}
+
+
+def load_domains():
+    """The bundled blocklist as a frozenset, re-read only when the file changes"""
+    path = settings.DISPOSABLE_DOMAINS_FILE
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return frozenset()
+    if path != _domains['path'] or mtime != _domains['mtime']:
+        with open(path, encoding='utf-8') as f:
+            _domains['data'] = frozenset(
+                domain for domain in (line.split('#', 1)[0].strip().strip('.').lower() for line in f) if domain
+            )
+        _domains['path'], _domains['mtime'] = path, mtime
+    return _domains['data']
+
+
+def _store_rules(rows):
+    _rules['data'] = {domain: action == EmailDomainRule.ACTION_BLOCK for domain, action in rows}
+    _rules['expires'] = time.monotonic() + settings.EMAIL_DOMAIN_RULES_TTL
+    return _rules['data']
+
+
+def load_rules():
+    """Admin overrides as {domain: is_blocked}, reloaded every EMAIL_DOMAIN_RULES_TTL seconds"""
+    if time.monotonic() < _rules['expires']:
+        return _rules['data']
+    return _store_rules(list(EmailDomainRule.objects.values_list('domain', 'action')))
+
+
+async def aload_rules():
+    """load_rules() on the async ORM"""
+    if time.monotonic() < _rules['expires']:
+        return _rules['data']
+    return _store_rules([row async for row in EmailDomainRule.objects.values_list('domain', 'action')])
+
+
+def is_disposable(domain, rules=None):
+    """Whether an email domain (or a parent domain) is blocked; rules defaults to load_rules()"""
+    labels = domain.strip().strip('.').lower().split('.')
+    domains = load_domains()
+    rules = load_rules() if rules is None else rules
+    blocked = False
+    for i in range(len(labels) - 1, -1, -1):
+        suffix = '.'.join(labels[i:])
+        if suffix in rules:
+            blocked = rules[suffix]
+        elif suffix in domains:
+            blocked = True
+    return blocked
+
+
+@receiver(post_save, sender=EmailDomainRule)
+@receiver(post_delete, sender=EmailDomainRule)
+def forget_rules(sender, **kwargs):
+    """Reload the overrides on the next lookup in this process"""
+    _rules['expires'] = 0.0
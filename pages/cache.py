@@ -0,0 +1,143 @@
+"""
+Full-page cache for the static marketing pages.
+
+``cache_static_page`` stores the rendered HTML of a TemplateResponse view in
+the Django cache, keyed by path, auth state, HTMX-vs-full request and the
+current static build. The query string is not part of the key: these pages
+do not read ``request.GET``, and keying on it would let arbitrary ``?x=1``,
+``?x=2``... URLs (or every campaign-tagged link) fill the cache with copies. The build fingerprint comes from the staticfiles
+manifest, so every deploy (new ``collectstatic``) starts from a fresh cache
+without any manual invalidation.
+
+Pages are rendered with a placeholder instead of a CSRF token; the real,
+per-request token is substituted when the cached copy is served. Responses
+carry a weak ETag and Last-Modified, so revalidating browsers get a 304.
+"""
+import hashlib
+import os
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.response import SimpleTemplateResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+CSRF_PLACEHOLDER = 'CSRFTOKENPLACEHOLDER0c7f3e'
+MANIFEST_NAME = 'staticfiles.json'
+MANIFEST_RECHECK_SECONDS = 1
+
+_build = {'checked_at': 0, 'stat': None, 'version': 'dev'}
+
+
+def build_version():
+    """Short fingerprint of the collected staticfiles manifest ('dev' if there is none)"""
+    now = time.monotonic()
+    if now - _build['checked_at'] < MANIFEST_RECHECK_SECONDS:
+        return _build['version']
+    _build['checked_at'] = now
+
+    path = os.path.join(settings.STATIC_ROOT, MANIFEST_NAME)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        _build.update(stat=None, version='dev')
+        return _build['version']
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    if key != _build['stat']:
+        with open(path, 'rb') as manifest:
+            _build['version'] = hashlib.md5(manifest.read()).hexdigest()[:12]
+        _build['stat'] = key
+    return _build['version']
+
+
+def page_cache_key(request, shared=False):
+    """Cache key for one variant of a page; shared pages skip request.user so the session is never loaded"""
+    if shared:
+        auth = 'shared'
+    else:
+        user = getattr(request, 'user', None)
+        auth = f'user:{user.pk}' if user is not None and user.is_authenticated else 'anon'
+    variant = 'htmx' if request.headers.get('HX-Request') == 'true' else 'full'
+    path = hashlib.md5(request.path.encode()).hexdigest()
+    return f'pages:page:{build_version()}:{path}:{auth}:{variant}'
+
+
+def _has_pending_messages(request):
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def _serve(request, entry, shared_max_age=None):
+    """Build a response from a cache entry, answering conditional requests with 304"""
+    content = entry['content']
+    response = HttpResponse(content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    if shared_max_age is not None and not entry['has_csrf']:
+        # Identical for every visitor, so browsers and CDNs may keep it
+        patch_cache_control(response, public=True, max_age=60, s_maxage=shared_max_age)
+        patch_vary_headers(response, ('HX-Request',))
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie', 'HX-Request'))
+
+    conditional = get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
+    if conditional is not response:
+        return conditional
+
+    if entry['has_csrf']:
+        content = content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+    response.content = content
+    return response
+
+
+def cache_static_page(view_func=None, shared_max_age=None):
+    """
+    Cache GET responses of a view returning an unrendered TemplateResponse.
+
+    With shared_max_age, pages that contain no CSRF token are marked public so
+    a CDN can hold them for that many seconds. Such a page must not depend on
+    the user or flash messages: the cache key and the bypass check then leave
+    the session untouched, so SessionMiddleware adds no ``Vary: Cookie``.
+    """
+    if view_func is None:
+        return lambda func: cache_static_page(func, shared_max_age=shared_max_age)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        shared = shared_max_age is not None
+        if request.method not in ('GET', 'HEAD') or (not shared and _has_pending_messages(request)):
+            return view_func(request, *args, **kwargs)
+
+        key = page_cache_key(request, shared)
+        entry = cache.get(key)
+        if entry is not None:
+            return _serve(request, entry, shared_max_age)
+
+        response = view_func(request, *args, **kwargs)
+        if not isinstance(response, SimpleTemplateResponse) or response.is_rendered:
+            return response
+        response.context_data = {**(response.context_data or {}), 'csrf_token': CSRF_PLACEHOLDER}
+        response.render()
+        if response.status_code != 200 or response.cookies:
+            return response
+
+        content = response.content
+        entry = {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'etag': f'W/"{hashlib.md5(content).hexdigest()}"',
+            'last_modified': int(time.time()),
+            'has_csrf': CSRF_PLACEHOLDER.encode() in content,
+        }
+        cache.set(key, entry, timeout=settings.PAGE_CACHE_TIMEOUT)
+        return _serve(request, entry, shared_max_age)
+
+    return wrapper
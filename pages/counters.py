@@ -0,0 +1,47 @@
+"""
+Cached signup counter for the landing page's social proof number.
+
+The count lives in the Django cache and is adjusted by signals as signups are
+created or deleted, so the home page never runs COUNT(*) while the cache is
+warm. The cached value expires after SIGNUP_COUNT_RECONCILE_INTERVAL seconds
+and is recounted on the next read; ``manage.py reconcile_signup_count`` does
+the same on demand (e.g. from cron, or after bulk imports that skip signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import EmailSignup
+
+SIGNUP_COUNT_KEY = 'pages:signup_count'
+
+
+def reconcile_signup_count():
+    """Recount signups from the database and store the true value"""
+    count = EmailSignup.objects.count()
+    cache.set(SIGNUP_COUNT_KEY, count, timeout=settings.SIGNUP_COUNT_RECONCILE_INTERVAL)
+    return count
+
+
+def get_signup_count():
+    """Return the cached signup count, recounting only when the cache is cold"""
+    count = cache.get(SIGNUP_COUNT_KEY)
+    if count is None:
+        count = reconcile_signup_count()
+    return count
+
+
+async def aget_signup_count():
+    """get_signup_count() for async views"""
+    count = await cache.aget(SIGNUP_COUNT_KEY)
+    if count is None:
+        count = await EmailSignup.objects.acount()
+        await cache.aset(SIGNUP_COUNT_KEY, count, timeout=settings.SIGNUP_COUNT_RECONCILE_INTERVAL)
+    return count
+
+
+def adjust_signup_count(delta):
+    """Apply a +/- delta to the cached count; a cold cache is left for the next read to fill"""
+    try:
+        cache.incr(SIGNUP_COUNT_KEY, delta)
+    except ValueError:
+        pass
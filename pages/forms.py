@@ -1,19 +1,54 @@
 from django import forms
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.db.models.functions import Lower
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Field
+from .blocklist import aload_rules, is_disposable
 from .models import EmailSignup
 import re
 
-# List of disposable/temporary email domains to block
-DISPOSABLE_EMAIL_DOMAINS = [
-    'tempmail.com', '10minutemail.com', 'guerrillamail.com', 'mailinator.com',
-    'throwaway.email', 'temp-mail.org', 'fakeinbox.com', 'trashmail.com',
-    'yopmail.com', 'emailondeck.com', 'getnada.com', 'maildrop.cc'
-]
+
+def normalize_email(email, domain_rules=None):
+    """Lowercase an email, rejecting disposable/temporary domains (shared by the form and bulk import)"""
+    if not email:
+        return email
+    
+    # Extract domain from email
+    try:
+        domain = email.split('@')[1].lower()
+    except IndexError:
+        raise ValidationError('Invalid email format')
+    
+    # Check against the disposable domain blocklist (subdomains included)
+    if is_disposable(domain, domain_rules):
+        raise ValidationError('Please use a permanent email address, not a temporary/disposable one.')
+    return email.lower()
+
+
+def normalize_phone(phone):
+    """Format a phone number as xxx-xxx-xxxx, rejecting anything but 10 digits (shared by the form and bulk import)"""
+    if not phone:
+        return phone
+    
+    # Remove all non-digit characters
+    digits_only = re.sub(r'\D', '', phone)
+    
+    # Check if exactly 10 digits
+    if len(digits_only) != 10:
+        raise ValidationError('Phone number must be exactly 10 digits (format: 555-123-4567)')
+    
+    # Format as xxx-xxx-xxxx
+    return f"{digits_only[:3]}-{digits_only[3:6]}-{digits_only[6:]}"
+
 
 class EmailSignupForm(forms.ModelForm):
+    # ais_valid() runs the duplicate check itself, through the async ORM
+    defer_duplicate_check = False
+    # Blocklist overrides preloaded by ais_valid(), so clean_email() needs no query
+    domain_rules = None
+    
     # Honeypot field - hidden from users, bots will fill it
     website = forms.CharField(
         required=False,
@@ -68,63 +103,74 @@ class EmailSignupForm(forms.ModelForm):
     
     def clean_email(self):
         """Validate email domain against disposable email services"""
-        email = self.cleaned_data.get('email')
-        if not email:
-            return email
-        
-        # Extract domain from email
-        try:
-            domain = email.split('@')[1].lower()
-        except IndexError:
-            raise ValidationError('Invalid email format')
-        
-        # Check against disposable email list
-        if domain in DISPOSABLE_EMAIL_DOMAINS:
-            raise ValidationError('Please use a permanent email address, not a temporary/disposable one.')
-        
-        # Check for duplicate email (exclude current instance if editing)
-        queryset = EmailSignup.objects.filter(email__iexact=email)
-        if self.instance.pk:
-            queryset = queryset.exclude(pk=self.instance.pk)
-        if queryset.exists():
-            raise ValidationError('This email is already on the waitlist. Check your inbox for updates!')
-        
-        return email.lower()
+        # Duplicates are checked together with the phone in clean()
+        return normalize_email(self.cleaned_data.get('email'), self.domain_rules)
     
     def clean_phone(self):
         """Validate and format phone number to 10 digits"""
-        phone = self.cleaned_data.get('phone')
-        if not phone:
-            return phone
-        
-        # Remove all non-digit characters
-        digits_only = re.sub(r'\D', '', phone)
-        
-        # Check if exactly 10 digits
-        if len(digits_only) != 10:
-            raise ValidationError('Phone number must be exactly 10 digits (format: 555-123-4567)')
-        
-        # Format as xxx-xxx-xxxx
-        formatted_phone = f"{digits_only[:3]}-{digits_only[3:6]}-{digits_only[6:]}"
-        
-        # Check for duplicate phone (exclude current instance if editing)
-        queryset = EmailSignup.objects.filter(phone=formatted_phone)
-        if self.instance.pk:
-            queryset = queryset.exclude(pk=self.instance.pk)
-        if queryset.exists():
-            raise ValidationError('This phone number is already on the waitlist. Check your inbox for updates!')
-        
-        return formatted_phone
+        # Duplicates are checked in clean()
+        return normalize_phone(self.cleaned_data.get('phone'))
     
     def clean(self):
-        """Additional validation for duplicate email/phone combo"""
+        """Check email and phone for duplicates in a single indexed query"""
         cleaned_data = super().clean()
         email = cleaned_data.get('email')
         phone = cleaned_data.get('phone')
+        if self.defer_duplicate_check or not (email or phone):
+            return cleaned_data
         
-        # Check if both email AND phone match an existing record
-        if email and phone:
-            if EmailSignup.objects.filter(email__iexact=email, phone=phone).exists():
-                raise ValidationError('You have already signed up with this email and phone number.')
-        
+        self.add_duplicate_errors(self.find_duplicates(email, phone))
         return cleaned_data
+    
+    async def ais_valid(self):
+        """is_valid() for async views: field validation, then the duplicate check on the async ORM"""
+        if not self.is_bound:
+            return False
+        self.defer_duplicate_check = True
+        self.domain_rules = await aload_rules()
+        self.full_clean()  # runs no queries with the duplicate check deferred
+        email = self.cleaned_data.get('email')
+        phone = self.cleaned_data.get('phone')
+        if email or phone:
+            self.add_duplicate_errors(await self.afind_duplicates(email, phone))
+        return not self.errors
+    
+    def add_duplicate_errors(self, duplicates):
+        if duplicates['email_taken']:
+            self.add_error('email', 'This email is already on the waitlist. Check your inbox for updates!')
+        if duplicates['phone_taken']:
+            self.add_error('phone', 'This phone number is already on the waitlist. Check your inbox for updates!')
+    
+    def duplicates_query(self, email, phone):
+        """Queryset and aggregate arguments counting existing signups (excluding the instance being edited)"""
+        lookup = Q()
+        checks = {}
+        if email:
+            lookup |= Q(email_lower=email)
+            checks['email_taken'] = Count('pk', filter=Q(email_lower=email))
+        if phone:
+            lookup |= Q(phone=phone)
+            checks['phone_taken'] = Count('pk', filter=Q(phone=phone))
+        
+        queryset = EmailSignup.objects.annotate(email_lower=Lower('email')).filter(lookup)
+        if self.instance.pk:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        return queryset, checks
+    
+    def find_duplicates(self, email, phone):
+        """Return {'email_taken': n, 'phone_taken': n} for existing signups (excluding the instance being edited)"""
+        queryset, checks = self.duplicates_query(email, phone)
+        result = queryset.aggregate(**checks)
+        return {'email_taken': result.get('email_taken', 0), 'phone_taken': result.get('phone_taken', 0)}
+    
+    async def afind_duplicates(self, email, phone):
+        """find_duplicates() on the async ORM"""
+        queryset, checks = self.duplicates_query(email, phone)
+        result = await queryset.aaggregate(**checks)
+        return {'email_taken': result.get('email_taken', 0), 'phone_taken': result.get('phone_taken', 0)}
+    
+    def _get_validation_exclusions(self):
+        """Skip the model's per-field unique/constraint queries for email; clean() already covered them"""
+        exclude = super()._get_validation_exclusions()
+        exclude.add('email')
+        return exclude
@@ -0,0 +1,146 @@
+"""
+Bulk import of waitlist signups from CSV, for leads collected offline at events.
+
+Rows get the same normalization as EmailSignupForm (``normalize_email`` and
+``normalize_phone``): lowercased email, disposable domains rejected and
+phones formatted as xxx-xxx-xxxx. The file is read as a stream in batches of
+BATCH_SIZE rows. Each batch costs one duplicate lookup
+(``lower(email) IN (...) OR phone IN (...)``, served by the lower(email)
+unique index and the phone index) and one ``bulk_create``. A 100k row file
+is therefore about 200 queries, not 100k form validations with a duplicate
+query each. Duplicates inside the file are caught with in-memory sets.
+
+``ignore_conflicts`` covers a web signup that lands between a batch's lookup
+and its insert. The unique constraint drops that row instead of failing the
+batch. It is still counted as created, because the database does not report
+which rows it skipped. bulk_create sends no signals, so the cached signup
+count is reconciled once at the end, and no lead notifications are queued.
+"""
+import csv
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .counters import reconcile_signup_count
+from .forms import normalize_email, normalize_phone
+from .models import EmailSignup
+
+REQUIRED_COLUMNS = ['first_name', 'last_name', 'email', 'phone']
+BATCH_SIZE = 1000
+CONSENT_VALUES = {'1', 'true', 't', 'yes', 'y', 'x', 'on'}
+
+
+class ImportReport:
+    """Counts and per-row problems of one import; errors are (line number, message) pairs"""
+
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.errors = []
+
+    @property
+    def invalid(self):
+        return len(self.errors) - self.duplicates
+
+    def __str__(self):
+        return f'{self.created} created, {self.duplicates} duplicate(s), {self.invalid} invalid'
+
+
+def clean_row(row):
+    """Normalize one CSV row into EmailSignup fields, raising ValidationError with every problem found"""
+    errors = []
+    data = {'marketing_consent': (row.get('marketing_consent') or '').strip().lower() in CONSENT_VALUES}
+    for name in ('first_name', 'last_name'):
+        value = (row.get(name) or '').strip()
+        max_length = EmailSignup._meta.get_field(name).max_length
+        if not value:
+            errors.append(f'{name}: This field is required.')
+        elif len(value) > max_length:
+            errors.append(f'{name}: Ensure this value has at most {max_length} characters.')
+        data[name] = value
+    for name, normalize, validators in (('email', normalize_email, [validate_email]), ('phone', normalize_phone, [])):
+        value = (row.get(name) or '').strip()
+        if not value:
+            errors.append(f'{name}: This field is required.')
+            continue
+        try:
+            for validator in validators:
+                validator(value)
+            data[name] = normalize(value)
+        except ValidationError as e:
+            errors.extend(f'{name}: {message}' for message in e.messages)
+            continue
+        # validate_email allows 320 characters; a value longer than the column fails the whole bulk_create on Postgres
+        max_length = EmailSignup._meta.get_field(name).max_length
+        if len(data[name]) > max_length:
+            errors.append(f'{name}: Ensure this value has at most {max_length} characters.')
+    if errors:
+        raise ValidationError(errors)
+    return data
+
+
+def import_signups(lines, batch_size=BATCH_SIZE):
+    """Import signups from an iterable of CSV text lines (a file opened with newline=''), returning an ImportReport"""
+    reader = csv.DictReader(lines)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    missing = [name for name in REQUIRED_COLUMNS if name not in reader.fieldnames]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    report = ImportReport()
+    seen_emails, seen_phones = set(), set()
+    rows = ((reader.line_num, row) for row in reader)
+    while batch := list(islice(rows, batch_size)):
+        cleaned = []
+        for line, row in batch:
+            try:
+                cleaned.append((line, clean_row(row)))
+            except ValidationError as e:
+                report.errors.append((line, '; '.join(e.messages)))
+
+        taken_emails, taken_phones = existing_contacts(
+            {data['email'] for _, data in cleaned}, {data['phone'] for _, data in cleaned}
+        )
+        signups = []
+        for line, data in cleaned:
+            duplicate = [
+                name for name, value, taken, seen in (
+                    ('email', data['email'], taken_emails, seen_emails),
+                    ('phone', data['phone'], taken_phones, seen_phones),
+                ) if value in taken or value in seen
+            ]
+            if duplicate:
+                report.duplicates += 1
+                report.errors.append((line, f"{' and '.join(duplicate)} already on the waitlist"))
+                continue
+            seen_emails.add(data['email'])
+            seen_phones.add(data['phone'])
+            signups.append(EmailSignup(**data))
+
+        EmailSignup.objects.bulk_create(signups, batch_size=batch_size, ignore_conflicts=True)
+        report.created += len(signups)
+
+    report.errors.sort()
+    if report.created:
+        reconcile_signup_count()
+    return report
+
+
+def existing_contacts(emails, phones):
+    """Return the (emails, phones) among those given that already belong to a signup, in one query"""
+    if not emails and not phones:
+        return set(), set()
+    rows = (
+        EmailSignup.objects.annotate(email_lower=Lower('email'))
+        .filter(Q(email_lower__in=emails) | Q(phone__in=phones))
+        .order_by()
+        .values_list('email_lower', 'phone')
+    )
+    taken_emails, taken_phones = set(), set()
+    for email, phone in rows:
+        taken_emails.add(email)
+        taken_phones.add(phone)
+    return taken_emails & emails, taken_phones & phones
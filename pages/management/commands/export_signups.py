@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.export import FORMATS, PAGE_SIZE, export_signups, filter_signups
+
+
+class Command(BaseCommand):
+    help = 'Streams waitlist signups as CSV or NDJSON in (created_at, id) order, with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument(
+            '--filter', default='',
+            help="Changelist filter querystring, e.g. 'email_verified__exact=1&created_at__year=2025'",
+        )
+        parser.add_argument('--page-size', type=int, default=PAGE_SIZE, help='Rows per keyset query')
+
+    def handle(self, *args, **options):
+        try:
+            queryset = filter_signups(options['filter'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in export_signups(queryset, options['format'], options['page_size']):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f"✅ Exported signups to {options['output']}"))
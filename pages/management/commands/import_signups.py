@@ -0,0 +1,35 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.imports import BATCH_SIZE, import_signups
+
+# Errors echoed to the console; --errors writes them all
+SHOWN_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = 'Imports waitlist signups from a CSV (first_name, last_name, email, phone[, marketing_consent])'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header row')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per duplicate lookup and insert')
+        parser.add_argument('--errors', help='Write every rejected row (line, error) to this CSV')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                report = import_signups(f, options['batch_size'])
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            raise CommandError(e)
+
+        if options['errors']:
+            with open(options['errors'], 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['line', 'error'])
+                writer.writerows(report.errors)
+        for line, message in report.errors[:SHOWN_ERRORS]:
+            self.stderr.write(f'⚠️  Line {line}: {message}')
+        if len(report.errors) > SHOWN_ERRORS and not options['errors']:
+            self.stderr.write(f'… {len(report.errors) - SHOWN_ERRORS} more; use --errors to save them all')
+        self.stdout.write(self.style.SUCCESS(f'✅ Imported signups: {report}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pages.counters import reconcile_signup_count
+
+
+class Command(BaseCommand):
+    help = 'Recounts email signups and resets the cached landing page counter'
+
+    def handle(self, *args, **options):
+        count = reconcile_signup_count()
+        self.stdout.write(self.style.SUCCESS(f'✅ Signup count reconciled: {count}'))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pages.export import filter_signups
+from pages.verification import BATCH_SIZE, queue_verification_emails
+
+
+class Command(BaseCommand):
+    help = 'Queues verification emails (signed links, nothing stored) for unverified waitlist signups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default=settings.SITE_URL, help='Site root for the links (default: SITE_URL)')
+        parser.add_argument(
+            '--filter', default='',
+            help="Changelist filter querystring, e.g. 'created_at__gte=2025-01-01'",
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Emails per insert')
+
+    def handle(self, *args, **options):
+        if not options['base_url']:
+            raise CommandError('Set SITE_URL or pass --base-url, e.g. https://247performance.com')
+        try:
+            queryset = filter_signups(options['filter'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        queued = queue_verification_emails(queryset, options['base_url'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Queued {queued} verification email(s)'))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:31
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailsignup',
+            index=models.Index(fields=['phone'], name='pages_signup_phone_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='emailsignup',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='pages_signup_email_lower_uniq'),
+        ),
+    ]
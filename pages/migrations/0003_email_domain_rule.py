@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0002_signup_email_lower_phone_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDomainRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(help_text='e.g. mailinator.com; also covers its subdomains', max_length=253, unique=True)),
+                ('action', models.CharField(choices=[('allow', 'Allow'), ('block', 'Block')], default='block', max_length=5)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Email Domain Rule',
+                'verbose_name_plural': 'Email Domain Rules',
+                'ordering': ['domain'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_email_domain_rule'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='emailsignup',
+            name='verification_token',
+        ),
+    ]
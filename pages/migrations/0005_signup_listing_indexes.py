@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import ProgrammingError, migrations, models
+from django.db.migrations.operations import AddIndex
+
+# Admin search_fields run UPPER(col::text) LIKE UPPER('%term%') on Postgres; trigram GIN indexes on that
+# expression serve it. SQLite has no equivalent. Postgres servers without the pg_trgm contrib module, or
+# roles not allowed to create it, are skipped rather than failing the deploy (install it, then
+# `migrate pages 0004 && migrate pages`).
+# Every index is built CONCURRENTLY on Postgres (hence atomic = False), so signups keep being written
+# while a large table is indexed. If a build is interrupted, drop the INVALID index it leaves and migrate again.
+SEARCH_FIELDS = ['email', 'first_name', 'last_name', 'phone']
+
+
+class AddIndexConcurrentlyOnPostgres(AddIndexConcurrently):
+    """AddIndexConcurrently on Postgres, a plain AddIndex on other databases"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    try:
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except ProgrammingError:
+        return  # insufficient privilege: only a superuser (or the database owner, if trusted) may create it
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS pages_signup_{field}_trgm ON pages_emailsignup '
+            f'USING gin ((UPPER({field}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS pages_signup_{field}_trgm')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('pages', '0004_remove_verification_token'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='emailsignup',
+            index=models.Index(fields=['-created_at', '-id'], name='pages_signup_created_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='emailsignup',
+            index=models.Index(condition=models.Q(('email_verified', False)), fields=['-created_at', '-id'], name='pages_signup_unverified_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='emailsignup',
+            index=models.Index(condition=models.Q(('marketing_consent', True)), fields=['-created_at', '-id'], name='pages_signup_consent_idx'),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
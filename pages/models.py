@@ -1,5 +1,6 @@
 from django.db import models
-import uuid
+from django.db.models import Q
+from django.db.models.functions import Lower
 
 class EmailSignup(models.Model):
     """Model to capture email signups for coming soon page"""
@@ -9,19 +10,63 @@ class EmailSignup(models.Model):
     phone = models.CharField(max_length=20)
     marketing_consent = models.BooleanField(default=False, help_text="User agreed to receive marketing emails")
     email_verified = models.BooleanField(default=False, help_text="Email verification status")
-    verification_token = models.CharField(max_length=100, blank=True, help_text="Token for email verification")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Email Signup'
         verbose_name_plural = 'Email Signups'
+        constraints = [
+            # Case-insensitive uniqueness; also lets duplicate checks on lower(email) use an index
+            models.UniqueConstraint(Lower('email'), name='pages_signup_email_lower_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['phone'], name='pages_signup_phone_idx'),
+            # Newest-first listing (ordering, changelist, date hierarchy); the export's keyset scan reads it backwards
+            models.Index(fields=['-created_at', '-id'], name='pages_signup_created_idx'),
+            # The leads admins work through: small partial indexes in the same order
+            models.Index(
+                fields=['-created_at', '-id'], condition=Q(email_verified=False), name='pages_signup_unverified_idx'
+            ),
+            models.Index(
+                fields=['-created_at', '-id'], condition=Q(marketing_consent=True), name='pages_signup_consent_idx'
+            ),
+            # Trigram indexes for the admin search are Postgres-only, see migration 0005
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email}"
+
+
+class EmailDomainRule(models.Model):
+    """Admin override of the bundled disposable-domain blocklist (pages/blocklist.py)"""
+    ACTION_ALLOW = 'allow'
+    ACTION_BLOCK = 'block'
+    ACTION_CHOICES = (
+        (ACTION_ALLOW, 'Allow'),
+        (ACTION_BLOCK, 'Block'),
+    )
+    
+    domain = models.CharField(max_length=253, unique=True, help_text="e.g. mailinator.com; also covers its subdomains")
+    action = models.CharField(max_length=5, choices=ACTION_CHOICES, default=ACTION_BLOCK)
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['domain']
+        verbose_name = 'Email Domain Rule'
+        verbose_name_plural = 'Email Domain Rules'
+    
+    def __str__(self):
+        return f"{self.get_action_display()} {self.domain}"
+    
+    def _normalize_domain(self):
+        self.domain = self.domain.strip().strip('.').lower()
+    
+    def clean(self):
+        # Runs before validate_unique(), so "Mailinator.com" is reported as a duplicate of "mailinator.com"
+        self._normalize_domain()
     
-    def generate_verification_token(self):
-        """Generate a unique verification token"""
-        self.verification_token = str(uuid.uuid4())
-        self.save(update_fields=['verification_token'])
-        return self.verification_token
+    def save(self, *args, **kwargs):
+        self._normalize_domain()  # also for rules created outside a form
+        super().save(*args, **kwargs)
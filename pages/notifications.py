@@ -0,0 +1,32 @@
+"""
+Admin notifications for new waitlist signups
+"""
+from django.conf import settings
+
+from core import outbox
+
+LEAD_NOTIFICATION = 'lead_notification'
+
+
+def queue_lead_notification(signup, admin_url):
+    """Queue the 'new lead' email to ADMIN_EMAILS; delivery happens in the outbox worker"""
+    subject = f'🎯 New Lead: {signup.first_name} {signup.last_name}'
+    message = f"""
+    New signup received from 247 Performance Studios website!
+    
+    Contact Details:
+    Name: {signup.first_name} {signup.last_name}
+    Email: {signup.email}
+    Phone: {signup.phone}
+    Marketing Consent: {'Yes' if signup.marketing_consent else 'No'}
+    Submitted: {signup.created_at.strftime('%B %d, %Y at %I:%M %p')}
+    
+    View in admin panel:
+    {admin_url}
+    """
+    return outbox.enqueue(
+        subject=subject,
+        body=message,
+        recipient_list=settings.ADMIN_EMAILS,
+        category=LEAD_NOTIFICATION,
+    )
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.metrics import SIGNUPS
+
+from .counters import adjust_signup_count
+from .models import EmailSignup
+
+
+@receiver(post_save, sender=EmailSignup)
+def signup_created(sender, instance, created, **kwargs):
+    """Bump the cached signup count once the new row is committed"""
+    if created:
+        transaction.on_commit(lambda: adjust_signup_count(1))
+        transaction.on_commit(SIGNUPS.inc)
+
+
+@receiver(post_delete, sender=EmailSignup)
+def signup_deleted(sender, instance, **kwargs):
+    """Decrement the cached signup count once the delete is committed"""
+    transaction.on_commit(lambda: adjust_signup_count(-1))
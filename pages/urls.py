@@ -1,12 +1,20 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'pages'
 
 urlpatterns = [
-    path('', views.home, name='home'),
+    path('', views.ahome if settings.ASYNC_VIEWS else views.home, name='home'),
     path('about/', views.about, name='about'),
     path('contact/', views.contact, name='contact'),
     path('privacy/', views.privacy_policy, name='privacy'),
     path('terms/', views.terms_of_service, name='terms'),
+    path('verify/<str:token>/', views.verify_email, name='verify_email'),
+    path('fragments/signup-form/', views.signup_form, name='signup_form'),
+    path(
+        'fragments/signup-count/',
+        views.asignup_count if settings.ASYNC_VIEWS else views.signup_count,
+        name='signup_count',
+    ),
 ]
@@ -0,0 +1,92 @@
+"""
+Stateless email verification for waitlist signups.
+
+A verification token is the signup's primary key, timestamped and signed
+with SECRET_KEY (``django.core.signing.TimestampSigner``). Issuing a token
+writes nothing, so links for thousands of signups cost one
+``values_list`` scan plus HMACs. Verifying checks the signature and the age
+(EMAIL_VERIFICATION_MAX_AGE) in memory. It then runs a single UPDATE by
+primary key, so there is no token column to index or look up.
+
+Verification emails go through the outbox like lead notifications, but
+``queue_verification_emails()`` writes them with ``bulk_create`` in chunks
+rather than one ``enqueue()`` per signup.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.urls import reverse
+
+from core import outbox
+from core.models import OutboxEmail
+
+from .models import EmailSignup
+
+SALT = 'pages.verification'
+VERIFICATION_EMAIL = 'email_verification'
+BATCH_SIZE = 1000
+
+
+def make_token(signup_id):
+    """Signed, timestamped token for a signup id"""
+    return signing.TimestampSigner(salt=SALT).sign(str(signup_id))
+
+
+def verify_token(token):
+    """Mark the token's signup verified; returns False if it no longer exists
+
+    Raises signing.SignatureExpired for tokens older than EMAIL_VERIFICATION_MAX_AGE
+    and signing.BadSignature for anything else that does not check out.
+    """
+    signup_id = signing.TimestampSigner(salt=SALT).unsign(token, max_age=settings.EMAIL_VERIFICATION_MAX_AGE)
+    return EmailSignup.objects.filter(pk=signup_id).update(email_verified=True) > 0
+
+
+def verification_url(signup_id, base_url):
+    return base_url.rstrip('/') + reverse('pages:verify_email', args=[make_token(signup_id)])
+
+
+def verification_message(first_name, url):
+    """Subject and body of the verification email"""
+    subject = 'Confirm your spot on the 247 Performance waitlist'
+    body = f"""
+    Hi {first_name},
+
+    Thanks for joining the 247 Performance Studios waitlist! Please confirm your email address:
+
+    {url}
+
+    This link expires in {settings.EMAIL_VERIFICATION_MAX_AGE // 86400} days. If you didn't sign up, you can ignore this email.
+    """
+    return subject, body
+
+
+def queue_verification_emails(queryset, base_url, batch_size=BATCH_SIZE):
+    """Queue verification emails for the queryset's unverified signups; returns how many were queued"""
+    rows = (
+        queryset.filter(email_verified=False)
+        .order_by()
+        .values_list('pk', 'first_name', 'email')
+        .iterator(chunk_size=batch_size)
+    )
+    queued = 0
+    batch = []
+    for signup_id, first_name, email in rows:
+        subject, body = verification_message(first_name, verification_url(signup_id, base_url))
+        batch.append(OutboxEmail(
+            category=VERIFICATION_EMAIL,
+            subject=subject,
+            body=body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipients=[email],
+        ))
+        if len(batch) == batch_size:
+            OutboxEmail.objects.bulk_create(batch)
+            queued += len(batch)
+            batch = []
+    if batch:
+        OutboxEmail.objects.bulk_create(batch)
+        queued += len(batch)
+    if queued:
+        transaction.on_commit(outbox.wake_worker)
+    return queued
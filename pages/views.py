@@ -1,79 +1,120 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.template.response import TemplateResponse
 from django_ratelimit.decorators import ratelimit
-from django.views.decorators.cache import never_cache
-from django.core.mail import send_mail
+from django.views.decorators.cache import cache_control, never_cache
 from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from core.critical_css import critical_css
+from core.throttling import async_ratelimit, throttle
+from .cache import cache_static_page
 from .forms import EmailSignupForm
-from .models import EmailSignup
-import threading
+from .verification import verify_token
+from .counters import aget_signup_count, get_signup_count
+from .notifications import queue_lead_notification
 
-@never_cache
-@ratelimit(key='ip', rate='50/h', method='POST', block=True)
+@critical_css('pages/home.html')
 def home(request):
-    """Coming soon landing page with email capture - rate limited to 50 submissions per hour per IP"""
+    """Coming soon landing page: cacheable shell on GET, email capture on POST"""
     if request.method == 'POST':
-        form = EmailSignupForm(request.POST)
-        if form.is_valid():
-            try:
-                signup = form.save()
-                
-                # Send email notification in background thread (non-blocking)
-                def send_notification_email():
-                    try:
-                        subject = f'🎯 New Lead: {signup.first_name} {signup.last_name}'
-                        message = f"""
-                        New signup received from 247 Performance Studios website!
-                        
-                        Contact Details:
-                        Name: {signup.first_name} {signup.last_name}
-                        Email: {signup.email}
-                        Phone: {signup.phone}
-                        Marketing Consent: {'Yes' if signup.marketing_consent else 'No'}
-                        Submitted: {signup.created_at.strftime('%B %d, %Y at %I:%M %p')}
-                        
-                        View in admin panel:
-                        {request.build_absolute_uri('/admin/pages/emailsignup/')}
-                        """
-                        send_mail(
-                            subject=subject,
-                            message=message,
-                            from_email=settings.DEFAULT_FROM_EMAIL,
-                            recipient_list=settings.ADMIN_EMAILS,
-                            fail_silently=True,
-                        )
-                    except Exception as email_error:
-                        print(f"Background email failed: {email_error}")
-                
-                # Start email in background thread - returns immediately
-                threading.Thread(target=send_notification_email, daemon=True).start()
-                
-                if request.htmx:
-                    return render(request, 'pages/partials/success_message.html')
-                messages.success(request, '🎉 Thank you! You\'re on the list. We\'ll notify you when we launch!')
-                return redirect('home')
-            except Exception as e:
-                if request.htmx:
-                    return render(request, 'pages/partials/form_errors.html', {'form': form, 'error': str(e)})
-                messages.error(request, 'An error occurred. Please try again.')
-        else:
+        return submit_signup(request)
+    return home_shell(request)
+
+@cache_static_page(shared_max_age=settings.HOME_SHELL_MAX_AGE)
+def home_shell(request):
+    """Static landing page shell - the form and signup count load as HTMX fragments"""
+    return TemplateResponse(request, 'pages/home.html')
+
+@never_cache
+@throttle('signup', rate=settings.SIGNUP_THROTTLE_RATE, burst=settings.SIGNUP_THROTTLE_BURST)
+@ratelimit(key='ip', rate='50/h', method='POST', block=True)
+def submit_signup(request):
+    """Handle a waitlist signup - throttled per client IP, and capped at 50 submissions per hour"""
+    form = EmailSignupForm(request.POST)
+    if form.is_valid():
+        try:
+            save_signup(form, request.build_absolute_uri('/admin/pages/emailsignup/'))
+            
             if request.htmx:
-                return render(request, 'pages/partials/form_errors.html', {'form': form})
-    else:
-        form = EmailSignupForm()
+                return render(request, 'pages/partials/success_message.html')
+            messages.success(request, '🎉 Thank you! You\'re on the list. We\'ll notify you when we launch!')
+            return redirect('pages:home')
+        except Exception as e:
+            if request.htmx:
+                return render(request, 'pages/partials/form_errors.html', {'form': form, 'error': str(e)})
+            messages.error(request, 'An error occurred. Please try again.')
+    elif request.htmx:
+        return render(request, 'pages/partials/form_errors.html', {'form': form})
     
-    # Get signup count for social proof
-    signup_count = EmailSignup.objects.count()
+    return render(request, 'pages/home.html', {'form': form})
+
+def save_signup(form, admin_url):
+    """Save a valid signup with its admin notification; both commit together, the outbox worker sends it later"""
+    with transaction.atomic():
+        signup = form.save()
+        queue_lead_notification(signup, admin_url)
+    return signup
+
+# Async versions of the landing page and signup flow, routed instead of the sync ones
+# when ASYNC_VIEWS is on (SERVER_MODE=asgi)
+
+@critical_css('pages/home.html')
+async def ahome(request):
+    """Async landing page: cached shell on GET, email capture on POST"""
+    if request.method == 'POST':
+        return await asubmit_signup(request)
+    return await sync_to_async(home_shell)(request)
+
+@never_cache
+@throttle('signup', rate=settings.SIGNUP_THROTTLE_RATE, burst=settings.SIGNUP_THROTTLE_BURST)
+@async_ratelimit(key='ip', rate='50/h', method='POST', block=True)
+async def asubmit_signup(request):
+    """submit_signup() with the duplicate check on the async ORM and the write in one thread hop"""
+    form = EmailSignupForm(request.POST)
+    if await form.ais_valid():
+        try:
+            # The async ORM has no transactions, so the atomic insert + outbox row run together in a thread
+            await sync_to_async(save_signup)(form, request.build_absolute_uri('/admin/pages/emailsignup/'))
+            
+            if request.htmx:
+                return render(request, 'pages/partials/success_message.html')
+            messages.success(request, '🎉 Thank you! You\'re on the list. We\'ll notify you when we launch!')
+            return redirect('pages:home')
+        except Exception as e:
+            if request.htmx:
+                return render(request, 'pages/partials/form_errors.html', {'form': form, 'error': str(e)})
+            messages.error(request, 'An error occurred. Please try again.')
+    elif request.htmx:
+        return render(request, 'pages/partials/form_errors.html', {'form': form})
     
-    return render(request, 'pages/home.html', {
-        'form': form,
-        'signup_count': signup_count
-    })
+    # The full page reads request.user (a session query), so it renders in a thread
+    return await sync_to_async(render)(request, 'pages/home.html', {'form': form})
+
+@never_cache
+def signup_form(request):
+    """HTMX fragment: the live signup form with this visitor's CSRF token"""
+    return render(request, 'pages/partials/signup_form.html', {'form': EmailSignupForm()})
+
+@cache_control(public=True, max_age=60)
+def signup_count(request):
+    """HTMX fragment: waitlist size for social proof (served from the cached counter)"""
+    return render(request, 'pages/partials/signup_count.html', {'signup_count': get_signup_count()})
+
+@cache_control(public=True, max_age=60)
+async def asignup_count(request):
+    """Async HTMX fragment: waitlist size from the cached counter"""
+    return render(request, 'pages/partials/signup_count.html', {'signup_count': await aget_signup_count()})
 
+@critical_css('pages/about.html')
+@cache_static_page
 def about(request):
     """About us page view"""
-    return render(request, 'pages/about.html')
+    return TemplateResponse(request, 'pages/about.html')
 
+@critical_css('pages/contact.html')
+@cache_static_page
 def contact(request):
     """Contact page view"""
     if request.method == 'POST':
@@ -83,14 +124,31 @@ def contact(request):
         
         # TODO: Add email sending logic here
         messages.success(request, 'Thank you for contacting us! We will get back to you soon.')
-        return redirect('contact')
+        return redirect('pages:contact')
     
-    return render(request, 'pages/contact.html')
+    return TemplateResponse(request, 'pages/contact.html')
 
+@critical_css('pages/privacy_policy.html')
+@cache_static_page
 def privacy_policy(request):
     """Privacy policy page view"""
-    return render(request, 'pages/privacy_policy.html')
+    return TemplateResponse(request, 'pages/privacy_policy.html')
 
+@critical_css('pages/terms_of_service.html')
+@cache_static_page
 def terms_of_service(request):
     """Terms of service page view"""
-    return render(request, 'pages/terms_of_service.html')
+    return TemplateResponse(request, 'pages/terms_of_service.html')
+
+@never_cache
+def verify_email(request, token):
+    """Email verification link: one UPDATE by primary key, no token lookup"""
+    try:
+        status = 'verified' if verify_token(token) else 'invalid'
+    except signing.SignatureExpired:
+        status = 'expired'
+    except signing.BadSignature:
+        status = 'invalid'
+    return TemplateResponse(
+        request, 'pages/verify_email.html', {'status': status}, status=200 if status == 'verified' else 400
+    )
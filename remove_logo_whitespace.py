@@ -3,32 +3,18 @@ Remove whitespace/padding from logo image
 """
 from PIL import Image
 
+from core.imageops import trim, white_to_alpha
+
 # Load the logo
 img = Image.open('static/images/247sign_edited.png')
 
-# Convert to RGBA to handle transparency
-img = img.convert('RGBA')
-
-# Get the bounding box of non-white pixels
-# Create an alpha mask where white pixels are transparent
-datas = img.getdata()
-newData = []
-for item in datas:
-    # If pixel is white or very light (close to white), make it transparent
-    if item[0] > 240 and item[1] > 240 and item[2] > 240:
-        newData.append((255, 255, 255, 0))  # Transparent
-    else:
-        newData.append(item)
+# Make white or very light (close to white) pixels transparent
+img = white_to_alpha(img, threshold=240)
 
-img.putdata(newData)
-
-# Get bounding box of non-transparent content
-bbox = img.getbbox()
+# Crop to the bounding box of non-transparent content
+img_cropped, bbox = trim(img)
 
 if bbox:
-    # Crop to content
-    img_cropped = img.crop(bbox)
-    
     # Save with transparency
     img_cropped.save('static/images/247sign_edited.png', 'PNG', optimize=True, quality=95)
     
@@ -2,12 +2,21 @@
 Pytest configuration and fixtures
 """
 import pytest
+from django.core.cache import caches
 from django.test import Client
 from faker import Faker
 
 fake = Faker()
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches so cached counters and rate limits don't leak between tests"""
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 @pytest.fixture
 def client():
     """Return Django test client"""
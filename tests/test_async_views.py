@@ -0,0 +1,100 @@
+"""
+Tests for the async landing page and signup views (SERVER_MODE=asgi)
+"""
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from django_htmx.middleware import HtmxDetails
+
+from core.models import OutboxEmail
+from core.performance import PerformanceMiddleware, registry
+from pages import views
+from pages.forms import EmailSignupForm
+from pages.models import EmailSignup
+
+
+def signup_data(**extra):
+    return {
+        'first_name': 'John',
+        'last_name': 'Doe',
+        'email': 'john@example.com',
+        'phone': '1234567890',
+        'marketing_consent': 'on',
+        **extra,
+    }
+
+
+class TestAsyncSignup(TestCase):
+    """Test the async signup flow"""
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+    
+    def htmx_post(self, data):
+        request = self.factory.post('/', data, headers={'HX-Request': 'true'})
+        request.htmx = HtmxDetails(request)
+        return request
+    
+    async def test_valid_signup(self):
+        """Test that a valid signup is saved with its queued notification"""
+        response = await views.ahome(self.htmx_post(signup_data()))
+        self.assertContains(response, 'Welcome to the 247 Performance family')
+        self.assertEqual(await EmailSignup.objects.acount(), 1)
+        self.assertEqual(await OutboxEmail.objects.acount(), 1)
+    
+    async def test_duplicate_signup(self):
+        """Test that duplicates are reported by the async duplicate check"""
+        await EmailSignup.objects.acreate(first_name='A', last_name='B', email='John@Example.com', phone='555-000-0000')
+        response = await views.ahome(self.htmx_post(signup_data(phone='555-000-0000')))
+        self.assertContains(response, 'This email is already on the waitlist')
+        self.assertContains(response, 'This phone number is already on the waitlist')
+        self.assertEqual(await EmailSignup.objects.acount(), 1)
+    
+    async def test_ais_valid_matches_is_valid(self):
+        """Test that ais_valid() reports the same errors as is_valid()"""
+        await EmailSignup.objects.acreate(first_name='A', last_name='B', email='john@example.com', phone='555-000-0000')
+        data = signup_data(website='http://spam.example')
+        form = EmailSignupForm(data)
+        self.assertFalse(await form.ais_valid())
+        self.assertEqual(set(form.errors), {'email', 'website'})
+    
+    async def test_throttled(self):
+        """Test that the async view is throttled like the sync one"""
+        statuses = []
+        for _ in range(7):
+            response = await views.ahome(self.htmx_post(signup_data(website='bot')))
+            statuses.append(response.status_code)
+        self.assertEqual(statuses.count(429), 2)
+    
+    async def test_signup_count(self):
+        """Test that the count fragment uses the async counter"""
+        await EmailSignup.objects.acreate(first_name='A', last_name='B', email='a@example.com', phone='555-000-0000')
+        response = await views.asignup_count(self.factory.get('/fragments/signup-count/'))
+        self.assertContains(response, '1 athlete already on the list')
+    
+    async def test_get_serves_shell(self):
+        """Test that GET serves the cached landing shell"""
+        response = await views.ahome(self.factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'hx-get')
+
+
+class TestAsyncPerformanceMiddleware(TestCase):
+    """Test request metrics in an async middleware chain"""
+    
+    def setUp(self):
+        registry.take()
+    
+    def tearDown(self):
+        registry.take()
+    
+    async def test_counts_queries_from_orm_threads(self):
+        """Test that queries the async ORM runs on worker threads are counted"""
+        async def view(request):
+            await EmailSignup.objects.acount()
+            return await views.asignup_count(request)
+    
+        middleware = PerformanceMiddleware(view)
+        response = await middleware(AsyncRequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(registry.views['<unresolved>'].histograms['db_queries'].sum, 2)
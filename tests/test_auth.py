@@ -0,0 +1,88 @@
+"""
+Tests for session and logged-in user caching on portal requests
+"""
+from importlib import import_module
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.auth import user_cache_key
+
+session_auth_backend = import_module('core.migrations.0004_session_auth_backend')
+
+
+class TestCachedAuth(TestCase):
+    """Test that warm portal requests authenticate without queries"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='athlete', password='pass-12345', first_name='Casey', user_type='client'
+        )
+        self.client.login(username='athlete', password='pass-12345')
+        self.url = reverse('client_dashboard')
+    
+    def test_warm_dashboard_runs_no_queries(self):
+        """Test that the session and user come from the cache after the first request"""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Welcome, Casey!')
+    
+    def test_cold_user_cache_costs_one_query(self):
+        """Test that a cache miss loads the user with a single query"""
+        self.client.get(self.url)
+        cache.delete(user_cache_key(self.user.pk))
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+    
+    def test_saving_user_invalidates_cache(self):
+        """Test that profile changes show up on the next request"""
+        self.client.get(self.url)
+        self.user.first_name = 'Jordan'
+        self.user.save()
+        self.assertContains(self.client.get(self.url), 'Welcome, Jordan!')
+    
+    def test_deactivated_user_is_logged_out(self):
+        """Test that a deactivated user is not served from the cache"""
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertRedirects(self.client.get(self.url), f"{reverse('login')}?next={self.url}")
+    
+    def test_password_change_ends_other_sessions(self):
+        """Test that the session auth hash is checked against the current password"""
+        self.client.get(self.url)
+        self.user.set_password('new-pass-67890')
+        self.user.save()
+        self.assertRedirects(self.client.get(self.url), f"{reverse('login')}?next={self.url}")
+    
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookie_sessions(self):
+        """Test that signed-cookie sessions also need no queries once the user is cached"""
+        self.client.login(username='athlete', password='pass-12345')
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+    
+    def test_model_backend_sessions_survive_the_switch(self):
+        """Test that the migration keeps sessions logged in under ModelBackend signed in"""
+        session = SessionStore()
+        session[SESSION_KEY] = str(self.user.pk)
+        session[BACKEND_SESSION_KEY] = session_auth_backend.MODEL_BACKEND
+        session[HASH_SESSION_KEY] = self.user.get_session_auth_hash()
+        session.create()  # also cached, as cached_db does on every save
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+        
+        session_auth_backend.forwards(apps, None)
+        self.assertContains(client.get(self.url), 'Welcome, Casey!')
+        self.assertEqual(SessionStore(session.session_key)[BACKEND_SESSION_KEY], 'core.auth.CachedModelBackend')
+        
+        session_auth_backend.backwards(apps, None)
+        self.assertEqual(SessionStore(session.session_key)[BACKEND_SESSION_KEY], session_auth_backend.MODEL_BACKEND)
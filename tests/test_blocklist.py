@@ -0,0 +1,114 @@
+"""
+Tests for the disposable email domain blocklist
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from pages.blocklist import _domains, forget_rules, is_disposable, load_domains
+from pages.forms import EmailSignupForm
+from pages.models import EmailDomainRule
+
+
+class TestBlocklist(TestCase):
+    """Test domain and subdomain lookups against the file and the admin rules"""
+    
+    def setUp(self):
+        forget_rules(EmailDomainRule)
+        self.addCleanup(forget_rules, EmailDomainRule)
+    
+    def test_bundled_list(self):
+        """Test that listed domains and their subdomains are blocked, others are not"""
+        self.assertTrue(is_disposable('mailinator.com'))
+        self.assertTrue(is_disposable('x.Mailinator.com.'))
+        self.assertTrue(is_disposable('a.b.yopmail.com'))
+        self.assertFalse(is_disposable('example.com'))
+        self.assertFalse(is_disposable('notmailinator.example'))
+        self.assertFalse(is_disposable('mailinator.com.example.org'))
+        self.assertFalse(is_disposable('com'))
+    
+    def test_bundled_list_at_full_size(self):
+        """Test that the vendored list loads tens of thousands of domains once and keeps lookups cheap"""
+        _domains.update(path=None, mtime=None)
+        start = time.perf_counter()
+        domains = load_domains()
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertGreater(len(domains), 50_000)
+        self.assertIs(load_domains(), domains)
+        self.assertFalse(any(line.startswith('#') or ' ' in line for line in domains))
+        
+        start = time.perf_counter()
+        for _ in range(10_000):
+            is_disposable('a.b.c.example.com', rules={})
+        self.assertLess(time.perf_counter() - start, 1.0)
+        for domain in ('gmail.com', 'outlook.com', 'yahoo.com', 'icloud.com', 'proton.me', 'duck.com'):
+            self.assertFalse(is_disposable(domain, rules={}), domain)
+    
+    def test_file_reloaded_when_changed(self):
+        """Test that edits to the blocklist file are picked up without a restart"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'domains.txt'
+            path.write_text('# comment\nspam.test\n\n')
+            with override_settings(DISPOSABLE_DOMAINS_FILE=str(path)):
+                self.assertEqual(load_domains(), frozenset({'spam.test'}))
+                self.assertFalse(is_disposable('junk.test'))
+                path.write_text('spam.test\njunk.test\n')
+                os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000))
+                self.assertTrue(is_disposable('mail.junk.test'))
+    
+    def test_admin_rules_override_the_file(self):
+        """Test that the most specific rule wins, and admin rules beat the file at the same domain"""
+        EmailDomainRule.objects.create(domain='School.Mailinator.com', action=EmailDomainRule.ACTION_ALLOW)
+        EmailDomainRule.objects.create(domain='spammy.example', action=EmailDomainRule.ACTION_BLOCK)
+        self.assertFalse(is_disposable('school.mailinator.com'))
+        self.assertFalse(is_disposable('class.school.mailinator.com'))
+        self.assertTrue(is_disposable('other.mailinator.com'))
+        self.assertTrue(is_disposable('mx.spammy.example'))
+        EmailDomainRule.objects.create(domain='mailinator.com', action=EmailDomainRule.ACTION_ALLOW)
+        self.assertFalse(is_disposable('other.mailinator.com'))
+    
+    def test_rules_cached_until_changed(self):
+        """Test that rules are loaded once and reloaded after an admin edit"""
+        is_disposable('example.com')
+        with self.assertNumQueries(0):
+            is_disposable('example.com')
+        rule = EmailDomainRule.objects.create(domain='example.com')
+        self.assertTrue(is_disposable('example.com'))
+        rule.delete()
+        self.assertFalse(is_disposable('example.com'))
+    
+    def test_form_rejects_subdomains(self):
+        """Test that signups from a subdomain of a disposable service are rejected"""
+        form = EmailSignupForm(data={
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@inbox.mailinator.com',
+            'phone': '1234567890'
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('permanent email address', form.errors['email'][0])
+    
+    def test_admin_registered(self):
+        """Test that admins can manage the override rules"""
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('admin:pages_emaildomainrule_add'), {'domain': 'Junk.Example', 'action': 'block'})
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(is_disposable('junk.example'))
+    
+    def test_admin_rejects_duplicate_in_other_case(self):
+        """Test that a domain differing only in case or a trailing dot is a form error, not a server error"""
+        EmailDomainRule.objects.create(domain='mailinator.com', action=EmailDomainRule.ACTION_ALLOW)
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(admin)
+        response = self.client.post(
+            reverse('admin:pages_emaildomainrule_add'), {'domain': ' Mailinator.COM. ', 'action': 'block'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Email Domain Rule with this Domain already exists.')
+        self.assertEqual(EmailDomainRule.objects.get().action, EmailDomainRule.ACTION_ALLOW)
@@ -0,0 +1,77 @@
+"""
+Tests for the shared file cache used for rate limiting across gunicorn workers
+"""
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+
+import pytest
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django_ratelimit.core import is_ratelimited
+
+from core.cache import SharedFileCache
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='needs fork() and flock()')
+
+
+def hit_ratelimit(attempts, results):
+    """Child process: try the rate-limited action and report how many were allowed"""
+    request = RequestFactory().post('/', REMOTE_ADDR='203.0.113.7')
+    allowed = 0
+    for _ in range(attempts):
+        if not is_ratelimited(request, group='signup', key='ip', rate='20/h', increment=True):
+            allowed += 1
+    results.put(allowed)
+
+
+def increment(key, times, directory):
+    cache = SharedFileCache(directory, {})
+    for _ in range(times):
+        cache.incr(key)
+
+
+class TestSharedFileCache(SimpleTestCase):
+    """Test that counters stay exact when several processes share the cache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.context = multiprocessing.get_context('fork')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def run_processes(self, target, args, count=4):
+        processes = [self.context.Process(target=target, args=args) for _ in range(count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=60)
+            self.assertEqual(process.exitcode, 0)
+
+    def test_incr_is_atomic_across_processes(self):
+        """Test that concurrent increments from several processes are not lost"""
+        cache = SharedFileCache(self.directory, {})
+        cache.set('hits', 0, timeout=None)
+        self.run_processes(increment, ('hits', 50, self.directory))
+        self.assertEqual(cache.get('hits'), 200)
+
+    def test_incr_keeps_expiry(self):
+        """Test that incr does not reset the entry's timeout"""
+        cache = SharedFileCache(self.directory, {})
+        cache.set('short', 1, timeout=0.01)
+        cache.incr('short')
+        time.sleep(0.05)
+        self.assertIsNone(cache.get('short'))
+
+    def test_rate_limit_holds_across_processes(self):
+        """Test that four workers together allow exactly the configured rate"""
+        cache_settings = {'default': {'BACKEND': 'core.cache.SharedFileCache', 'LOCATION': self.directory}}
+        with override_settings(CACHES=cache_settings, RATELIMIT_USE_CACHE='default'):
+            caches['default'].clear()
+            results = self.context.Queue()
+            self.run_processes(hit_ratelimit, (15, results))
+            allowed = sum(results.get(timeout=10) for _ in range(4))
+        self.assertEqual(allowed, 20)
@@ -0,0 +1,114 @@
+"""
+Tests for the large-table admin changelist mixin
+"""
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import changelist
+from core.changelist import EstimatedCountPaginator, estimated_row_count
+from pages.models import EmailSignup
+
+
+def make_signups(count):
+    EmailSignup.objects.bulk_create([
+        EmailSignup(first_name=f'Lead{i}', last_name='Test', email=f'lead{i}@example.com', phone=f'555-000-{i:04d}',
+                    marketing_consent=i % 2 == 0)
+        for i in range(count)
+    ])
+
+
+class TestEstimatedCountPaginator(TestCase):
+    """Test estimated and cached counts"""
+    
+    def setUp(self):
+        cache.clear()
+        make_signups(5)
+    
+    def test_exact_count_is_cached(self):
+        """Test that an exact count is run once and then served from the cache"""
+        with self.assertNumQueries(1 if connection.vendor == 'sqlite' else 2):
+            self.assertEqual(EstimatedCountPaginator(EmailSignup.objects.all(), 2).count, 5)
+        with self.assertNumQueries(0 if connection.vendor == 'sqlite' else 1):
+            self.assertEqual(EstimatedCountPaginator(EmailSignup.objects.all(), 2).count, 5)
+    
+    def test_estimate_used_above_threshold(self):
+        """Test that a big unfiltered table is counted from the planner estimate"""
+        with mock.patch.object(changelist, 'estimated_row_count', return_value=2_500_000):
+            self.assertEqual(EstimatedCountPaginator(EmailSignup.objects.all(), 100).count, 2_500_000)
+            self.assertEqual(EstimatedCountPaginator(EmailSignup.objects.filter(marketing_consent=True), 100).count, 3)
+    
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=10)
+    def test_small_table_counted_exactly(self):
+        """Test that tables below the threshold get an exact count"""
+        with mock.patch.object(changelist, 'estimated_row_count', return_value=6):
+            self.assertEqual(EstimatedCountPaginator(EmailSignup.objects.all(), 100).count, 5)
+    
+    @skipUnless(connection.vendor == 'postgresql', 'reltuples is Postgres-only')
+    def test_reltuples(self):
+        """Test that the estimate comes from pg_class once the table is analyzed"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE pages_emailsignup')
+        self.assertEqual(estimated_row_count(EmailSignup), 5)
+    
+    @skipUnless(connection.vendor == 'sqlite', 'no estimates on SQLite')
+    def test_no_estimate_on_sqlite(self):
+        """Test that SQLite has no estimate, so counts stay exact"""
+        self.assertIsNone(estimated_row_count(EmailSignup))
+
+
+class TestLargeTableChangelists(TestCase):
+    """Test that repeat changelist loads skip the count, facet and date hierarchy queries"""
+    
+    def setUp(self):
+        cache.clear()
+        make_signups(3)
+        self.admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(self.admin)
+    
+    def signup_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Leave out the (Postgres-only) pg_class estimate lookup
+        return response, [
+            q['sql'] for q in queries.captured_queries if 'pages_emailsignup' in q['sql'] and 'pg_class' not in q['sql']
+        ]
+    
+    def test_signup_changelist_cached(self):
+        """Test that a warm signup changelist only reads the rows it shows"""
+        url = reverse('admin:pages_emailsignup_changelist') + '?_facets=1'
+        first, cold = self.signup_queries(url)
+        self.assertContains(first, '3 Email Signups')
+        self.assertTrue(any('COUNT(' in sql for sql in cold))
+        second, warm = self.signup_queries(url)
+        self.assertEqual(len(warm), 1)
+        self.assertNotIn('COUNT(', warm[0])
+        self.assertContains(second, '3 Email Signups')
+    
+    def test_filtered_changelist_skips_full_count(self):
+        """Test that a filtered page does not count the whole table as well"""
+        url = reverse('admin:pages_emailsignup_changelist') + '?marketing_consent__exact=1'
+        response, queries = self.signup_queries(url)
+        self.assertContains(response, '2 Email Signups')
+        self.assertEqual(sum('COUNT(' in sql for sql in queries), 1)
+    
+    def test_date_hierarchy_cached(self):
+        """Test that the date hierarchy links are cached"""
+        url = reverse('admin:pages_emailsignup_changelist')
+        response, _ = self.signup_queries(url)
+        year = EmailSignup.objects.first().created_at.year
+        self.assertContains(response, f'created_at__year={year}')
+        _, warm = self.signup_queries(url)
+        self.assertFalse(any('MIN(' in sql.upper() or 'DISTINCT' in sql.upper() for sql in warm))
+    
+    def test_user_changelist(self):
+        """Test that the user admin uses the same changelist"""
+        response = self.client.get(reverse('admin:core_user_changelist') + '?_facets=1')
+        self.assertContains(response, '1 user')
+        self.assertIsInstance(response.context['cl'], changelist.CachedFacetsChangeList)
@@ -0,0 +1,53 @@
+"""
+Tests for the cached signup counter
+"""
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from pages.counters import SIGNUP_COUNT_KEY, get_signup_count
+from pages.models import EmailSignup
+
+
+class TestSignupCounter(TestCase):
+    """Test the signal-maintained signup count"""
+    
+    def create_signup(self, email):
+        return EmailSignup.objects.create(first_name='John', last_name='Doe', email=email, phone='123-456-7890')
+    
+    def test_cold_cache_counts_once(self):
+        """Test that a cold cache is filled from the database"""
+        self.create_signup('a@example.com')
+        with self.assertNumQueries(1):
+            self.assertEqual(get_signup_count(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_signup_count(), 1)
+    
+    def test_signals_keep_count_current(self):
+        """Test that creates and deletes adjust the cached value without recounting"""
+        self.assertEqual(get_signup_count(), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            signup = self.create_signup('a@example.com')
+            self.create_signup('b@example.com')
+        self.assertEqual(cache.get(SIGNUP_COUNT_KEY), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            signup.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_signup_count(), 1)
+    
+    def test_reconcile_command_fixes_drift(self):
+        """Test that the reconcile command resets a drifted count"""
+        self.create_signup('a@example.com')
+        cache.set(SIGNUP_COUNT_KEY, 42)
+        call_command('reconcile_signup_count', stdout=StringIO())
+        self.assertEqual(cache.get(SIGNUP_COUNT_KEY), 1)
+    
+    def test_home_page_runs_no_count_query(self):
+        """Test that a warm home page GET does not touch the database"""
+        get_signup_count()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('pages:home'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,79 @@
+"""
+Tests for critical-CSS inlining and resource hints
+"""
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.critical_css import critical_css_path, optimize_html
+
+
+class TestCriticalCSSMiddleware(TestCase):
+    """Test post-processing of pages decorated with @critical_css"""
+    
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.override = override_settings(FRONTEND_OUTPUT_DIR=self.output_dir, PRECONNECT_ORIGINS=[])
+        self.override.enable()
+        path = Path(critical_css_path('pages/home.html'))
+        path.parent.mkdir(parents=True)
+        path.write_text('.text-primary{color:#1e40af}')
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.output_dir)
+    
+    def test_critical_css_inlined_and_stylesheets_non_blocking(self):
+        """Test that the built CSS is inlined and the full bundle is preloaded"""
+        response = self.client.get(reverse('pages:home'))
+        html = response.content.decode()
+        self.assertIn('<style data-critical>.text-primary{color:#1e40af}</style>', html)
+        self.assertIn('<link rel="preload" href="/static/dist/app.css" as="style"', html)
+        self.assertIn('<noscript><link rel="stylesheet" href="/static/dist/app.css"></noscript>', html)
+        self.assertLess(html.index('data-critical'), html.index('/static/dist/app.css'))
+    
+    def test_link_and_server_timing_headers(self):
+        """Test the preload Link header and the Server-Timing measurement"""
+        response = self.client.get(reverse('pages:home'))
+        self.assertIn('</static/dist/app.css>; rel=preload; as=style', response['Link'])
+        self.assertIn('</static/vendor/htmx.min.js>; rel=preload; as=script', response['Link'])
+        self.assertIn('critical-css;dur=', response['Server-Timing'])
+        self.assertIn('28 bytes inlined', response['Server-Timing'])
+    
+    def test_cached_page_is_processed_too(self):
+        """Test that pages served from the page cache still get critical CSS"""
+        self.client.get(reverse('pages:home'))
+        response = self.client.get(reverse('pages:home'))
+        self.assertContains(response, 'data-critical')
+    
+    def test_unbuilt_template_keeps_blocking_stylesheet(self):
+        """Test that pages without built critical CSS keep their normal stylesheet"""
+        response = self.client.get(reverse('pages:about'))
+        self.assertContains(response, '<link rel="stylesheet" href="/static/dist/app.css">')
+        self.assertNotContains(response, 'data-critical')
+        self.assertIn('Link', response)
+    
+    @override_settings(CRITICAL_CSS_ENABLED=False)
+    def test_switched_off(self):
+        """Test that CRITICAL_CSS_ENABLED=False leaves responses untouched"""
+        response = self.client.get(reverse('pages:home'))
+        self.assertNotContains(response, 'data-critical')
+        self.assertNotIn('Link', response)
+    
+    def test_undecorated_views_untouched(self):
+        """Test that fragments and other views are not post-processed"""
+        response = self.client.get(reverse('pages:signup_form'))
+        self.assertNotIn('Server-Timing', response)
+    
+    @override_settings(PRECONNECT_ORIGINS=['https://www.googletagmanager.com'])
+    def test_preconnect_and_defer(self):
+        """Test preconnect hints and deferring of blocking scripts"""
+        html = optimize_html(
+            '<html><head><script src="/a.js"></script><script async src="/b.js"></script></head><body></body></html>', ''
+        )
+        self.assertIn('<head><link rel="preconnect" href="https://www.googletagmanager.com" crossorigin>', html)
+        self.assertIn('<script defer src="/a.js">', html)
+        self.assertIn('<script async src="/b.js">', html)
@@ -0,0 +1,106 @@
+"""
+Tests for the Postgres connection pool support
+
+The pooled-connection tests only run against Postgres with DB_POOL on
+(DATABASE_URL=postgres://...); the rest run everywhere.
+"""
+import os
+from unittest import mock, skipIf, skipUnless
+
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+
+from core import dbpool
+from tests.test_metrics import sample
+
+
+class FakePool:
+    def __init__(self, stats):
+        self.stats = stats
+    
+    def pop_stats(self):
+        return self.stats
+
+
+def pool_timeout():
+    """A Django OperationalError wrapping psycopg_pool's PoolTimeout, as the ORM raises it"""
+    try:
+        raise OperationalError('couldn\'t get a connection after 5.00 sec') from dbpool.PoolTimeout('timeout')
+    except OperationalError as e:
+        return e
+
+
+@skipIf(dbpool.PoolTimeout is None, 'psycopg_pool is not installed')
+class TestPoolTimeoutMiddleware(SimpleTestCase):
+    """Test the 503 for an exhausted pool"""
+    
+    def setUp(self):
+        self.middleware = dbpool.PoolTimeoutMiddleware(lambda request: HttpResponse())
+        self.request = RequestFactory().get('/')
+    
+    def test_pool_timeout_is_503(self):
+        """Test that a pool timeout becomes a retryable 503"""
+        with self.assertLogs('core.dbpool', 'WARNING'):
+            response = self.middleware.process_exception(self.request, pool_timeout())
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+    
+    def test_other_errors_pass_through(self):
+        """Test that other database errors are left to the normal 500 handling"""
+        self.assertIsNone(self.middleware.process_exception(self.request, OperationalError('server closed')))
+        self.assertIsNone(self.middleware.process_exception(self.request, ValueError('boom')))
+
+
+class TestPoolStats(SimpleTestCase):
+    """Test the pool metrics"""
+    
+    def test_stats_exported(self):
+        """Test that pool gauges are set and counters advance by the popped stats"""
+        # Gauge files of earlier test runs stay in the metrics directory, so use an alias of our own
+        alias = f'test-{os.getpid()}'
+        stats = {'pool_size': 4, 'pool_available': 1, 'requests_waiting': 2, 'requests_num': 10,
+                 'requests_errors': 3, 'requests_wait_ms': 1500}
+        with mock.patch.object(dbpool, 'pools', return_value={alias: FakePool(stats)}):
+            dbpool.record_pool_stats()
+            dbpool.record_pool_stats()
+        self.assertEqual(sample('db_pool_connections', alias=alias, state='available'), 1)
+        self.assertEqual(sample('db_pool_connections', alias=alias, state='waiting'), 2)
+        self.assertEqual(sample('db_pool_events_total', alias=alias, event='checkout'), 20)
+        self.assertEqual(sample('db_pool_events_total', alias=alias, event='timeout'), 6)
+        self.assertEqual(sample('db_pool_seconds_total', alias=alias, phase='wait'), 3.0)
+
+
+@skipUnless(getattr(connection, 'pool', None) is not None, 'needs Postgres with DB_POOL')
+class TestPooledConnections(TransactionTestCase):
+    """Test requests against a real connection pool"""
+    
+    def test_connections_are_reused(self):
+        """Test that closing a connection returns it to the pool instead of disconnecting"""
+        connection.ensure_connection()
+        connection.pool.wait()  # let the pool fill up to min_size
+        opened = connection.pool.get_stats().get('connections_num', 0)
+        for _ in range(5):
+            connection.close()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        self.assertEqual(connection.pool.get_stats().get('connections_num', 0), opened)
+    
+    def test_exhausted_pool_returns_503(self):
+        """Test that a request that cannot get a connection gets a 503, not a 500"""
+        cache.clear()
+        connection.close()
+        pool = connection.pool
+        held = [pool.getconn() for _ in range(pool.max_size)]
+        timeout, pool.timeout = pool.timeout, 0.1
+        try:
+            with self.assertLogs('core.dbpool', 'WARNING'):
+                response = self.client.get(reverse('pages:signup_count'))
+        finally:
+            pool.timeout = timeout
+            for conn in held:
+                pool.putconn(conn)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.client.get(reverse('pages:signup_count')).status_code, 200)
@@ -0,0 +1,118 @@
+"""
+Tests for the streaming signup export
+"""
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pages.admin import EmailSignupAdmin
+from pages.export import FILTER_FIELDS, export_signups, filter_signups, iter_signups
+from pages.models import EmailSignup
+
+
+def make_signups(count, **fields):
+    EmailSignup.objects.bulk_create([
+        EmailSignup(first_name=f'Lead{i}', last_name='Test', email=f'lead{i}@example.com', phone=f'555-000-{i:04d}', **fields)
+        for i in range(count)
+    ])
+
+
+class TestExport(TestCase):
+    """Test keyset iteration and the CSV/NDJSON output"""
+    
+    def test_keyset_pages_cover_ties_once(self):
+        """Test that rows sharing a created_at are neither skipped nor repeated across pages"""
+        make_signups(5)
+        EmailSignup.objects.update(created_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc))
+        with self.assertNumQueries(4):  # 3 pages of 2 + the empty page that ends the scan
+            pages = list(iter_signups(page_size=2))
+        ids = [row[0] for page in pages for row in page]
+        self.assertEqual(ids, sorted(EmailSignup.objects.values_list('id', flat=True)))
+    
+    def test_later_pages_seek_the_index(self):
+        """Test that pages after the first seek past the last row instead of rescanning the table"""
+        make_signups(5)
+        with CaptureQueriesContext(connection) as queries:
+            list(iter_signups(page_size=2))
+        later_pages = [query['sql'] for query in queries.captured_queries[1:]]
+        self.assertEqual(len(later_pages), 3)
+        for sql in later_pages:
+            self.assertIn('"created_at" >= ', sql)
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+                self.assertIn('SEARCH', plan)
+                self.assertIn('created_at>?', plan)
+    
+    def test_csv(self):
+        """Test that CSV has a header, one line per signup and neutralised formulas"""
+        make_signups(2)
+        EmailSignup.objects.filter(email='lead1@example.com').update(first_name='=HYPERLINK("http://x")')
+        rows = list(csv.reader(io.StringIO(''.join(export_signups(fmt='csv')))))
+        self.assertEqual(rows[0][:4], ['id', 'first_name', 'last_name', 'email'])
+        self.assertEqual([row[3] for row in rows[1:]], ['lead0@example.com', 'lead1@example.com'])
+        self.assertEqual(rows[2][1], '\'=HYPERLINK("http://x")')
+    
+    def test_ndjson(self):
+        """Test that NDJSON has one JSON object per line with ISO timestamps"""
+        make_signups(3, marketing_consent=True)
+        lines = ''.join(export_signups(fmt='ndjson')).splitlines()
+        self.assertEqual(len(lines), 3)
+        record = json.loads(lines[0])
+        self.assertIs(record['marketing_consent'], True)
+        datetime.fromisoformat(record['created_at'])
+    
+    def test_changelist_filters(self):
+        """Test that the changelist's filter parameters select the same rows"""
+        make_signups(3)
+        EmailSignup.objects.filter(email='lead2@example.com').update(email_verified=True)
+        self.assertEqual(filter_signups('?email_verified__exact=1').count(), 1)
+        self.assertEqual(filter_signups('created_at__year=2000').count(), 0)
+        with self.assertRaises(ValueError):
+            filter_signups('password__startswith=x')
+    
+    def test_filters_match_admin(self):
+        """Test that the accepted filter fields are the admin's list_filter and date_hierarchy"""
+        self.assertEqual(set(FILTER_FIELDS), set(EmailSignupAdmin.list_filter) | {EmailSignupAdmin.date_hierarchy})
+    
+    def test_management_command(self):
+        """Test that the command writes the filtered export to a file"""
+        make_signups(3)
+        EmailSignup.objects.filter(email='lead0@example.com').update(email_verified=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'verified.ndjson'
+            call_command(
+                'export_signups', format='ndjson', output=str(path), filter='email_verified__exact=1', stderr=io.StringIO()
+            )
+            lines = path.read_text().splitlines()
+        self.assertEqual([json.loads(line)['email'] for line in lines], ['lead0@example.com'])
+
+
+class TestExportAdminAction(TestCase):
+    """Test the changelist export actions"""
+    
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(admin)
+    
+    def test_select_all_exports_filtered_changelist(self):
+        """Test that "select all" streams every row matching the changelist filters"""
+        make_signups(4)
+        EmailSignup.objects.filter(email__in=['lead1@example.com', 'lead3@example.com']).update(marketing_consent=True)
+        url = reverse('admin:pages_emailsignup_changelist') + '?marketing_consent__exact=1'
+        response = self.client.post(url, {'action': 'export_csv', 'select_across': '1', '_selected_action': ['1']})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="signups-', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row[3] for row in rows[1:]], ['lead1@example.com', 'lead3@example.com'])
@@ -3,6 +3,7 @@ Tests for pages forms
 """
 import pytest
 from django.test import TestCase
+from pages.blocklist import load_rules
 from pages.forms import EmailSignupForm
 
 
@@ -106,3 +107,52 @@ class TestEmailSignupForm(TestCase):
         self.assertTrue(form.is_valid())
         signup = form.save()
         self.assertFalse(signup.marketing_consent)
+    
+    def test_duplicate_phone(self):
+        """Test that duplicate phone numbers are rejected with a phone error"""
+        EmailSignupForm(data={
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'phone': '1234567890'
+        }).save()
+        
+        form = EmailSignupForm(data={
+            'first_name': 'Jane',
+            'last_name': 'Smith',
+            'email': 'jane@example.com',
+            'phone': '123-456-7890'
+        })
+        self.assertFalse(form.is_valid())
+        self.assertIn('phone', form.errors)
+        self.assertNotIn('email', form.errors)
+    
+    def test_duplicate_email_is_case_insensitive(self):
+        """Test that an email differing only in case is a duplicate"""
+        EmailSignupForm(data={
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'phone': '1234567890'
+        }).save()
+        
+        form = EmailSignupForm(data={
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'John@Example.com',
+            'phone': '9876543210'
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['email'], ['This email is already on the waitlist. Check your inbox for updates!'])
+    
+    def test_validation_uses_one_query(self):
+        """Test that all duplicate checks resolve in a single database round trip"""
+        form = EmailSignupForm(data={
+            'first_name': 'John',
+            'last_name': 'Doe',
+            'email': 'john@example.com',
+            'phone': '1234567890'
+        })
+        load_rules()  # blocklist overrides are cached per process, outside the per-request cost
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
@@ -0,0 +1,147 @@
+"""
+Tests for the build_frontend command and the self-hosted asset tags
+"""
+import io
+import json
+import re
+import shutil
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.management.commands.build_frontend import TAILWIND_RELEASE_URL, TAILWIND_TARGETS, VENDOR_FILES
+
+FAKE_TAILWIND = f"""#!{sys.executable}
+import sys
+args = sys.argv[1:]
+with open(args[args.index('--output') + 1], 'w') as f:
+    f.write('.text-primary{{color:#1e40af}}')
+    if '--content' in args:
+        f.write('/* ' + args[args.index('--content') + 1] + ' */')
+"""
+
+
+def fake_urlopen(contents):
+    def urlopen(url, timeout=None):
+        return io.BytesIO(contents.get(url, f'/* {url} */'.encode()))
+    return urlopen
+
+
+class TestBuildFrontend(SimpleTestCase):
+    """Test vendoring pinned assets and building the CSS bundle"""
+    
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        shutil.copytree(settings.FRONTEND_SOURCE_DIR, self.tmp / 'frontend')
+        cli = self.tmp / 'tailwindcss'
+        cli.write_text(FAKE_TAILWIND)
+        cli.chmod(0o755)
+        self.override = override_settings(
+            FRONTEND_SOURCE_DIR=self.tmp / 'frontend',
+            FRONTEND_OUTPUT_DIR=self.tmp / 'static',
+            TAILWIND_CLI_PATH=str(cli),
+        )
+        self.override.enable()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.tmp)
+    
+    def build(self, contents=None, **options):
+        out = StringIO()
+        with mock.patch('core.management.commands.build_frontend.urlopen', fake_urlopen(contents or {})):
+            call_command('build_frontend', stdout=out, **options)
+        return out.getvalue()
+    
+    def test_vendors_pinned_assets_and_writes_lock(self):
+        """Test that every pinned file is downloaded and its checksum recorded"""
+        self.build()
+        for name in VENDOR_FILES:
+            self.assertTrue((self.tmp / 'static' / name).exists(), name)
+        lock = json.loads((self.tmp / 'frontend' / 'vendor.lock.json').read_text())
+        self.assertEqual(set(lock), set(VENDOR_FILES))
+        self.assertIn('htmx.org@2.0.4', lock['vendor/htmx.min.js']['url'])
+    
+    def test_unpinned_download_fails_when_locked(self):
+        """Test that a --locked build refuses files that have no checksum in the lock"""
+        with self.assertRaisesMessage(CommandError, 'is not pinned in vendor.lock.json'):
+            self.build(locked=True)
+        self.assertFalse((self.tmp / 'static' / 'vendor').exists())
+    
+    def test_second_run_downloads_nothing(self):
+        """Test that files matching the lock are not fetched again, and a --locked build accepts them"""
+        self.build()
+        self.assertIn(f'Vendored {len(VENDOR_FILES)} file(s), 0 downloaded', self.build(locked=True))
+    
+    def test_checksum_mismatch_fails(self):
+        """Test that a changed upstream file is rejected"""
+        self.build()
+        (self.tmp / 'static' / 'vendor' / 'htmx.min.js').unlink()
+        url = VENDOR_FILES['vendor/htmx.min.js']
+        with self.assertRaisesMessage(CommandError, 'Checksum mismatch'):
+            self.build({url: b'tampered'})
+    
+    def test_tailwind_cli_pinned_and_verified(self):
+        """Test that --update-lock pins the CLI for every platform and a tampered binary is never run"""
+        version = settings.TAILWIND_CLI_VERSION
+        contents = {
+            TAILWIND_RELEASE_URL.format(version=version, target=target): FAKE_TAILWIND.encode()
+            for target in TAILWIND_TARGETS.values()
+        }
+        with override_settings(TAILWIND_CLI_PATH='', FRONTEND_TOOLS_DIR=self.tmp / 'tools'):
+            self.build(contents, update_lock=True)
+            lock = json.loads((self.tmp / 'frontend' / 'vendor.lock.json').read_text())
+            for target in TAILWIND_TARGETS.values():
+                self.assertIn(f'tailwindcss-{version}-{target}', lock)
+            self.assertIn('text-primary', (self.tmp / 'static' / 'dist' / 'app.css').read_text())
+            
+            for cli in (self.tmp / 'tools').iterdir():
+                cli.write_text(FAKE_TAILWIND + '# tampered\n')
+            (self.tmp / 'static' / 'dist' / 'app.css').unlink()
+            tampered = {url: FAKE_TAILWIND.encode() + b'# tampered\n' for url in contents}
+            with self.assertRaisesMessage(CommandError, 'Checksum mismatch'):
+                self.build(tampered, locked=True)
+            self.assertFalse((self.tmp / 'static' / 'dist' / 'app.css').exists())
+    
+    def test_builds_css_with_tailwind_cli(self):
+        """Test that the Tailwind CLI output lands in static/dist"""
+        self.build()
+        self.assertIn('text-primary', (self.tmp / 'static' / 'dist' / 'app.css').read_text())
+    
+    def test_builds_critical_css_per_template(self):
+        """Test that critical CSS is built from a template and the templates it extends and includes"""
+        self.build()
+        css = (self.tmp / 'static' / 'dist' / 'critical' / 'pages-home.css').read_text()
+        for name in ('pages/home.html', 'base_minimal.html', 'partials/frontend_assets.html', 'forms.py'):
+            self.assertIn(name, css)
+        self.assertNotIn('templates/base.html', css)
+
+
+class TestSelfHostedAssets(TestCase):
+    """Test that pages load CSS and JS from our own static files"""
+    
+    def test_pages_do_not_use_cdns(self):
+        """Test that no page depends on the Tailwind CDN or third-party script hosts"""
+        for name in ('pages:home', 'pages:about'):
+            response = self.client.get(reverse(name))
+            self.assertContains(response, '/static/dist/app.css')
+            self.assertContains(response, '/static/vendor/htmx.min.js')
+            for host in ('cdn.tailwindcss.com', 'unpkg.com', 'cdn.jsdelivr.net', 'cdnjs.cloudflare.com'):
+                self.assertNotContains(response, host)
+    
+    def test_referenced_static_files_exist(self):
+        """Test that every static file a template names is in the repo, so the manifest storage can find it"""
+        pattern = re.compile(r"\{% *(?:static|responsive_image|responsive_background) '([^']+)'")
+        built = ('dist/', 'vendor/')  # written by build_frontend
+        for template in Path(settings.BASE_DIR, 'templates').rglob('*.html'):
+            for name in pattern.findall(template.read_text()):
+                if not name.startswith(built):
+                    self.assertTrue(Path(settings.BASE_DIR, 'static', name).exists(), f'{template.name}: {name}')
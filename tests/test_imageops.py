@@ -0,0 +1,56 @@
+"""
+Tests for the vectorized image operations used by the logo and favicon scripts
+"""
+from django.test import SimpleTestCase
+from PIL import Image, ImageDraw
+
+from core import imageops
+
+
+def make_logo():
+    """White 120x80 canvas with a dark block and one near-white pixel inside it"""
+    img = Image.new('RGB', (120, 80), (255, 255, 255))
+    ImageDraw.Draw(img).rectangle((30, 20, 89, 59), fill=(10, 20, 200))
+    img.putpixel((40, 30), (241, 250, 245))
+    img.putpixel((41, 30), (241, 240, 255))
+    return img
+
+
+class TestImageOps(SimpleTestCase):
+    """Test that imageops matches the old per-pixel loop"""
+    
+    def test_white_to_alpha_matches_threshold(self):
+        """Test that only pixels with all channels above the threshold become transparent"""
+        img = imageops.white_to_alpha(make_logo())
+        self.assertEqual(img.mode, 'RGBA')
+        self.assertEqual(img.getpixel((0, 0)), (255, 255, 255, 0))
+        self.assertEqual(img.getpixel((40, 30)), (255, 255, 255, 0))
+        self.assertEqual(img.getpixel((41, 30)), (241, 240, 255, 255))
+        self.assertEqual(img.getpixel((50, 50)), (10, 20, 200, 255))
+    
+    def test_trim_crops_to_content(self):
+        """Test that trim crops to the non-transparent bounding box"""
+        cropped, bbox = imageops.trim(imageops.white_to_alpha(make_logo()))
+        self.assertEqual(bbox, (30, 20, 90, 60))
+        self.assertEqual(cropped.size, (60, 40))
+    
+    def test_trim_of_blank_image(self):
+        """Test that a fully transparent image is returned unchanged"""
+        img = imageops.white_to_alpha(Image.new('RGB', (10, 10), (255, 255, 255)))
+        cropped, bbox = imageops.trim(img)
+        self.assertIsNone(bbox)
+        self.assertIs(cropped, img)
+    
+    def test_square_icon(self):
+        """Test the centre-square crop and resize used for the favicon"""
+        icon = imageops.square_icon(make_logo(), 32)
+        self.assertEqual(icon.size, (32, 32))
+        self.assertEqual(imageops.center_square(make_logo()).size, (80, 80))
+    
+    def test_fit_within_and_flatten(self):
+        """Test downscaling by the longest side and flattening transparency"""
+        self.assertEqual(imageops.fit_within(make_logo(), 60).size, (60, 40))
+        self.assertEqual(imageops.fit_within(make_logo(), 500).size, (120, 80))
+        flat = imageops.flatten(imageops.white_to_alpha(make_logo()))
+        self.assertEqual(flat.mode, 'RGB')
+        self.assertEqual(flat.getpixel((0, 0)), (255, 255, 255))
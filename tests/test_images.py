@@ -0,0 +1,102 @@
+"""
+Tests for build_images and the responsive image template tags
+"""
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+
+class TestBuildImages(SimpleTestCase):
+    """Test building variants and rendering them"""
+    
+    def setUp(self):
+        self.static_dir = Path(tempfile.mkdtemp())
+        self.images_dir = self.static_dir / 'images'
+        self.images_dir.mkdir()
+        Image.new('RGBA', (800, 400), (30, 60, 200, 255)).save(self.images_dir / 'logo.png')
+        Image.new('RGB', (500, 300), (200, 30, 30)).save(self.images_dir / 'photo.jpg')
+        self.override = override_settings(
+            RESPONSIVE_IMAGES_SOURCE_DIR=self.images_dir,
+            RESPONSIVE_IMAGE_WIDTHS=[160, 320, 640],
+            RESPONSIVE_IMAGE_FORMATS=['webp'],
+        )
+        self.override.enable()
+    
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.static_dir)
+    
+    def build(self, *args):
+        out = StringIO()
+        call_command('build_images', *args, stdout=out)
+        return out.getvalue()
+    
+    def manifest(self):
+        return json.loads((self.images_dir / 'responsive' / 'manifest.json').read_text())
+    
+    def render(self, source):
+        return Template('{% load images %}' + source).render(Context())
+    
+    def test_builds_widths_and_formats(self):
+        """Test that every width below the original is built in WebP plus a fallback format"""
+        self.build()
+        logo = self.manifest()['images/logo.png']
+        self.assertEqual(logo['fallback'], 'png')
+        self.assertEqual([v['width'] for v in logo['variants']['webp']], [160, 320, 640])
+        photo = self.manifest()['images/photo.jpg']
+        self.assertEqual(photo['fallback'], 'jpg')
+        self.assertEqual([v['width'] for v in photo['variants']['jpg']], [160, 320, 500])
+    
+    def test_unchanged_sources_are_skipped(self):
+        """Test that a second run with identical inputs does no work"""
+        self.build()
+        self.assertIn('Built 0 image(s), 2 unchanged', self.build())
+        Image.new('RGB', (500, 300), (0, 0, 0)).save(self.images_dir / 'photo.jpg')
+        self.assertIn('Built 1 image(s), 1 unchanged', self.build())
+        # Variants of the old photo content are cleaned up
+        self.assertEqual(len(list((self.images_dir / 'responsive').glob('photo-*'))), 6)
+    
+    def test_responsive_image_tag(self):
+        """Test that the tag emits a <picture> with srcset and sizes"""
+        self.build()
+        html = self.render("{% responsive_image 'images/logo.png' alt='Logo' sizes='50vw' class='h-48' %}")
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn('160w', html)
+        self.assertIn('sizes="50vw"', html)
+        self.assertIn('width="800" height="400"', html)
+        self.assertIn('class="h-48"', html)
+    
+    def test_tags_fall_back_without_manifest(self):
+        """Test that unbuilt images render as plain static references"""
+        html = self.render("{% responsive_image 'images/logo.png' alt='Logo' %}")
+        self.assertIn('<img src="/static/images/logo.png"', html)
+        css = self.render("{% responsive_background 'images/photo.jpg' %}")
+        self.assertEqual(css, "background-image: url('/static/images/photo.jpg');")
+    
+    def test_missing_manifest_entry_does_not_fail(self):
+        """Test that an image missing from the staticfiles manifest is left out instead of raising"""
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with override_settings(STORAGES=storages, STATIC_ROOT=self.static_dir / 'collected'):
+            with self.assertLogs('core.templatetags.images', 'WARNING'):
+                css = self.render("{% responsive_background 'images/photo.jpg' %}")
+            self.assertEqual(css, '')
+            with self.assertLogs('core.templatetags.images', 'WARNING'):
+                html = self.render("{% responsive_image 'images/logo.png' alt='Logo' %}")
+            self.assertIn('<img src="/static/images/logo.png" alt="Logo"', html)
+    
+    def test_responsive_background(self):
+        """Test image-set() output for CSS backgrounds"""
+        self.build()
+        css = self.render("{% responsive_background 'images/photo.jpg' width=320 %}")
+        self.assertIn("image-set(", css)
+        self.assertIn("type('image/webp')", css)
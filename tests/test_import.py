@@ -0,0 +1,130 @@
+"""
+Tests for the bulk CSV import of signups
+"""
+import io
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from pages.counters import get_signup_count
+from pages.imports import import_signups
+from pages.models import EmailSignup
+
+HEADER = 'First_Name,Last_Name,Email,Phone,Marketing_Consent\n'
+
+
+def csv_lines(*rows):
+    return io.StringIO(HEADER + ''.join(row + '\n' for row in rows))
+
+
+class TestImportSignups(TestCase):
+    """Test normalization, deduplication and the error report"""
+    
+    def test_rows_normalized_like_the_form(self):
+        """Test that emails are lowercased, phones formatted and consent parsed"""
+        report = import_signups(csv_lines('Ann,Lee,ANN@Example.com,(555) 111-2222,yes', 'Bob,Ray,bob@example.com,555.111.3333,'))
+        self.assertEqual(report.created, 2)
+        self.assertEqual(
+            list(EmailSignup.objects.order_by('email').values_list('email', 'phone', 'marketing_consent')),
+            [('ann@example.com', '555-111-2222', True), ('bob@example.com', '555-111-3333', False)],
+        )
+    
+    def test_invalid_rows_reported_by_line(self):
+        """Test that each rejected row is reported with its line number and every problem"""
+        report = import_signups(csv_lines(
+            'Ann,Lee,ann@example.com,5551112222,',
+            'Bob,Ray,bob@mailinator.com,5551113333,',
+            ',Doe,not-an-email,123,',
+        ))
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.invalid, 2)
+        self.assertEqual([line for line, _ in report.errors], [3, 4])
+        self.assertIn('permanent email address', report.errors[0][1])
+        self.assertIn('first_name: This field is required.', report.errors[1][1])
+        self.assertIn('email: Enter a valid email address.', report.errors[1][1])
+        self.assertIn('phone: Phone number must be exactly 10 digits', report.errors[1][1])
+    
+    def test_overlong_email_reported(self):
+        """Test that an email valid by syntax but longer than the column is reported instead of aborting the import"""
+        long_email = 'a' * 64 + '@' + '.'.join(['b' * 63] * 3) + '.com'
+        report = import_signups(csv_lines(
+            f'Ann,Lee,{long_email},5551112222,',
+            'Bob,Ray,bob@example.com,5551113333,',
+        ))
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [(2, 'email: Ensure this value has at most 254 characters.')])
+    
+    def test_duplicates_in_database_and_file(self):
+        """Test that rows matching an existing signup or an earlier row are skipped"""
+        EmailSignup.objects.create(first_name='Old', last_name='Lead', email='Old@Example.com', phone='555-000-0000')
+        report = import_signups(csv_lines(
+            'A,A,old@example.com,5551110001,',
+            'B,B,b@example.com,555-000-0000,',
+            'C,C,c@example.com,5551110003,',
+            'D,D,C@EXAMPLE.COM,5551110004,',
+        ))
+        self.assertEqual((report.created, report.duplicates), (1, 3))
+        self.assertEqual(report.errors, [
+            (2, 'email already on the waitlist'),
+            (3, 'phone already on the waitlist'),
+            (5, 'email already on the waitlist'),
+        ])
+        self.assertEqual(EmailSignup.objects.count(), 2)
+    
+    def test_queries_per_batch(self):
+        """Test that each batch costs one duplicate lookup and one insert, not a query per row"""
+        rows = [f'F{i},L{i},lead{i}@example.com,{5550000000 + i},' for i in range(10)]
+        with self.assertNumQueries(4 * 2 + 1):  # a lookup and an insert per batch, then the recount
+            report = import_signups(csv_lines(*rows), batch_size=3)
+        self.assertEqual(report.created, 10)
+    
+    def test_signup_count_reconciled(self):
+        """Test that the cached landing page count includes imported signups"""
+        cache.clear()
+        self.assertEqual(get_signup_count(), 0)
+        import_signups(csv_lines('Ann,Lee,ann@example.com,5551112222,'))
+        self.assertEqual(get_signup_count(), 1)
+    
+    def test_missing_columns(self):
+        """Test that a file without the required columns is rejected up front"""
+        with self.assertRaisesMessage(ValueError, 'Missing column(s): phone'):
+            import_signups(io.StringIO('first_name,last_name,email\nAnn,Lee,ann@example.com\n'))
+    
+    def test_management_command(self):
+        """Test that the command imports a file and writes the rejected rows"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path, errors = Path(tmp) / 'leads.csv', Path(tmp) / 'errors.csv'
+            path.write_text(HEADER + 'Ann,Lee,ann@example.com,5551112222,\nBob,Ray,bob,5551113333,\n')
+            out = io.StringIO()
+            call_command('import_signups', str(path), errors=str(errors), stdout=out, stderr=io.StringIO())
+            self.assertEqual(errors.read_text().splitlines()[1], '3,email: Enter a valid email address.')
+        self.assertIn('1 created, 0 duplicate(s), 1 invalid', out.getvalue())
+
+
+class TestImportAdmin(TestCase):
+    """Test the changelist CSV upload"""
+    
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(admin)
+        self.url = reverse('admin:pages_emailsignup_import')
+    
+    def test_changelist_links_to_import(self):
+        """Test that the changelist offers the import page"""
+        self.assertContains(self.client.get(reverse('admin:pages_emailsignup_changelist')), self.url)
+    
+    def test_upload(self):
+        """Test that an uploaded file is imported and its rejected rows listed"""
+        upload = SimpleUploadedFile(
+            'leads.csv', (HEADER + 'Ann,Lee,ann@example.com,5551112222,\nBob,Ray,bob,5551113333,\n').encode('utf-8-sig')
+        )
+        response = self.client.post(self.url, {'file': upload})
+        self.assertContains(response, 'Import finished: 1 created, 0 duplicate(s), 1 invalid.')
+        self.assertContains(response, 'email: Enter a valid email address.')
+        self.assertTrue(EmailSignup.objects.filter(email='ann@example.com').exists())
@@ -0,0 +1,142 @@
+"""
+Tests for the pooled SMTP backend and digest coalescing, against a local aiosmtpd server
+"""
+import asyncio
+import smtplib
+from email import message_from_string
+from email.policy import default as default_policy
+import socket
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage, get_connection
+from django.test import TestCase, override_settings
+
+from core import outbox
+from core.mail import pool
+from core.models import OutboxEmail
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """aiosmtpd handler that remembers each message and the session it arrived on"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        if b'Subject: Stall' in envelope.content:
+            await asyncio.sleep(2)
+        self.messages.append(envelope.content.decode('utf8', errors='replace'))
+        self.sessions.add(id(session))
+        return '250 Message accepted for delivery'
+
+
+class SMTPServerTestCase(TestCase):
+    """Starts an aiosmtpd server and points the pooled backend at it"""
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.controller = aiosmtpd_controller.Controller(self.handler, hostname='127.0.0.1', port=free_port())
+        self.controller.start()
+        pool.clear()
+        self.settings_override = override_settings(
+            EMAIL_BACKEND='core.mail.PooledSMTPEmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.controller.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        pool.clear()
+        self.settings_override.disable()
+        self.controller.stop()
+
+    def send(self, subject):
+        EmailMessage(subject, 'Body', 'noreply@example.com', ['admin@example.com']).send()
+
+
+class TestPooledSMTPBackend(SMTPServerTestCase):
+    """Test connection reuse in the pooled backend"""
+
+    def test_connection_reused_across_sends(self):
+        """Test that separate send calls share one SMTP session"""
+        for i in range(3):
+            self.send(f'Lead {i}')
+        self.assertEqual(len(self.handler.messages), 3)
+        self.assertEqual(len(self.handler.sessions), 1)
+
+    @override_settings(EMAIL_POOL_MAX_IDLE=0)
+    def test_stale_connection_is_replaced(self):
+        """Test that a connection idle past EMAIL_POOL_MAX_IDLE is not reused"""
+        self.send('First')
+        self.send('Second')
+        self.assertEqual(len(self.handler.sessions), 2)
+
+    def test_disconnected_connection_is_not_pooled(self):
+        """Test that a connection closed by the server is dropped and a new one opened"""
+        connection = get_connection()
+        connection.open()
+        connection.connection.close()
+        connection.close()
+        self.send('After reconnect')
+        self.assertEqual(len(self.handler.messages), 1)
+
+    @override_settings(EMAIL_TIMEOUT=0.5)
+    def test_timed_out_connection_is_not_pooled(self):
+        """Test that a send that hits EMAIL_TIMEOUT closes its connection instead of pooling it"""
+        connection = get_connection()
+        with self.assertRaises(smtplib.SMTPServerDisconnected):
+            connection.send_messages([EmailMessage('Stall', 'Body', 'noreply@example.com', ['admin@example.com'])])
+        self.assertIsNone(connection.connection)
+        self.assertIsNone(pool.acquire(connection._pool_key()))
+
+
+@override_settings(EMAIL_DIGEST_THRESHOLD=3, EMAIL_DIGEST_CATEGORIES=['lead_notification'])
+class TestDigest(SMTPServerTestCase):
+    """Test that busy notification categories are coalesced into digests"""
+
+    def queue(self, n, category='lead_notification'):
+        for i in range(n):
+            outbox.enqueue(f'🎯 New Lead: {i}', f'Lead body {i}', ['admin@example.com'], category=category)
+
+    def test_low_volume_sends_individually(self):
+        """Test that messages under the threshold are delivered one by one"""
+        self.queue(2)
+        self.assertEqual(outbox.process_outbox(), 2)
+        self.assertEqual(len(self.handler.messages), 2)
+
+    def test_high_volume_held_until_window_end(self):
+        """Test that messages past the threshold wait for the digest window"""
+        self.queue(4)
+        due = OutboxEmail.objects.filter(next_attempt_at__lte=outbox.timezone.now()).count()
+        self.assertEqual(due, 2)
+
+    def test_high_volume_sent_as_digest(self):
+        """Test that a busy batch becomes one digest email over one connection"""
+        self.queue(5)
+        OutboxEmail.objects.update(next_attempt_at=outbox.timezone.now())
+        self.assertEqual(outbox.process_outbox(), 5)
+        self.assertEqual(len(self.handler.messages), 1)
+        digest = message_from_string(self.handler.messages[0], policy=default_policy)
+        self.assertTrue(digest['Subject'].endswith('(+4 more)'))
+        self.assertIn('Lead body 4', self.handler.messages[0])
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENT).count(), 5)
+
+    def test_other_categories_not_coalesced(self):
+        """Test that categories outside EMAIL_DIGEST_CATEGORIES are never merged"""
+        self.queue(4, category='general')
+        outbox.process_outbox()
+        self.assertEqual(len(self.handler.messages), 4)
+        self.assertEqual(len(mail.outbox), 0)
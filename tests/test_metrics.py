@@ -0,0 +1,96 @@
+"""
+Tests for the cross-worker Prometheus metrics and the /metrics view
+"""
+import multiprocessing
+import sys
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client.parser import text_string_to_metric_families
+
+from core import metrics, outbox
+
+SIGNUP = {'first_name': 'John', 'last_name': 'Doe', 'email': 'john@example.com', 'phone': '1234567890'}
+
+
+def sample(name, **labels):
+    """Current value of a sample summed over all worker files (0 if absent)"""
+    for family in text_string_to_metric_families(metrics.render_latest().decode()):
+        for metric_sample in family.samples:
+            if metric_sample.name == name and metric_sample.labels == labels:
+                return metric_sample.value
+    return 0.0
+
+
+def count_signup_in_child():
+    metrics.SIGNUPS.inc()
+
+
+class TestMetrics(TestCase):
+    """Test what the metrics subsystem records"""
+    
+    def test_request_counts_and_latency(self):
+        """Test that requests are counted and timed per URL name"""
+        before = sample('http_requests_total', view='pages:about', method='GET', status='200')
+        latency_before = sample('http_request_duration_seconds_count', view='pages:about')
+        self.client.get(reverse('pages:about'))
+        self.assertEqual(sample('http_requests_total', view='pages:about', method='GET', status='200'), before + 1)
+        self.assertEqual(sample('http_request_duration_seconds_count', view='pages:about'), latency_before + 1)
+    
+    def test_signups_counted_on_commit(self):
+        """Test that a committed signup increments signups_total"""
+        before = sample('signups_total')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('pages:home'), SIGNUP, HTTP_HX_REQUEST='true')
+        self.assertEqual(sample('signups_total'), before + 1)
+    
+    def test_rate_limit_rejections(self):
+        """Test that throttled requests are counted per limiter"""
+        before = sample('ratelimit_rejections_total', limiter='signup')
+        for _ in range(7):
+            response = self.client.post(reverse('pages:home'), {'email': 'bad'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(sample('ratelimit_rejections_total', limiter='signup'), before + 2)
+    
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_email_outcomes(self):
+        """Test that outbox deliveries are counted by category and outcome"""
+        before = sample('outbox_emails_total', category='general', outcome='sent')
+        outbox.enqueue('Subject', 'Body', ['admin@example.com'])
+        outbox.process_outbox()
+        self.assertEqual(sample('outbox_emails_total', category='general', outcome='sent'), before + 1)
+    
+    @pytest.mark.skipif(sys.platform == 'win32', reason='needs fork()')
+    def test_aggregates_across_processes(self):
+        """Test that samples written by another worker process are included"""
+        before = sample('signups_total')
+        process = multiprocessing.get_context('fork').Process(target=count_signup_in_child)
+        process.start()
+        process.join()
+        self.assertEqual(sample('signups_total'), before + 1)
+
+
+class TestMetricsView(TestCase):
+    """Test access control on /metrics"""
+    
+    def test_anonymous_rejected(self):
+        """Test that /metrics needs authentication"""
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 401)
+    
+    def test_staff_can_read(self):
+        """Test that a staff session gets the Prometheus text format"""
+        staff = get_user_model().objects.create_user(username='staff', password='secret-pass-123', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response['Content-Type'])
+        self.assertContains(response, 'http_requests_total')
+    
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_bearer_token(self):
+        """Test that a scraper can use the configured bearer token"""
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
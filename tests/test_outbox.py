@@ -0,0 +1,134 @@
+"""
+Tests for the email outbox
+"""
+import runpy
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocMemEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import outbox
+from core.models import OutboxEmail
+
+
+class FailingEmailBackend(LocMemEmailBackend):
+    """Backend that refuses every message"""
+    
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP unavailable')
+
+
+class CountingEmailBackend(LocMemEmailBackend):
+    """Backend that records how many times a connection was opened"""
+    opened = 0
+    
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+class TestOutbox(TestCase):
+    """Test queuing and delivering outbox emails"""
+    
+    def queue(self, n=1):
+        return [outbox.enqueue(f'Subject {i}', 'Body', ['admin@example.com']) for i in range(n)]
+    
+    def test_enqueue_does_not_send(self):
+        """Test that enqueue only writes a row"""
+        message = self.queue()[0]
+        self.assertEqual(message.status, OutboxEmail.STATUS_PENDING)
+        self.assertEqual(len(mail.outbox), 0)
+    
+    def test_process_outbox_sends_and_marks_sent(self):
+        """Test that due messages are delivered and marked sent"""
+        self.queue(3)
+        self.assertEqual(outbox.process_outbox(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENT).count(), 3)
+        # Nothing left to send
+        self.assertEqual(outbox.process_outbox(), 0)
+    
+    @override_settings(EMAIL_BACKEND='tests.test_outbox.CountingEmailBackend')
+    def test_batch_reuses_one_connection(self):
+        """Test that a batch is delivered over a single connection"""
+        CountingEmailBackend.opened = 0
+        self.queue(5)
+        outbox.process_outbox(batch_size=10)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+    
+    @override_settings(EMAIL_BACKEND='tests.test_outbox.FailingEmailBackend')
+    def test_failure_is_retried_with_backoff(self):
+        """Test that failed sends stay pending with a later next_attempt_at"""
+        message = self.queue()[0]
+        self.assertEqual(outbox.process_outbox(), 0)
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxEmail.STATUS_PENDING)
+        self.assertEqual(message.attempts, 1)
+        self.assertIn('SMTP unavailable', message.last_error)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        # Not due yet, so it is not picked up again
+        self.assertEqual(outbox.claim_batch(), [])
+    
+    @override_settings(EMAIL_BACKEND='tests.test_outbox.FailingEmailBackend', EMAIL_OUTBOX_MAX_ATTEMPTS=1)
+    def test_failure_after_max_attempts(self):
+        """Test that a message is marked failed after the last attempt"""
+        message = self.queue()[0]
+        outbox.process_outbox()
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxEmail.STATUS_FAILED)
+    
+    def test_claimed_rows_are_not_claimed_twice(self):
+        """Test that a leased message is invisible to other workers"""
+        self.queue(2)
+        first = outbox.claim_batch()
+        self.assertEqual(len(first), 2)
+        self.assertEqual(outbox.claim_batch(), [])
+    
+    def test_rows_finished_after_the_select_are_not_leased(self):
+        """Test that rows sent or backed off by another worker after the SELECT are not leased again"""
+        finish_elsewhere = {
+            'sent': {'status': OutboxEmail.STATUS_SENT},
+            'backed off': {'next_attempt_at': timezone.now() + timedelta(minutes=5)},
+        }
+        for label, changes in finish_elsewhere.items():
+            with self.subTest(label):
+                OutboxEmail.objects.all().delete()
+                self.queue()
+                real_filter = OutboxEmail.objects.filter
+                
+                def stale_select(*args, **kwargs):
+                    # Another worker finishes the row (clearing its lease) between this SELECT and the UPDATE
+                    select.side_effect = real_filter
+                    due_ids = list(real_filter(*args, **kwargs).values_list('pk', flat=True))
+                    real_filter(pk__in=due_ids).update(lease_token='', lease_expires_at=None, **changes)
+                    return real_filter(pk__in=due_ids)
+                
+                with mock.patch.object(OutboxEmail.objects, 'filter', side_effect=stale_select) as select:
+                    self.assertEqual(outbox.claim_batch(), [])
+    
+    def test_expired_lease_is_reclaimed(self):
+        """Test that messages from a crashed worker are picked up again"""
+        self.queue()
+        outbox.claim_batch()
+        OutboxEmail.objects.update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(outbox.process_outbox(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+    
+    def test_process_outbox_command(self):
+        """Test the management command drains the outbox with --once"""
+        self.queue(2)
+        call_command('process_outbox', '--once', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 2)
+    
+    def test_gunicorn_workers_start_the_outbox_worker(self):
+        """Test that every gunicorn worker starts delivering at boot, not on its first enqueue"""
+        hooks = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        with mock.patch('core.outbox.wake_worker') as wake_worker:
+            hooks['post_worker_init'](worker=None)
+        wake_worker.assert_called_once_with()
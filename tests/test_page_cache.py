@@ -0,0 +1,89 @@
+"""
+Tests for the static marketing page cache
+"""
+import re
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from pages.cache import CSRF_PLACEHOLDER
+
+
+class TestStaticPageCache(TestCase):
+    """Test cached rendering of about/contact/privacy/terms"""
+
+    def test_second_request_is_served_from_cache(self):
+        """Test that the template is rendered only on the first request"""
+        url = reverse('pages:privacy')
+        first = self.client.get(url)
+        self.assertTemplateUsed(first, 'pages/privacy_policy.html')
+
+        with self.assertTemplateNotUsed('pages/privacy_policy.html'), self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_query_string_shares_the_entry(self):
+        """Test that query strings do not create extra cache entries"""
+        url = reverse('pages:privacy')
+        self.client.get(url, {'utm_source': 'newsletter'})
+        with self.assertTemplateNotUsed('pages/privacy_policy.html'):
+            for i in range(3):
+                self.assertEqual(self.client.get(url, {'x': i}).status_code, 200)
+            self.client.get(url)
+
+    def test_conditional_request_returns_304(self):
+        """Test that If-None-Match with the current ETag gets a 304"""
+        url = reverse('pages:terms')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_csrf_token_substituted_per_request(self):
+        """Test that cached pages with forms get a real CSRF token and cookie"""
+        csrf_client = Client(enforce_csrf_checks=True)
+        url = reverse('pages:contact')
+        csrf_client.get(url)
+        response = csrf_client.get(url)
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertIn('csrftoken', response.cookies)
+
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+        posted = csrf_client.post(url, {'name': 'John', 'email': 'john@example.com', 'csrfmiddlewaretoken': token})
+        self.assertEqual(posted.status_code, 302)
+
+    def test_htmx_and_full_requests_cached_separately(self):
+        """Test that HTMX requests use their own cache entry"""
+        url = reverse('pages:about')
+        self.client.get(url)
+        response = self.client.get(url, HTTP_HX_REQUEST='true')
+        self.assertTemplateUsed(response, 'pages/about.html')
+
+    def test_authenticated_users_get_their_own_variant(self):
+        """Test that a logged-in user's page is not shared with anonymous visitors"""
+        url = reverse('pages:about')
+        self.client.get(url)
+        user = get_user_model().objects.create_user(username='coach', password='secret-pass-123')
+        self.client.force_login(user)
+        response = self.client.get(url)
+        self.assertContains(response, 'coach')
+
+    def test_new_build_invalidates_cache(self):
+        """Test that a changed staticfiles manifest renders the page again"""
+        url = reverse('pages:privacy')
+        self.client.get(url)
+        with mock.patch('pages.cache.build_version', return_value='new-build'):
+            response = self.client.get(url)
+        self.assertTemplateUsed(response, 'pages/privacy_policy.html')
+
+    def test_pending_messages_bypass_cache(self):
+        """Test that flash messages after a contact POST are rendered, not served stale"""
+        url = reverse('pages:contact')
+        self.client.get(url)
+        response = self.client.post(url, {'name': 'John', 'email': 'john@example.com', 'message': 'Hi'}, follow=True)
+        self.assertContains(response, 'Thank you for contacting us!')
@@ -0,0 +1,73 @@
+"""
+Tests for the per-view performance middleware
+"""
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.performance import Histogram, registry
+from core.templating import disable_render_profiling
+from pages.models import EmailSignup
+
+
+class TestPerformanceMiddleware(TestCase):
+    """Test per-URL-name request metrics"""
+    
+    def setUp(self):
+        registry.take()
+    
+    def tearDown(self):
+        registry.take()
+        disable_render_profiling()
+    
+    def stats(self, name):
+        return registry.views[name].histograms
+    
+    def test_records_by_url_name(self):
+        """Test that latency, template time and size are filed under the URL name"""
+        response = self.client.get(reverse('pages:about'))
+        stats = self.stats('pages:about')
+        self.assertEqual(stats['duration_seconds'].count, 1)
+        self.assertGreater(stats['template_seconds'].sum, 0)
+        self.assertLessEqual(stats['template_seconds'].sum, stats['duration_seconds'].sum)
+        self.assertEqual(stats['response_bytes'].sum, len(response.content))
+        self.assertEqual(registry.views['pages:about'].statuses, {'2xx': 1})
+    
+    def test_counts_sql_queries(self):
+        """Test that the queries a view runs are counted"""
+        EmailSignup.objects.create(first_name='John', last_name='Doe', email='john@example.com', phone='123-456-7890')
+        with self.assertNumQueries(1):
+            self.client.get(reverse('pages:signup_count'))
+        self.assertEqual(self.stats('pages:signup_count')['db_queries'].sum, 1)
+        self.assertGreater(self.stats('pages:signup_count')['db_seconds'].sum, 0)
+    
+    def test_unresolved_requests(self):
+        """Test that 404s are grouped together"""
+        self.client.get('/no-such-page/')
+        self.assertEqual(registry.views['<unresolved>'].statuses, {'4xx': 1})
+    
+    @override_settings(PERFORMANCE_METRICS_LOG_INTERVAL=0)
+    def test_flushes_to_log(self):
+        """Test that the interval's stats are logged per view and reset"""
+        with self.assertLogs('core.performance', 'INFO') as logs:
+            self.client.get(reverse('pages:privacy'))
+        self.assertIn('perf view=pages:privacy requests=1', logs.output[0])
+        self.assertEqual(registry.views, {})
+    
+    @override_settings(PERFORMANCE_METRICS=False)
+    def test_can_be_disabled(self):
+        """Test that nothing is recorded when PERFORMANCE_METRICS is off"""
+        self.client.get(reverse('pages:about'))
+        self.assertEqual(registry.views, {})
+
+
+class TestHistogram(TestCase):
+    """Test bucket counting and quantile estimates"""
+    
+    def test_quantiles(self):
+        """Test that quantiles are interpolated within buckets"""
+        histogram = Histogram((1, 2, 4))
+        for value in (0.5, 1, 1.5, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [2, 1, 1, 1])
+        self.assertEqual(histogram.quantile(0.4), 1.0)
+        self.assertEqual(histogram.quantile(1), 4)
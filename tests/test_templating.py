@@ -0,0 +1,74 @@
+"""
+Tests for template cache warm-up and render profiling
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.template import engines
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import templating
+
+CACHED_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'DIRS': [settings.BASE_DIR / 'templates'],
+    'OPTIONS': {
+        'loaders': [('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ])],
+    },
+}]
+
+
+class TestTemplateWarmup(TestCase):
+    """Test precompiling templates into the cached loader"""
+    
+    @override_settings(TEMPLATES=CACHED_TEMPLATES)
+    def test_warmup_fills_cached_loader(self):
+        """Test that project and app templates are compiled at startup"""
+        compiled, _failed = templating.warm_template_cache()
+        cache = engines['django'].engine.template_loaders[0].get_template_cache
+        self.assertIn('pages/home.html', cache)
+        self.assertIn('admin/base.html', cache)
+        self.assertEqual(compiled, len(cache))
+
+
+class TestRenderProfiling(TestCase):
+    """Test per-template render timing"""
+    
+    def setUp(self):
+        templating.reset_render_stats()
+        templating.enable_render_profiling()
+    
+    def tearDown(self):
+        templating.disable_render_profiling()
+        templating.reset_render_stats()
+    
+    def test_records_templates_and_includes(self):
+        """Test that the page, its base template and its includes are timed separately"""
+        self.client.get(reverse('pages:home'))
+        stats = {row['template']: row for row in templating.render_stats()}
+        for name in ('pages/home.html', 'base_minimal.html', 'partials/frontend_assets.html', 'pages/partials/signup_form.html'):
+            self.assertEqual(stats[name]['calls'], 1, name)
+        home = stats['pages/home.html']
+        self.assertLessEqual(home['self_ms'], home['total_ms'])
+        self.assertGreaterEqual(home['total_ms'], stats['base_minimal.html']['total_ms'])
+    
+    @override_settings(TEMPLATE_PROFILING_SLOW_MS=0)
+    def test_slow_renders_logged(self):
+        """Test that renders over the threshold are logged with their nested templates"""
+        with self.assertLogs('core.templating', 'WARNING') as logs:
+            self.client.get(reverse('pages:about'))
+        self.assertIn('Slow template render: pages/about.html', logs.output[0])
+        self.assertIn('base.html', logs.output[0])
+    
+    def test_stats_endpoint_is_staff_only(self):
+        """Test that the JSON endpoint requires a staff login"""
+        url = reverse('template_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        staff = get_user_model().objects.create_user(username='staff', password='secret-pass-123', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(reverse('pages:about'))
+        data = self.client.get(url).json()
+        self.assertIn('pages/about.html', [row['template'] for row in data['templates']])
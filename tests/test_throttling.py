@@ -0,0 +1,104 @@
+"""
+Tests for client IP resolution and signup throttling
+"""
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core.throttling import TokenBucket, client_ip, client_key
+
+
+class TestClientIP(SimpleTestCase):
+    """Test X-Forwarded-For parsing with trusted proxy hops"""
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def request(self, forwarded=None):
+        extra = {'REMOTE_ADDR': '10.0.0.1'}
+        if forwarded is not None:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded
+        return self.factory.get('/', **extra)
+    
+    @override_settings(TRUSTED_PROXY_HOPS=0)
+    def test_no_proxy_uses_remote_addr(self):
+        """Test that X-Forwarded-For is ignored when no proxy is trusted"""
+        self.assertEqual(client_ip(self.request('198.51.100.9')), '10.0.0.1')
+    
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_one_proxy_uses_last_entry(self):
+        """Test that a client-forged prefix cannot choose the rate-limit bucket"""
+        self.assertEqual(client_ip(self.request('1.2.3.4, 198.51.100.9')), '198.51.100.9')
+    
+    @override_settings(TRUSTED_PROXY_HOPS=2)
+    def test_two_proxies(self):
+        """Test that each trusted hop moves one entry to the left"""
+        self.assertEqual(client_ip(self.request('1.2.3.4, 198.51.100.9, 172.16.0.5')), '198.51.100.9')
+    
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_invalid_or_missing_header_falls_back(self):
+        """Test that garbage or absent headers fall back to REMOTE_ADDR"""
+        self.assertEqual(client_ip(self.request('not-an-ip')), '10.0.0.1')
+        self.assertEqual(client_ip(self.request()), '10.0.0.1')
+    
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_ipv6_clients_keyed_by_network(self):
+        """Test that IPv6 addresses in one /64 share a throttle key and IPv4 addresses are kept whole"""
+        first = client_key(self.request('2001:db8:1:2::1'))
+        self.assertEqual(first, '2001:db8:1:2::/64')
+        self.assertEqual(client_key(self.request('2001:db8:1:2:ffff::9')), first)
+        self.assertNotEqual(client_key(self.request('2001:db8:1:3::1')), first)
+        self.assertEqual(client_key(self.request('203.0.113.7')), '203.0.113.7')
+
+
+class TestTokenBucket(SimpleTestCase):
+    """Test the GCRA token bucket"""
+    
+    def test_allows_burst_then_rejects(self):
+        """Test that the burst is allowed and the next request must wait"""
+        bucket = TokenBucket('test', rate='1/s', burst=3)
+        results = [bucket.consume('client', now=100.0)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+        self.assertEqual(bucket.consume('client', now=100.0)[1], 1)
+    
+    def test_refills_over_time(self):
+        """Test that tokens come back at the configured rate"""
+        bucket = TokenBucket('test', rate='1/s', burst=1)
+        self.assertTrue(bucket.consume('client', now=100.0)[0])
+        self.assertFalse(bucket.consume('client', now=100.5)[0])
+        self.assertTrue(bucket.consume('client', now=101.0)[0])
+    
+    def test_clients_are_independent(self):
+        """Test that one client's bucket does not affect another"""
+        bucket = TokenBucket('test', rate='1/m', burst=1)
+        self.assertTrue(bucket.consume('a', now=100.0)[0])
+        self.assertTrue(bucket.consume('b', now=100.0)[0])
+
+
+class TestSignupThrottle(TestCase):
+    """Test early rejection of signup bursts"""
+    
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_burst_rejected_before_database(self):
+        """Test that throttled POSTs get 429 without running form validation queries"""
+        url = reverse('pages:home')
+        data = {'first_name': 'Bot', 'last_name': 'Net', 'email': 'not-an-email', 'phone': '123'}
+        for _ in range(5):
+            self.client.post(url, data, HTTP_X_FORWARDED_FOR='198.51.100.9')
+        with self.assertNumQueries(0):
+            response = self.client.post(url, data, HTTP_X_FORWARDED_FOR='198.51.100.9')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        
+        # A different real client behind the same proxy is unaffected
+        response = self.client.post(url, data, HTTP_X_FORWARDED_FOR='198.51.100.10')
+        self.assertEqual(response.status_code, 200)
+    
+    @override_settings(TRUSTED_PROXY_HOPS=1)
+    def test_rotating_ipv6_addresses_share_a_bucket(self):
+        """Test that addresses from one IPv6 /64 cannot each get a fresh burst"""
+        url = reverse('pages:home')
+        data = {'first_name': 'Bot', 'last_name': 'Net', 'email': 'not-an-email', 'phone': '123'}
+        for i in range(5):
+            self.client.post(url, data, HTTP_X_FORWARDED_FOR=f'2001:db8:0:7::{i + 1:x}')
+        response = self.client.post(url, data, HTTP_X_FORWARDED_FOR='2001:db8:0:7::ff')
+        self.assertEqual(response.status_code, 429)
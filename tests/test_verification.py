@@ -0,0 +1,119 @@
+"""
+Tests for signed email verification links
+"""
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.models import OutboxEmail
+from core.outbox import process_outbox
+from pages.models import EmailSignup
+from pages.verification import VERIFICATION_EMAIL, make_token, queue_verification_emails
+
+
+def make_signup(n=0, **fields):
+    return EmailSignup.objects.create(
+        first_name=f'Lead{n}', last_name='Test', email=f'lead{n}@example.com', phone=f'555-000-{n:04d}', **fields
+    )
+
+
+class TestVerifyEmail(TestCase):
+    """Test the verification endpoint"""
+    
+    def test_verify_is_one_update(self):
+        """Test that a valid link costs a single UPDATE by primary key"""
+        signup = make_signup()
+        url = reverse('pages:verify_email', args=[make_token(signup.pk)])
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        signup.refresh_from_db()
+        self.assertTrue(signup.email_verified)
+    
+    def test_repeat_click(self):
+        """Test that following a link twice still shows success"""
+        signup = make_signup()
+        url = reverse('pages:verify_email', args=[make_token(signup.pk)])
+        self.client.get(url)
+        self.assertContains(self.client.get(url), 'Email confirmed')
+    
+    def test_tampered_token(self):
+        """Test that a token for another id, or a malformed one, is rejected without a query"""
+        signup, other = make_signup(0), make_signup(1)
+        forged = make_token(signup.pk).replace(f'{signup.pk}:', f'{other.pk}:', 1)
+        for token in (forged, 'garbage'):
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('pages:verify_email', args=[token]))
+            self.assertContains(response, "This link isn't valid", status_code=400)
+        other.refresh_from_db()
+        self.assertFalse(other.email_verified)
+    
+    @override_settings(EMAIL_VERIFICATION_MAX_AGE=60)
+    def test_expired_token(self):
+        """Test that links older than EMAIL_VERIFICATION_MAX_AGE are refused"""
+        signup = make_signup()
+        with mock.patch('time.time', return_value=1_700_000_000):
+            token = make_token(signup.pk)
+        with mock.patch('time.time', return_value=1_700_000_061):
+            response = self.client.get(reverse('pages:verify_email', args=[token]))
+        self.assertContains(response, 'This link has expired', status_code=400)
+        signup.refresh_from_db()
+        self.assertFalse(signup.email_verified)
+    
+    def test_deleted_signup(self):
+        """Test that a link for a signup that no longer exists is reported as invalid"""
+        signup = make_signup()
+        token = make_token(signup.pk)
+        signup.delete()
+        self.assertContains(self.client.get(reverse('pages:verify_email', args=[token])), "This link isn't valid", status_code=400)
+
+
+class TestQueueVerificationEmails(TestCase):
+    """Test bulk issuance of verification emails"""
+    
+    def test_bulk_queue(self):
+        """Test that unverified signups get one email each, inserted in batches"""
+        for n in range(5):
+            make_signup(n)
+        EmailSignup.objects.filter(email='lead4@example.com').update(email_verified=True)
+        with self.assertNumQueries(1 + 2):  # one read, then inserts of 3 + 1
+            queued = queue_verification_emails(EmailSignup.objects.all(), 'https://example.com/', batch_size=3)
+        self.assertEqual(queued, 4)
+        messages = OutboxEmail.objects.filter(category=VERIFICATION_EMAIL)
+        self.assertEqual(sorted(m.recipients[0] for m in messages), [f'lead{n}@example.com' for n in range(4)])
+    
+    def test_emailed_link_verifies(self):
+        """Test that the link in the delivered email verifies the signup"""
+        signup = make_signup()
+        queue_verification_emails(EmailSignup.objects.all(), 'https://example.com')
+        process_outbox()
+        link = next(line.strip() for line in mail.outbox[0].body.splitlines() if 'https://example.com/verify/' in line)
+        self.client.get(link.removeprefix('https://example.com'))
+        signup.refresh_from_db()
+        self.assertTrue(signup.email_verified)
+    
+    def test_admin_action(self):
+        """Test that admins can send verification emails for selected signups"""
+        signup = make_signup()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass-12345')
+        self.client.force_login(admin)
+        self.client.post(
+            reverse('admin:pages_emailsignup_changelist'),
+            {'action': 'send_verification_email', '_selected_action': [signup.pk]},
+        )
+        message = OutboxEmail.objects.get(category=VERIFICATION_EMAIL)
+        self.assertIn('http://testserver/verify/', message.body)
+    
+    @override_settings(SITE_URL='https://247performance.com')
+    def test_management_command(self):
+        """Test that the command queues emails for the filtered signups"""
+        make_signup()
+        out = io.StringIO()
+        call_command('send_verification_emails', stdout=out)
+        self.assertIn('Queued 1 verification email(s)', out.getvalue())
+        self.assertIn('https://247performance.com/verify/', OutboxEmail.objects.get().body)